@@ -2,71 +2,33 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 
 # ---------------- ERC20 Solidity Template ---------------- #
-def generate_erc20(name, symbol, supply):
-    return f'''// SPDX-License-Identifier: MIT
-pragma solidity ^0.8.0;
-
-contract {name.replace(" ", "")}Token {{
-    string public name = "{name}";
-    string public symbol = "{symbol}";
-    uint8 public decimals = 18;
-    uint256 public totalSupply;
-
-    mapping(address => uint256) public balanceOf;
-    mapping(address => mapping(address => uint256)) public allowance;
-
-    event Transfer(address indexed from, address indexed to, uint256 value);
-    event Approval(address indexed owner, address indexed spender, uint256 value);
-
-    constructor() {{
-        totalSupply = {supply} * (10 ** uint256(decimals));
-        balanceOf[msg.sender] = totalSupply;
-        emit Transfer(address(0), msg.sender, totalSupply);
-    }}
-
-    function transfer(address to, uint256 value) public returns (bool) {{
-        require(balanceOf[msg.sender] >= value, "Insufficient balance");
-        balanceOf[msg.sender] -= value;
-        balanceOf[to] += value;
-        emit Transfer(msg.sender, to, value);
-        return true;
-    }}
-
-    function approve(address spender, uint256 value) public returns (bool) {{
-        allowance[msg.sender][spender] = value;
-        emit Approval(msg.sender, spender, value);
-        return true;
-    }}
-
-    function transferFrom(address from, address to, uint256 value) public returns (bool) {{
-        require(balanceOf[from] >= value, "Insufficient balance");
-        require(allowance[from][msg.sender] >= value, "Allowance exceeded");
-
-        balanceOf[from] -= value;
-        balanceOf[to] += value;
-        allowance[from][msg.sender] -= value;
-
-        emit Transfer(from, to, value);
-        return true;
-    }}
-}}
-'''
+# Rendering lives in erc20_gen so the batch mode
+# (python erc20_gen.py --batch tokens.csv) produces identical contracts.
+# erc20_gen (and its process-pool imports) loads on the first Generate click,
+# keeping it off the path to the first frame
+from erc20_templates import FEATURES
 
 # ---------------- GUI Logic ---------------- #
 def create_contract():
+    from erc20_gen import generate_erc20, validate_row, validate_options
     name = name_entry.get()
     symbol = symbol_entry.get()
     supply = supply_entry.get()
 
-    if not name or not symbol or not supply:
-        messagebox.showerror("Error", "All fields are required")
+    error = validate_row(name, symbol, supply)
+    if error:
+        messagebox.showerror("Error", error)
         return
 
-    if not supply.isdigit():
-        messagebox.showerror("Error", "Total Supply must be a number")
+    features = [feature for feature, var in feature_vars.items() if var.get()]
+    cap = cap_entry.get()
+    error = validate_options(supply, features, cap)
+    if error:
+        messagebox.showerror("Error", error)
         return
 
-    contract_code = generate_erc20(name, symbol, supply)
+    contract_code = generate_erc20(name, symbol, supply, features, cap or None,
+                                   optimized=optimized_var.get())
 
     file_path = filedialog.asksaveasfilename(
         defaultextension=".sol",
@@ -79,30 +41,53 @@ def create_contract():
         messagebox.showinfo("Success", "ERC20 Smart Contract Generated Successfully!")
 
 # ---------------- Tkinter UI ---------------- #
-root = tk.Tk()
-root.title("ERC20 Token Generator")
-root.geometry("400x300")
-
-tk.Label(root, text="ERC20 Token Generator", font=("Arial", 16)).pack(pady=10)
-
-tk.Label(root, text="Token Name").pack()
-name_entry = tk.Entry(root)
-name_entry.pack()
-
-tk.Label(root, text="Token Symbol").pack()
-symbol_entry = tk.Entry(root)
-symbol_entry.pack()
-
-tk.Label(root, text="Total Supply").pack()
-supply_entry = tk.Entry(root)
-supply_entry.pack()
-
-tk.Button(
-    root,
-    text="Generate Smart Contract",
-    command=create_contract,
-    bg="green",
-    fg="white"
-).pack(pady=20)
-
-root.mainloop()
+def main():
+    global name_entry, symbol_entry, supply_entry, feature_vars, cap_entry, optimized_var
+    root = tk.Tk()
+    root.title("ERC20 Token Generator")
+    root.geometry("420x450")
+
+    tk.Label(root, text="ERC20 Token Generator", font=("Arial", 16)).pack(pady=10)
+
+    tk.Label(root, text="Token Name").pack()
+    name_entry = tk.Entry(root)
+    name_entry.pack()
+
+    tk.Label(root, text="Token Symbol").pack()
+    symbol_entry = tk.Entry(root)
+    symbol_entry.pack()
+
+    tk.Label(root, text="Total Supply").pack()
+    supply_entry = tk.Entry(root)
+    supply_entry.pack()
+
+    tk.Label(root, text="Extensions").pack(pady=(10, 0))
+    features_frame = tk.Frame(root)
+    features_frame.pack()
+    feature_vars = {}
+    for feature in FEATURES:
+        feature_vars[feature] = tk.BooleanVar()
+        tk.Checkbutton(features_frame, text=feature.capitalize(),
+                       variable=feature_vars[feature]).pack(side=tk.LEFT)
+
+    tk.Label(root, text="Max Supply (Capped only)").pack()
+    cap_entry = tk.Entry(root)
+    cap_entry.pack()
+
+    optimized_var = tk.BooleanVar()
+    tk.Checkbutton(root, text="Gas-optimized output (constants, custom errors, unchecked math)",
+                   variable=optimized_var).pack(pady=(5, 0))
+
+    tk.Button(
+        root,
+        text="Generate Smart Contract",
+        command=create_contract,
+        bg="green",
+        fg="white"
+    ).pack(pady=20)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
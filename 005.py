@@ -1,23 +1,72 @@
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, ttk
+from tkinter import scrolledtext, messagebox, simpledialog, ttk
 import subprocess
 import os
 import threading
 import json
 from datetime import datetime
+from ide_console import ConsoleSink
+from ide_shards import ShardedRunner, default_workers
+from ide_cache import CompileCache
+from ide_watch import TestDaemon, affected_tests
+from ide_evm import EVMTestRunner, DEFAULT_TESTS
+from ide_results import ResultParser
+from ide_history import RunHistory
+from ide_graph import sync_migrations
+from ide_editor import CodeEditor
+import ide_runner
 
 class TruffleIDE:
     def __init__(self, root):
         self.root = root
         self.root.title("Python Truffle Suite: Solidity Unit Tester")
-        self.root.geometry("1200x850")
+        self.window_size = (1200, 850)
+        self.root.geometry("%dx%d" % self.window_size)
         self.root.minsize(900, 700)
         
         # Project Directory
         self.project_dir = "TruffleProject"
+        self.contract_file = "SimpleStorage.sol"  # path under contracts/ shown in the editor
         self.test_running = False
         self.process = None
         
+        # Sharded runs: worker count (None = one per CPU core, capped at the
+        # number of test files) and the first port of the per-shard chains
+        self.shard_workers = None
+        self.shard_base_port = 9600
+        self.shard_runner = None
+        
+        # Test backends: Truffle runs test/*.js through Node; the Python
+        # backend runs test/test_storage.py in-process against py-evm.
+        # Each backend keeps its own test editor buffer.
+        self.backends = {"truffle": "Truffle (Node)", "python": "Python EVM (offline)"}
+        self.backend = "truffle"
+        self.test_buffers = {}
+        self.evm_runner = None
+        self._evm_lock = threading.Lock()
+        
+        # Per-test records of the last run; reports go to <project>/reports.
+        # run_status is "passed"/"failed" once a run gets that far, else "error"
+        self.results = ResultParser()
+        self.run_status = None
+        self.report_dir = "reports"
+        
+        # Every run is appended here and compared with a rolling baseline
+        self.history = RunHistory("test_history.sqlite3")
+        
+        # Watch mode: one warm `truffle develop` session, re-run on edits
+        # after the editors have been idle for watch_debounce_ms
+        self.watch_debounce_ms = 400
+        self.watch_daemon = None
+        self._watch_after = None
+        self._watch_changed = set()
+        
+        # Console limits: repaint rate and scrollback kept in the widget;
+        # trimmed lines are appended to the spill file (None to discard)
+        self.console_flush_hz = 30
+        self.console_max_lines = 5000
+        self.console_spill_path = "truffle_console.log"
+        
         # Configure styles
         self.configure_styles()
         
@@ -66,10 +115,18 @@ class TruffleIDE:
         top_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
         # Left: Solidity Editor
-        left_panel = ttk.LabelFrame(top_frame, text="Solidity Contract (SimpleStorage.sol)", style="Title.TLabel")
+        left_panel = ttk.LabelFrame(top_frame, text="Solidity Contracts", style="Title.TLabel")
         left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         
-        tk.Label(left_panel, text="", font=("Arial", 1)).pack()  # Spacer
+        # Contract picker: every .sol file under contracts/
+        contract_bar = ttk.Frame(left_panel)
+        contract_bar.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.contract_var = tk.StringVar(value=self.contract_file)
+        self.contract_box = ttk.Combobox(contract_bar, textvariable=self.contract_var, state="readonly",
+                                         postcommand=self.refresh_contract_list)
+        self.contract_box.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.contract_box.bind("<<ComboboxSelected>>", self.on_contract_selected)
+        ttk.Button(contract_bar, text="New", width=6, command=self.new_contract).pack(side=tk.LEFT, padx=(5, 0))
         self.solidity_text = scrolledtext.ScrolledText(
             left_panel,
             height=20,
@@ -81,9 +138,11 @@ class TruffleIDE:
             undo=True
         )
         self.solidity_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.solidity_editor = CodeEditor(self.solidity_text, "solidity")
         
         # Right: Test Editor
         right_panel = ttk.LabelFrame(top_frame, text="Truffle Unit Test (test.js)", style="Title.TLabel")
+        self.test_panel = right_panel
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
         
         tk.Label(right_panel, text="", font=("Arial", 1)).pack()  # Spacer
@@ -98,6 +157,7 @@ class TruffleIDE:
             undo=True
         )
         self.test_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.test_editor = CodeEditor(self.test_text, "javascript")
         
         # Control Panel
         control_frame = ttk.Frame(main_container)
@@ -111,14 +171,33 @@ class TruffleIDE:
                                    command=self.init_project_structure)
         self.btn_init.pack(side=tk.LEFT, padx=2)
         
+        self.backend_var = tk.StringVar(value=self.backends[self.backend])
+        self.backend_box = ttk.Combobox(btn_container, textvariable=self.backend_var,
+                                        values=list(self.backends.values()), state="readonly", width=20)
+        self.backend_box.bind("<<ComboboxSelected>>", self.on_backend_changed)
+        self.backend_box.pack(side=tk.LEFT, padx=2)
+        
         self.btn_run = ttk.Button(btn_container, text="Run Tests", 
                                   command=self.start_test_thread, state=tk.DISABLED)
         self.btn_run.pack(side=tk.LEFT, padx=2)
         
+        self.btn_shard = ttk.Button(btn_container, text="Run Sharded", 
+                                    command=self.start_sharded_thread, state=tk.DISABLED)
+        self.btn_shard.pack(side=tk.LEFT, padx=2)
+        
+        self.watch_var = tk.BooleanVar(value=False)
+        self.chk_watch = ttk.Checkbutton(btn_container, text="Watch", variable=self.watch_var,
+                                         command=self.toggle_watch)
+        self.chk_watch.pack(side=tk.LEFT, padx=2)
+        
         self.btn_stop = ttk.Button(btn_container, text="Stop", 
                                    command=self.stop_tests, state=tk.DISABLED)
         self.btn_stop.pack(side=tk.LEFT, padx=2)
         
+        self.btn_history = ttk.Button(btn_container, text="History", 
+                                      command=self.show_history)
+        self.btn_history.pack(side=tk.LEFT, padx=2)
+        
         self.btn_clear = ttk.Button(btn_container, text="Clear Console", 
                                     command=self.clear_console)
         self.btn_clear.pack(side=tk.LEFT, padx=2)
@@ -151,6 +230,15 @@ class TruffleIDE:
             state=tk.DISABLED
         )
         self.console_log.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.solidity_text.bind("<<Modified>>", self.on_editor_modified)
+        self.test_text.bind("<<Modified>>", self.on_editor_modified)
+        self.console = ConsoleSink(
+            self.root,
+            self.console_log,
+            flush_hz=self.console_flush_hz,
+            max_lines=self.console_max_lines,
+            spill_path=self.console_spill_path
+        )
 
     def set_default_code(self):
         """Pre-fills the editors with a working example."""
@@ -187,6 +275,88 @@ contract("SimpleStorage", accounts => {
 """
         self.solidity_text.insert(tk.END, sol_code)
         self.test_text.insert(tk.END, test_code)
+        self.test_buffers = {"truffle": test_code, "python": DEFAULT_TESTS}
+
+    def on_backend_changed(self, event=None):
+        """Swap the test editor buffer when a different backend is selected."""
+        backend = next(key for key, label in self.backends.items() if label == self.backend_var.get())
+        if backend == self.backend:
+            return
+        if self.test_running:
+            messagebox.showwarning("Warning", "Tests are running!")
+            self.backend_var.set(self.backends[self.backend])
+            return
+        if self.watch_daemon:
+            self.watch_var.set(False)
+            self.stop_watch()
+        
+        self.test_buffers[self.backend] = self.test_editor.get()
+        self.backend = backend
+        self.test_editor.set(self.test_buffers[backend])
+        self.test_editor.set_language("javascript" if backend == "truffle" else "python")
+        
+        # Sharding and watch mode drive Truffle processes
+        is_truffle = backend == "truffle"
+        self.test_panel.config(text="Truffle Unit Test (test.js)" if is_truffle
+                               else "Python Unit Test (test_storage.py)")
+        self.chk_watch.config(state=tk.NORMAL if is_truffle else tk.DISABLED)
+        if not is_truffle:
+            # Load solc/py-evm now so the first run does not pay for the imports
+            threading.Thread(target=self._get_evm_runner, daemon=True).start()
+        if self.btn_run["state"] != tk.DISABLED:
+            self.btn_shard.config(state=tk.NORMAL if is_truffle else tk.DISABLED)
+        self.log(f"Test backend: {self.backends[backend]}", "INFO")
+
+    def refresh_contract_list(self):
+        """Fill the contract picker from contracts/."""
+        contracts_dir = os.path.join(self.project_dir, "contracts")
+        names = {self.contract_file}
+        for root, _dirs, files in os.walk(contracts_dir):
+            names.update(os.path.relpath(os.path.join(root, name), contracts_dir).replace(os.sep, "/")
+                         for name in files if name.endswith(".sol"))
+        self.contract_box.config(values=sorted(names))
+
+    def on_contract_selected(self, event=None):
+        """Save the contract being edited and open the selected one."""
+        name = self.contract_var.get()
+        if name == self.contract_file:
+            return
+        if self.test_running:
+            messagebox.showwarning("Warning", "Tests are running!")
+            self.contract_var.set(self.contract_file)
+            return
+        path = os.path.join(self.project_dir, "contracts", name)
+        try:
+            self.save_contract()
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        except Exception as e:
+            self.log(f"Cannot open {name}: {str(e)}", "ERROR")
+            self.contract_var.set(self.contract_file)
+            return
+        self.contract_file = name
+        self.solidity_editor.set(content, path=path)
+
+    def new_contract(self):
+        """Create contracts/<Name>.sol with an empty contract and open it."""
+        if not os.path.exists(self.project_dir):
+            messagebox.showwarning("Warning", "Please initialize the project first.")
+            return
+        name = simpledialog.askstring("New Contract", "Contract name:", parent=self.root)
+        if not name:
+            return
+        if not name.isidentifier():
+            messagebox.showerror("New Contract", f"'{name}' is not a valid contract name.")
+            return
+        path = os.path.join(self.project_dir, "contracts", f"{name}.sol")
+        if os.path.exists(path):
+            messagebox.showerror("New Contract", f"{name}.sol already exists.")
+            return
+        with open(path, "w") as f:
+            f.write(f"// SPDX-License-Identifier: MIT\npragma solidity ^0.8.0;\n\ncontract {name} {{\n}}\n")
+        self.log(f"Created: contracts/{name}.sol", "INFO")
+        self.contract_var.set(f"{name}.sol")
+        self.on_contract_selected()
 
     def log(self, message, level="INFO"):
         """Thread-safe logging to the console window with different levels."""
@@ -207,31 +377,8 @@ contract("SimpleStorage", accounts => {
         
         formatted_message = f"{timestamp} {prefix} {message}\n"
         
-        # Use after() to update UI from main thread
-        self.root.after(0, self._update_log, formatted_message, color)
-
-    def _update_log(self, message, color):
-        """Update the console log from main thread."""
-        self.console_log.config(state=tk.NORMAL)
-        
-        # Insert at the end
-        end_position = self.console_log.index(tk.END)
-        if end_position == "1.0":
-            insert_position = "1.0"
-        else:
-            # Remove the trailing newline from END to avoid double newlines
-            insert_position = self.console_log.index(tk.END + "-1c")
-        
-        self.console_log.insert(insert_position, message)
-        
-        # Apply color tag
-        start_idx = insert_position
-        end_idx = self.console_log.index(tk.END)
-        self.console_log.tag_add(color, start_idx, end_idx)
-        self.console_log.tag_config(color, foreground=color)
-        
-        self.console_log.see(tk.END)
-        self.console_log.config(state=tk.DISABLED)
+        # Buffered; painted on the main thread once per frame
+        self.console.write(formatted_message, color)
 
     def init_project_structure(self):
         """Creates the necessary folders and config files for Truffle."""
@@ -271,6 +418,12 @@ contract("SimpleStorage", accounts => {
   compilers: {
     solc: {
       version: "0.8.0",
+      settings: {
+        optimizer: {
+          enabled: false,
+          runs: 200,
+        },
+      },
     }
   }
 };
@@ -280,16 +433,10 @@ contract("SimpleStorage", accounts => {
                 f.write(config_content)
             self.log("Created: truffle-config.js", "INFO")
 
-            # 2. Create Migration Script
-            migration_content = """const SimpleStorage = artifacts.require("SimpleStorage");
-
-module.exports = function(deployer) {
-  deployer.deploy(SimpleStorage);
-};
-"""
-            migration_path = os.path.join(self.project_dir, "migrations", "1_deploy_contracts.js")
-            with open(migration_path, "w") as f:
-                f.write(migration_content)
+            # 2. Create the contract and a migration generated from the
+            # import graph (regenerated before every build)
+            self.save_contract()
+            sync_migrations(self.project_dir)
             self.log("Created: 1_deploy_contracts.js", "INFO")
 
             self.log("Project structure initialized successfully!", "SUCCESS")
@@ -297,6 +444,7 @@ module.exports = function(deployer) {
             
             # Enable run button, disable init button
             self.btn_run.config(state=tk.NORMAL)
+            self.btn_shard.config(state=tk.NORMAL if self.backend == "truffle" else tk.DISABLED)
             self.btn_init.config(state=tk.DISABLED)
             
         except Exception as e:
@@ -323,8 +471,16 @@ module.exports = function(deployer) {
             # 1. Save files first
             self.save_files()
             
-            # 2. Execute truffle test
-            self.execute_truffle_test()
+            # 2. Execute tests with the selected backend
+            self.results = ResultParser()
+            self.run_status = "error"
+            if self.backend == "python":
+                self.execute_python_test()
+            else:
+                self.execute_truffle_test()
+            
+            # 3. Slowest tests, gas hotspots and JSON/JUnit reports
+            self.report_results()
             
         except Exception as e:
             error_msg = str(e)
@@ -334,106 +490,146 @@ module.exports = function(deployer) {
             self.root.after(0, self._stop_progress)
             self.test_running = False
 
+    def start_sharded_thread(self):
+        """Runs the sharded test suite in a separate thread."""
+        if self.test_running:
+            messagebox.showwarning("Warning", "Tests are already running!")
+            return
+        
+        self.test_running = True
+        thread = threading.Thread(target=self.run_sharded_tests, daemon=True)
+        thread.start()
+
+    def run_sharded_tests(self):
+        """Split test/ across workers, each with its own chain, and merge results."""
+        self.root.after(0, self._start_progress)
+        
+        try:
+            self.save_files()
+            self.results = ResultParser()
+            self.run_status = "error"
+            self.execute_sharded_test()
+            self.report_results()
+        except Exception as e:
+            self.log(f"Unexpected error: {str(e)}", "ERROR")
+        finally:
+            self.root.after(0, self._stop_progress)
+            self.test_running = False
+
+    def execute_sharded_test(self):
+        """Execute truffle test across parallel shards."""
+        runner = ShardedRunner(
+            self.project_dir,
+            workers=self.shard_workers,
+            base_port=self.shard_base_port,
+            solc_version=CompileCache(self.project_dir).compiler_version(),
+            on_line=self.process_shard_output,
+            compile=False
+        )
+        self.shard_runner = runner
+        workers = self.shard_workers or default_workers(len(runner.test_files()))
+        self.log("=" * 60, "INFO")
+        self.log(f"Starting sharded Truffle tests ({workers} workers)...", "INFO")
+        self.log("=" * 60, "INFO")
+        
+        try:
+            self.prepare_build()
+            self.process = None
+            summary = runner.run()
+            
+            self.log("=" * 60, "INFO")
+            for shard in summary["shards"]:
+                level = "SUCCESS" if shard["returncode"] == 0 else "ERROR"
+                self.log(f"Shard {shard['shard']} (port {shard['port']}): "
+                         f"{shard['passing']} passing, {shard['failing']} failing "
+                         f"in {shard['seconds']:.1f}s - {', '.join(shard['files'])}", level)
+            total = (f"Total: {summary['passing']} passing, {summary['failing']} failing, "
+                     f"{summary['pending']} pending in {summary['seconds']:.1f}s")
+            
+            self.run_status = "passed" if summary["ok"] else "failed"
+            if summary["ok"]:
+                self.log(total, "SUCCESS")
+                self.root.after(0, lambda: self.status_lbl.config(text="Status: Success", foreground=self.success))
+            else:
+                self.log(total, "ERROR")
+                self.root.after(0, lambda: self.status_lbl.config(text="Status: Failed", foreground=self.error))
+        
+        except FileNotFoundError as e:
+            self.log(f"Error executing tests: {str(e)}. Truffle and ganache must be in PATH "
+                     "(npm install -g truffle ganache)", "ERROR")
+        except Exception as e:
+            self.log(f"Error executing tests: {str(e)}", "ERROR")
+        finally:
+            self.shard_runner = None
+            self.root.after(0, self._enable_buttons_after_test)
+
+    def process_shard_output(self, shard, line, is_error=False):
+        """Parse a line from a shard worker and log it tagged with the shard."""
+        line = line.strip()
+        if not line:
+            return
+        record = self.results.feed(line, stream=shard)
+        if shard is not None:
+            line = f"[shard {shard}] {line}"
+        self.log(line, self._output_level(line, is_error, record))
+
+    def save_contract(self):
+        """Write the contract editor to its file; return True if the file changed."""
+        path = os.path.join(self.project_dir, "contracts", self.contract_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return self.solidity_editor.save(path)
+
     def save_files(self):
         """Save Solidity contract and test files."""
         try:
-            # Get content from text widgets
-            sol_content = self.solidity_text.get("1.0", tk.END).rstrip('\n')
-            test_content = self.test_text.get("1.0", tk.END).rstrip('\n')
-
             # Check if project directory exists
             if not os.path.exists(self.project_dir):
                 raise Exception(f"Project directory '{self.project_dir}' not found. Please initialize project first.")
 
-            # Save Solidity contract
-            sol_path = os.path.join(self.project_dir, "contracts", "SimpleStorage.sol")
-            with open(sol_path, "w") as f:
-                f.write(sol_content)
-            self.log(f"Saved: {sol_path}", "INFO")
-
-            # Save test file
-            test_path = os.path.join(self.project_dir, "test", "test_storage.js")
-            with open(test_path, "w") as f:
-                f.write(test_content)
-            self.log(f"Saved: {test_path}", "INFO")
+            # Only touch files whose text changed, so mtimes stay stable; an
+            # editor untouched since its last save is not even read
+            sol_path = os.path.join(self.project_dir, "contracts", self.contract_file)
+            test_name = "test_storage.py" if self.backend == "python" else "test_storage.js"
+            test_path = os.path.join(self.project_dir, "test", test_name)
+            changed = []
+            for path, editor in ((sol_path, self.solidity_editor), (test_path, self.test_editor)):
+                if editor.save(path):
+                    changed.append(path)
+                    self.log(f"Saved: {path}", "INFO")
+                else:
+                    self.log(f"Unchanged: {path}", "INFO")
             
             self.log("Files saved successfully", "SUCCESS")
+            return changed
             
         except Exception as e:
             raise Exception(f"Failed to save files: {str(e)}")
 
+    def prepare_build(self):
+        """Make build/ match the current sources, compiling only on a cache miss."""
+        ide_runner.prepare_build(self.project_dir, self._truffle_line, on_process=self._set_process, log=self.log)
+
+    def _truffle_line(self, line, is_error):
+        self.process_output(line.strip(), is_error=is_error)
+
+    def _set_process(self, process):
+        self.process = process
+
     def execute_truffle_test(self):
         """Execute truffle test command."""
         self.log("=" * 60, "INFO")
         self.log("Starting Truffle tests...", "INFO")
         self.log("=" * 60, "INFO")
         
-        # Determine command based on OS
-        is_windows = os.name == 'nt'
-        cmd_name = "truffle.cmd" if is_windows else "truffle"
-        
         try:
-            # Check if truffle is installed
-            if is_windows:
-                test_cmd = "where" if is_windows else "which"
-            else:
-                test_cmd = "which"
-                
-            truffle_check = subprocess.run(
-                [test_cmd, "truffle" if not is_windows else "truffle.cmd"],
-                capture_output=True,
-                text=True,
-                shell=is_windows
-            )
-            
-            if truffle_check.returncode != 0:
-                raise FileNotFoundError("Truffle not found in PATH")
-            
-            # Start truffle test process
-            self.process = subprocess.Popen(
-                [cmd_name, "test"],
-                cwd=self.project_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                shell=False
-            )
-
-            # Read output line by line
-            while True:
-                # Read stdout
-                if self.process.stdout:
-                    stdout_line = self.process.stdout.readline()
-                    if stdout_line:
-                        self.process_output(stdout_line.strip())
-                
-                # Read stderr
-                if self.process.stderr:
-                    stderr_line = self.process.stderr.readline()
-                    if stderr_line:
-                        self.process_output(stderr_line.strip(), is_error=True)
-                
-                # Check if process has finished
-                if self.process.poll() is not None:
-                    # Read any remaining output
-                    remaining_stdout, remaining_stderr = self.process.communicate()
-                    
-                    if remaining_stdout:
-                        for line in remaining_stdout.split('\n'):
-                            if line.strip():
-                                self.process_output(line.strip())
-                    
-                    if remaining_stderr:
-                        for line in remaining_stderr.split('\n'):
-                            if line.strip():
-                                self.process_output(line.strip(), is_error=True)
-                    
-                    break
+            # Compile (or restore cached artifacts), then run only the tests;
+            # shared with `cli.py ide test`
+            returncode = ide_runner.run_truffle_tests(self.project_dir, self._truffle_line,
+                                                      on_process=self._set_process, log=self.log)
 
             # Check result
-            if self.process.returncode == 0:
+            self.run_status = "passed" if returncode == 0 else "failed"
+            if returncode == 0:
                 self.log("All tests passed successfully!", "SUCCESS")
                 self.root.after(0, lambda: self.status_lbl.config(text="Status: Success", foreground=self.success))
             else:
@@ -456,11 +652,171 @@ module.exports = function(deployer) {
             self.process = None
             self.root.after(0, self._enable_buttons_after_test)
 
+    def toggle_watch(self):
+        """Start or stop watch mode from the Watch checkbox."""
+        if self.watch_var.get():
+            self.start_watch()
+        else:
+            self.stop_watch()
+
+    def start_watch(self):
+        """Start a warm truffle develop session and run every test once."""
+        if self.test_running:
+            messagebox.showwarning("Warning", "Tests are already running!")
+            self.watch_var.set(False)
+            return
+        
+        try:
+            self.save_files()
+            daemon = TestDaemon(
+                self.project_dir,
+                on_line=lambda line, is_error: self.process_output(line.strip(), is_error=is_error),
+                on_ready=lambda: self.root.after(0, self._watch_ready),
+                on_done=lambda run: self.root.after(0, self._watch_done, run),
+                on_exit=lambda returncode: self.root.after(0, self._watch_exited, daemon, returncode)
+            )
+            self.watch_daemon = daemon
+            daemon.start()
+        except Exception as e:
+            self.log(f"Cannot start watch mode: {str(e)}", "ERROR")
+            self.watch_daemon = None
+            self.watch_var.set(False)
+            return
+        
+        self.log("Starting watch mode (truffle develop)...", "INFO")
+        self.status_lbl.config(text="Status: Starting watch...", foreground=self.warning)
+        self.btn_run.config(state=tk.DISABLED)
+        self.btn_shard.config(state=tk.DISABLED)
+
+    def stop_watch(self):
+        """Shut the watch session down."""
+        if self._watch_after:
+            self.root.after_cancel(self._watch_after)
+            self._watch_after = None
+        self._watch_changed.clear()
+        daemon, self.watch_daemon = self.watch_daemon, None
+        if daemon:
+            threading.Thread(target=daemon.stop, daemon=True).start()
+            self.log("Watch mode stopped", "WARNING")
+        self.status_lbl.config(text="Status: Ready", foreground="blue")
+        self._enable_buttons_after_test()
+
+    def _watch_exited(self, daemon, returncode):
+        """truffle develop died under watch mode: leave watch mode entirely."""
+        if daemon is not self.watch_daemon:
+            return  # an older session that was already stopped
+        self.log(f"truffle develop exited unexpectedly (code {returncode})", "ERROR")
+        self.watch_var.set(False)
+        self.stop_watch()
+        self.status_lbl.config(text="Status: Watch exited", foreground=self.error)
+
+    def on_editor_modified(self, event):
+        """Debounce editor changes into a single watch run."""
+        event.widget.edit_modified(False)
+        if not self.watch_daemon:
+            return
+        if self._watch_after:
+            self.root.after_cancel(self._watch_after)
+        self._watch_after = self.root.after(self.watch_debounce_ms, self._watch_fire)
+
+    def _watch_ready(self):
+        self.log("Watch mode ready", "SUCCESS")
+        if self.watch_daemon:
+            self.results = ResultParser()
+            self.watch_daemon.run([])
+
+    def _watch_fire(self):
+        self._watch_after = None
+        try:
+            self._watch_changed.update(self.save_files())
+        except Exception as e:
+            self.log(str(e), "ERROR")
+            return
+        self._watch_dispatch()
+
+    def _watch_dispatch(self):
+        """Run the tests affected by accumulated changes, unless a run is in flight."""
+        daemon = self.watch_daemon
+        if not daemon or not daemon.ready or daemon.busy or not self._watch_changed:
+            return
+        tests = affected_tests(self.project_dir, sorted(self._watch_changed))
+        self._watch_changed.clear()
+        if not tests:
+            self.log("No tests affected by this change", "INFO")
+            return
+        self.status_lbl.config(text="Status: Running...", foreground=self.warning)
+        self.results = ResultParser()
+        daemon.run(tests)
+
+    def _watch_done(self, run):
+        """Report a finished watch run and pick up edits made while it ran."""
+        first = run["first_result"]
+        timing = (f"first result {first * 1000:.0f} ms, " if first is not None else "") + \
+                 f"done in {run['elapsed'] * 1000:.0f} ms"
+        files = ", ".join(run["files"]) or "all tests"
+        self.run_status = "failed" if run["failing"] else "passed"
+        if run["failing"]:
+            self.log(f"Watch run ({files}): {run['passing']} passing, {run['failing']} failing - {timing}", "ERROR")
+            self.status_lbl.config(text="Status: Failed", foreground=self.error)
+        else:
+            self.log(f"Watch run ({files}): {run['passing']} passing - {timing}", "SUCCESS")
+            self.status_lbl.config(text="Status: Watching", foreground=self.success)
+        self.report_results()
+        self._watch_dispatch()
+
+    def execute_python_test(self):
+        """Run the Python tests in-process against an in-memory EVM."""
+        self.log("=" * 60, "INFO")
+        self.log("Starting in-process EVM tests...", "INFO")
+        self.log("=" * 60, "INFO")
+        
+        try:
+            runner = self._get_evm_runner()
+            
+            summary = ide_runner.run_python_tests(self.project_dir, runner, selected=self.contract_file)
+            
+            self.run_status = "failed" if summary["failing"] else "passed"
+            if summary["failing"] == 0:
+                self.log("All tests passed successfully!", "SUCCESS")
+                self.root.after(0, lambda: self.status_lbl.config(text="Status: Success", foreground=self.success))
+            else:
+                self.log("Tests failed", "ERROR")
+                self.root.after(0, lambda: self.status_lbl.config(text="Status: Failed", foreground=self.error))
+        
+        except Exception as e:
+            self.log(f"Error executing tests: {type(e).__name__}: {str(e)}", "ERROR")
+            self.root.after(0, lambda: self.status_lbl.config(text="Status: Failed", foreground=self.error))
+        finally:
+            self.root.after(0, self._enable_buttons_after_test)
+
+    def _get_evm_runner(self):
+        """Create the in-process runner on first use; its imports are slow."""
+        with self._evm_lock:
+            if self.evm_runner is None:
+                try:
+                    version = CompileCache(self.project_dir).compiler_version()
+                    self.evm_runner = EVMTestRunner(
+                        "0.8.0" if version == "default" else version,
+                        on_line=lambda line, is_error: self.process_output(line.strip(), is_error=is_error)
+                    )
+                except RuntimeError as e:
+                    self.log(str(e), "ERROR")
+                    raise
+            return self.evm_runner
+
     def process_output(self, line, is_error=False):
         """Process a line of output from truffle."""
         if not line:
             return
         
+        record = self.results.feed(line)
+        self.log(line, self._output_level(line, is_error, record))
+
+    def _output_level(self, line, is_error, record):
+        """Log level for an output line, from its parsed test record when there is one."""
+        if record is not None:
+            return {"passed": "SUCCESS", "failed": "ERROR", "pending": "WARNING"}[record["status"]]
+        
         # Determine log level based on content
         if is_error:
             level = "ERROR"
@@ -473,10 +829,106 @@ module.exports = function(deployer) {
         else:
             level = "INFO"
         
-        self.log(line, level)
+        return level
+
+    def report_results(self):
+        """Log the slowest tests and gas hotspots, write JSON/JUnit reports and record the run."""
+        results = self.results
+        if not results.records:
+            self.record_history()
+            return
+        
+        slowest = results.slowest(5)
+        if slowest:
+            self.log("Slowest tests:", "INFO")
+            for record in slowest:
+                self.log(f"  {record['ms']:>8.0f} ms  {record['suite']}: {record['title']}", "INFO")
+        hotspots = results.gas_hotspots(5)
+        if hotspots:
+            self.log("Gas hotspots:", "INFO")
+            for record in hotspots:
+                self.log(f"  {record['gas']:>10} gas  {record['suite']}: {record['title']}", "INFO")
+        
+        try:
+            report_dir = os.path.join(self.project_dir, self.report_dir)
+            ide_runner.write_reports(results, report_dir)
+            self.log(f"Reports written to {report_dir}", "INFO")
+        except OSError as e:
+            self.log(f"Could not write test reports: {str(e)}", "WARNING")
+        
+        self.record_history()
+
+    def record_history(self):
+        """Append the run to the history store and log regressions against the baseline."""
+        try:
+            source_hash = CompileCache(self.project_dir).source_key()
+            run_id = self.history.record_run(self.results.records, self.backend, source_hash,
+                                             self.results.summary()["ms"] / 1000, self.run_status or "error")
+            regressions = self.history.regressions(run_id)
+        except Exception as e:
+            self.log(f"Could not record run history: {str(e)}", "WARNING")
+            return
+        
+        for item in regressions:
+            details = []
+            if "time" in item["kinds"]:
+                details.append(f"{item['ms']:.0f} ms vs {item['base_ms']:.0f} ms")
+            if "gas" in item["kinds"]:
+                details.append(f"{item['gas']} gas vs {item['base_gas']:.0f}")
+            self.log(f"Regression: {item['suite']}: {item['title']} ({', '.join(details)})", "WARNING")
+        self.log(f"Recorded run #{run_id}" + (f", {len(regressions)} regression(s)" if regressions else ""), "INFO")
+
+    def show_history(self):
+        """Open a window listing recent runs and the regressions of the selected one."""
+        window = tk.Toplevel(self.root)
+        window.title("Test Run History")
+        window.geometry("820x480")
+        
+        runs_view = ttk.Treeview(window, columns=("run", "time", "backend", "source", "status", "passed", "failed",
+                                                  "seconds"), show="headings", height=10)
+        for column, heading, width in (("run", "Run", 50), ("time", "Started", 140), ("backend", "Backend", 80),
+                                       ("source", "Source", 110), ("status", "Status", 60), ("passed", "Passed", 60),
+                                       ("failed", "Failed", 60), ("seconds", "Test time", 80)):
+            runs_view.heading(column, text=heading)
+            runs_view.column(column, width=width, anchor=tk.W)
+        runs_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        ttk.Label(window, text="Regressions vs rolling baseline", style="Title.TLabel").pack(anchor=tk.W, padx=5)
+        regress_view = ttk.Treeview(window, columns=("test", "time", "gas"), show="headings", height=8)
+        for column, heading, width in (("test", "Test", 380), ("time", "Duration (ms)", 160), ("gas", "Gas", 180)):
+            regress_view.heading(column, text=heading)
+            regress_view.column(column, width=width, anchor=tk.W)
+        regress_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        for run_id, started, backend, source_hash, passed, failed, _pending, seconds, status in self.history.runs(200):
+            runs_view.insert("", tk.END, iid=str(run_id), values=(
+                run_id, datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M:%S"), backend,
+                (source_hash or "")[:12], status or "-", passed, failed, f"{seconds:.2f}s" if seconds else "-"))
+        
+        def on_select(event=None):
+            regress_view.delete(*regress_view.get_children())
+            selection = runs_view.selection()
+            if not selection:
+                return
+            for item in self.history.regressions(int(selection[0])):
+                time_text = f"{item['ms']:.0f} (base {item['base_ms']:.0f})" if "time" in item["kinds"] else ""
+                gas_text = f"{item['gas']} (base {item['base_gas']:.0f})" if "gas" in item["kinds"] else ""
+                regress_view.insert("", tk.END, values=(f"{item['suite']}: {item['title']}", time_text, gas_text))
+        
+        runs_view.bind("<<TreeviewSelect>>", on_select)
+        children = runs_view.get_children()
+        if children:
+            runs_view.selection_set(children[0])
 
     def stop_tests(self):
         """Stop the currently running test process."""
+        if self.shard_runner:
+            self.log("Stopping sharded tests...", "WARNING")
+            self.shard_runner.stop()
+            if self.process and self.process.poll() is None:
+                self.process.terminate()
+            self.root.after(0, lambda: self.status_lbl.config(text="Status: Stopped", foreground=self.warning))
+            return
         if self.process and self.process.poll() is None:
             self.log("Stopping tests...", "WARNING")
             self.process.terminate()
@@ -496,6 +948,7 @@ module.exports = function(deployer) {
         """Start progress animation and update UI for test start."""
         self.status_lbl.config(text="Status: Running...", foreground=self.warning)
         self.btn_run.config(state=tk.DISABLED)
+        self.btn_shard.config(state=tk.DISABLED)
         self.btn_stop.config(state=tk.NORMAL)
         self.btn_init.config(state=tk.DISABLED)
         self.progress.start(10)
@@ -507,24 +960,26 @@ module.exports = function(deployer) {
     def _enable_buttons_after_test(self):
         """Enable/disable buttons after test completion."""
         self.btn_run.config(state=tk.NORMAL)
+        self.btn_shard.config(state=tk.NORMAL if self.backend == "truffle" else tk.DISABLED)
         self.btn_stop.config(state=tk.DISABLED)
         self.btn_init.config(state=tk.NORMAL)
 
     def clear_console(self):
         """Clear the console output."""
-        self.console_log.config(state=tk.NORMAL)
-        self.console_log.delete(1.0, tk.END)
-        self.console_log.config(state=tk.DISABLED)
+        self.console.clear()
         self.log("Console cleared", "INFO")
 
     def on_closing(self):
         """Handle application closing."""
         if self.test_running:
-            if messagebox.askyesno("Quit", "Tests are running. Are you sure you want to quit?"):
-                self.stop_tests()
-                self.root.destroy()
-        else:
-            self.root.destroy()
+            if not messagebox.askyesno("Quit", "Tests are running. Are you sure you want to quit?"):
+                return
+            self.stop_tests()
+        if self.watch_daemon:
+            self.watch_daemon.stop()
+            self.watch_daemon = None
+        self.history.close()
+        self.root.destroy()
 
 
 def main():
@@ -532,10 +987,9 @@ def main():
     root = tk.Tk()
     app = TruffleIDE(root)
     
-    # Center window on screen
-    root.update_idletasks()
-    width = root.winfo_width()
-    height = root.winfo_height()
+    # Center window on screen using the requested size, without forcing a
+    # full layout pass before the first paint
+    width, height = app.window_size
     x = (root.winfo_screenwidth() // 2) - (width // 2)
     y = (root.winfo_screenheight() // 2) - (height // 2)
     root.geometry(f'{width}x{height}+{x}+{y}')
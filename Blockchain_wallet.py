@@ -1,71 +1,261 @@
+import os
+import sys
+import threading
 import tkinter as tk
 from tkinter import messagebox
-from web3 import Web3
 # ------------------ Blockchain Setup ------------------
 GANACHE_URL = "http://127.0.0.1:7545"
-try:
-    web3 = Web3(Web3.HTTPProvider(GANACHE_URL))
-    connected = web3.is_connected()
-except:
-    connected = False
+RPC_TIMEOUT = 5  # seconds before a node request is abandoned
+POOL_SIZE = 10     # pooled keep-alive connections to the node
 # Sample wallet (Ganache default account)
 SAMPLE_ADDRESS = "0x0000000000000000000000000000000000000000"
+# Wallets shown by "Check Wallet Balance", fetched together in batch requests;
+# entries may also be derivation paths (m/44'/60'/0'/0/<i>) from the HD index
+WATCHED_ADDRESSES = [SAMPLE_ADDRESS]
+# Derived accounts (built with `cli.py wallet derive`); the first
+# HD_WATCH_COUNT of them are added to the balance view when the file exists
+HD_INDEX_PATH = "hd_index.bin"
+HD_WATCH_COUNT = 10
+HISTORY_LIMIT = 20
+# Offline ledger behind "Simulate Transaction"; nothing is sent to the node
+SIM_RECEIVER = "0x0000000000000000000000000000000000000001"
+SIM_COINBASE = "0x00000000000000000000000000000000000000c0"
+# web3 takes over a second to import, so the window is drawn first and the
+# backend below is built on a worker thread (see load_backend); until it is
+# ready the buttons behave as in simulation mode
+Web3 = None
+web3 = None
+provider_manager = None
+balance_engine = None
+balance_cache = None
+block_subscriber = None
+tx_indexer = None
+sim_ledger = None
+hd_index = None
+rpc = None
+connected = False
+pending_balance = None
+closing = False
+root = None
+status_label = None
+# In-process seeded node started by --standin (see rpc_standin.py)
+standin_node = None
+# ------------------ Backend Loading ------------------
+def load_backend():
+    global Web3, web3, provider_manager, balance_engine, balance_cache, block_subscriber, tx_indexer, sim_ledger
+    global hd_index, WATCHED_ADDRESSES
+    from web3 import Web3
+    from wallet_rpc import BalanceEngine
+    from wallet_cache import BalanceCache
+    from wallet_provider import ProviderManager
+    from wallet_stream import BlockSubscriber
+    from ledger_sim import Ledger, GWEI
+    from tx_index import TxIndexer
+    # Creating the provider does not touch the network; the connection is probed
+    # in the background once started and re-checked while the app runs
+    # (see on_connection_status)
+    provider_manager = ProviderManager(GANACHE_URL, pool_size=POOL_SIZE, timeout=RPC_TIMEOUT,
+                                       health_interval=5.0, backoff_max=30.0)
+    web3 = provider_manager.web3
+    balance_engine = BalanceEngine(web3, chunk_size=100, max_in_flight=4)
+    # Repeated clicks within the same block are answered from memory
+    balance_cache = BalanceCache(balance_engine, max_entries=10000, ttl=300.0)
+    # Watched wallets are kept current from new blocks, so most clicks need no RPC
+    if os.path.exists(HD_INDEX_PATH):
+        from wallet_hd import KeystoreIndex
+        # Memory-mapped, so opening it does not depend on how many accounts it holds
+        hd_index = KeystoreIndex(HD_INDEX_PATH)
+        resolved = [hd_index.resolve(entry) for entry in WATCHED_ADDRESSES]
+        WATCHED_ADDRESSES = list(dict.fromkeys(resolved + hd_index.addresses(0, HD_WATCH_COUNT)))
+    block_subscriber = BlockSubscriber(balance_engine, poll_interval=2.0)
+    block_subscriber.track(WATCHED_ADDRESSES)
+    # Local history index; each lookup first catches up from its last checkpoint
+    tx_indexer = TxIndexer(web3, db_path="tx_history.sqlite3", page_size=50)
+    ledger = Ledger(base_fee=GWEI, coinbase=SIM_COINBASE)
+    ledger.fund(SAMPLE_ADDRESS, Web3.to_wei(10, 'ether'))
+    sim_ledger = ledger
+def start_backend():
+    def worker():
+        try:
+            load_backend()
+            result = (on_backend_ready,)
+        except Exception as e:
+            result = (on_backend_failed, e)
+        if not closing:
+            root.after(0, *result)
+    threading.Thread(target=worker, name="wallet-backend", daemon=True).start()
+def on_backend_ready():
+    global rpc
+    from wallet_async import BackgroundRPCClient
+    rpc = BackgroundRPCClient(root, timeout=RPC_TIMEOUT, max_in_flight=8)
+    provider_manager.on_status = lambda is_up: root.after(0, on_connection_status, is_up)
+    block_subscriber.on_update = lambda changed, number: root.after(0, on_block_update, changed, number)
+    provider_manager.start()
+def on_backend_failed(error):
+    status_label.config(text=f"Offline: {error}", fg="red")
 # ------------------ Functions ------------------
 def check_balance():
+    global pending_balance
     if not connected:
         messagebox.showinfo("Simulation Mode",
                             "Blockchain not connected.\nSimulated Balance: 10 ETH")
         return
-    try:
-        balance_wei = web3.eth.get_balance(SAMPLE_ADDRESS)
-        balance_eth = web3.from_wei(balance_wei, 'ether')
-        messagebox.showinfo("Wallet Balance",
-                            f"Wallet Address:\n{SAMPLE_ADDRESS}\n\nBalance: {balance_eth} ETH")
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    live = block_subscriber.snapshot(WATCHED_ADDRESSES)
+    if live is not None:
+        show_balances(live, f"Live at block #{block_subscriber.block_number}")
+        return
+    # A newer click supersedes a lookup that is still waiting on the node
+    if pending_balance is not None:
+        pending_balance.cancel()
+    pending_balance = rpc.submit(balance_cache.get_balances, WATCHED_ADDRESSES,
+                                 on_result=show_balances, on_error=show_rpc_error)
+def show_balances(balances, source=None):
+    lines = []
+    for address, balance_wei in balances.items():
+        balance_eth = "unavailable" if balance_wei is None else f"{web3.from_wei(balance_wei, 'ether')} ETH"
+        path = hd_index.path_of(address) if hd_index is not None else None
+        label = f"{address}\n{path}" if path else address
+        lines.append(f"Wallet Address:\n{label}\n\nBalance: {balance_eth}")
+    if source is None:
+        stats = balance_cache.stats()
+        source = f"Block #{stats['head']}  |  cache hits: {stats['hits']}, misses: {stats['misses']}"
+    lines.append(source)
+    messagebox.showinfo("Wallet Balance", "\n\n".join(lines))
+def show_rpc_error(error):
+    # Re-check the node right away rather than at the next health interval
+    provider_manager.wake()
+    if isinstance(error, TimeoutError):
+        messagebox.showerror("Error", f"The node did not answer within {RPC_TIMEOUT} seconds.")
+    else:
+        messagebox.showerror("Error", str(error))
+def on_connection_status(is_connected):
+    global connected
+    connected = is_connected
+    if connected:
+        # The node may have been restarted with a fresh chain while we were away
+        balance_cache.clear()
+        status_label.config(text="Connected to Blockchain", fg="green")
+        block_subscriber.start()
+    else:
+        # No point polling a node that is down; start() resyncs when it is back
+        block_subscriber.stop()
+        status_label.config(text="Simulation Mode (Offline)", fg="red")
+def on_block_update(changed, block_number):
+    if connected:
+        status_label.config(text=f"Connected to Blockchain  |  Block #{block_number}", fg="green")
 def simulate_transaction():
+    if sim_ledger is None:
+        messagebox.showinfo("Starting Up", "The wallet is still loading.\nPlease try again in a moment.")
+        return
+    from ledger_sim import Transfer, TransactionRejected, GWEI
+    tx = Transfer(SAMPLE_ADDRESS, SIM_RECEIVER, Web3.to_wei(1, 'ether'),
+                  nonce=sim_ledger.nonce_of(SAMPLE_ADDRESS), gas=21000, gas_price=2 * GWEI)
+    try:
+        receipt = sim_ledger.apply(tx)
+    except TransactionRejected as e:
+        messagebox.showerror("Transaction Rejected", f"Simulated transaction rejected:\n{e}")
+        return
     tx_details = (
         "Transaction Simulation\n\n"
         "From: Your Wallet\n"
         "To: Receiver Wallet\n"
-        "Amount: 1 ETH\n\n"
+        f"Amount: 1 ETH  (nonce {tx.nonce}, fee {Web3.from_wei(receipt.fee, 'ether')} ETH)\n\n"
+        f"Your balance: {Web3.from_wei(sim_ledger.balance_of(SAMPLE_ADDRESS), 'ether')} ETH\n"
+        f"Receiver balance: {Web3.from_wei(sim_ledger.balance_of(SIM_RECEIVER), 'ether')} ETH\n\n"
         "Note: This is only a simulation.\n"
         "No real transaction is performed."
     )
     messagebox.showinfo("Transaction", tx_details)
+def show_history():
+    if not connected:
+        messagebox.showinfo("Simulation Mode",
+                            "Blockchain not connected.\nTransaction history is unavailable.")
+        return
+    rpc.submit(load_history, list(WATCHED_ADDRESSES), on_result=show_history_rows,
+               on_error=show_rpc_error, timeout=120)
+def load_history(addresses):
+    # Newest HISTORY_LIMIT transfers touching any watched wallet
+    tx_indexer.sync()
+    rows = {}
+    for address in addresses:
+        for row in tx_indexer.last_transfers(address, limit=HISTORY_LIMIT):
+            rows[row["block"], row["tx_index"]] = row
+    return [rows[key] for key in sorted(rows, reverse=True)[:HISTORY_LIMIT]]
+def show_history_rows(rows):
+    if not rows:
+        watched = WATCHED_ADDRESSES[0] if len(WATCHED_ADDRESSES) == 1 else f"{len(WATCHED_ADDRESSES)} watched wallets"
+        messagebox.showinfo("Transaction History", f"No transfers found for\n{watched}")
+        return
+    mine = {address.lower() for address in WATCHED_ADDRESSES}
+    lines = []
+    for row in rows:
+        direction = "OUT" if row["from"] in mine else "IN "
+        account, other = (row["from"], row["to"]) if direction == "OUT" else (row["to"], row["from"])
+        path = hd_index.path_of(account) if hd_index is not None else None
+        wallet = f"[{path}]  " if path else (f"[{account[:10]}]  " if len(mine) > 1 else "")
+        lines.append(f"#{row['block']}  {direction}  {wallet}{web3.from_wei(row['value'], 'ether')} ETH  "
+                     f"{other or '(contract creation)'}")
+    messagebox.showinfo("Transaction History", "\n".join(lines))
+def close_app():
+    global closing
+    closing = True
+    for resource, shutdown in ((block_subscriber, "stop"), (provider_manager, "stop"),
+                               (rpc, "close"), (tx_indexer, "close"), (standin_node, "stop"),
+                               (hd_index, "close")):
+        if resource is not None:
+            getattr(resource, shutdown)()
+    root.destroy()
 # ------------------ GUI Setup ------------------
-root = tk.Tk()
-root.title("Blockchain Wallet Simulator")
-root.geometry("400x300")
-root.resizable(False, False)
-title_label = tk.Label(
-    root,
-    text="Blockchain Wallet (Python + Web3)",
-    font=("Arial", 14, "bold")
-)
-title_label.pack(pady=15)
-status_text = "Connected to Blockchain" if connected else "Simulation Mode (Offline)"
-status_label = tk.Label(root, text=status_text, fg="green" if connected else "red")
-status_label.pack(pady=5)
-balance_btn = tk.Button(
-    root,
-    text="Check Wallet Balance",
-    width=25,
-    command=check_balance
-)
-balance_btn.pack(pady=10)
-tx_btn = tk.Button(
-    root,
-    text="Simulate Transaction",
-    width=25,
-    command=simulate_transaction
-)
-tx_btn.pack(pady=10)
-exit_btn = tk.Button(
-    root,
-    text="Exit",
-    width=25,
-    command=root.destroy
-)
-exit_btn.pack(pady=10)
-root.mainloop()
\ No newline at end of file
+def main():
+    global root, status_label, GANACHE_URL, standin_node
+    # --standin: talk to a seeded local chain instead of Ganache
+    if "--standin" in sys.argv[1:]:
+        from rpc_standin import StandinNode
+        standin_node = StandinNode(blocks=50, block_time=2.0).start()
+        GANACHE_URL = standin_node.url
+    root = tk.Tk()
+    root.title("Blockchain Wallet Simulator")
+    root.geometry("400x350")
+    root.resizable(False, False)
+    title_label = tk.Label(
+        root,
+        text="Blockchain Wallet (Python + Web3)",
+        font=("Arial", 14, "bold")
+    )
+    title_label.pack(pady=15)
+    status_label = tk.Label(root, text="Connecting to Blockchain...", fg="orange")
+    status_label.pack(pady=5)
+    balance_btn = tk.Button(
+        root,
+        text="Check Wallet Balance",
+        width=25,
+        command=check_balance
+    )
+    balance_btn.pack(pady=10)
+    tx_btn = tk.Button(
+        root,
+        text="Simulate Transaction",
+        width=25,
+        command=simulate_transaction
+    )
+    tx_btn.pack(pady=10)
+    history_btn = tk.Button(
+        root,
+        text="Transaction History",
+        width=25,
+        command=show_history
+    )
+    history_btn.pack(pady=10)
+    exit_btn = tk.Button(
+        root,
+        text="Exit",
+        width=25,
+        command=close_app
+    )
+    exit_btn.pack(pady=10)
+    root.protocol("WM_DELETE_WINDOW", close_app)
+    # Load web3 and connect once the first frame is on screen
+    root.after_idle(start_backend)
+    root.mainloop()
+if __name__ == "__main__":
+    main()
\ No newline at end of file
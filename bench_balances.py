@@ -0,0 +1,68 @@
+import argparse
+import time
+from web3 import Web3
+from rpc_standin import StandinNode
+from wallet_rpc import BalanceEngine
+
+# ------------------ Balance Lookup Benchmark ------------------
+# Compares one eth_getBalance per address against batched lookups,
+# both against the local stand-in JSON-RPC server.
+
+
+def make_addresses(count):
+    return [Web3.to_checksum_address(f"0x{i + 1:040x}") for i in range(count)]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, addresses, elapsed, latencies):
+    print(f"{label:<28} {addresses / elapsed:>10.0f} addr/s   "
+          f"p50 {percentile(latencies, 50) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.2f} ms")
+
+
+def bench_single(web3, addresses):
+    latencies = []
+    start = time.perf_counter()
+    for address in addresses:
+        t0 = time.perf_counter()
+        web3.eth.get_balance(address)
+        latencies.append(time.perf_counter() - t0)
+    report("single get_balance", len(addresses), time.perf_counter() - start, latencies)
+
+
+def bench_batched(web3, addresses, chunk_size, in_flight, rounds):
+    engine = BalanceEngine(web3, chunk_size=chunk_size, max_in_flight=in_flight)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        engine.get_balances(addresses)
+        latencies.append(time.perf_counter() - t0)
+    engine.close()
+    report(f"batched chunk={chunk_size} x{in_flight}", len(addresses) * rounds,
+           time.perf_counter() - start, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single vs batched balance lookups")
+    parser.add_argument("--addresses", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    addresses = make_addresses(args.addresses)
+    with StandinNode() as node:
+        web3 = Web3(Web3.HTTPProvider(node.url))
+        print(f"Stand-in node at {node.url}, {len(addresses)} addresses")
+        bench_single(web3, addresses)
+        for chunk_size, in_flight in [(50, 1), (100, 4), (500, 4)]:
+            bench_batched(web3, addresses, chunk_size, in_flight, args.rounds)
+        print(f"HTTP requests served: {node.request_count}")
+
+
+if __name__ == "__main__":
+    main()
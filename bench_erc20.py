@@ -0,0 +1,107 @@
+import argparse
+import timeit
+from erc20_gen import generate_erc20
+from erc20_templates import FEATURES, contract_template
+
+# ------------------ ERC20 Rendering Microbenchmark ------------------
+# Compares the cached fragment templates against the original monolithic
+# f-string generate_erc20 (reproduced below) for the base token and for
+# feature variants.
+
+
+def fstring_generate_erc20(name, symbol, supply):
+    return f'''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+contract {name.replace(" ", "")}Token {{
+    string public name = "{name}";
+    string public symbol = "{symbol}";
+    uint8 public decimals = 18;
+    uint256 public totalSupply;
+
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+
+    constructor() {{
+        totalSupply = {supply} * (10 ** uint256(decimals));
+        balanceOf[msg.sender] = totalSupply;
+        emit Transfer(address(0), msg.sender, totalSupply);
+    }}
+
+    function transfer(address to, uint256 value) public returns (bool) {{
+        require(balanceOf[msg.sender] >= value, "Insufficient balance");
+        balanceOf[msg.sender] -= value;
+        balanceOf[to] += value;
+        emit Transfer(msg.sender, to, value);
+        return true;
+    }}
+
+    function approve(address spender, uint256 value) public returns (bool) {{
+        allowance[msg.sender][spender] = value;
+        emit Approval(msg.sender, spender, value);
+        return true;
+    }}
+
+    function transferFrom(address from, address to, uint256 value) public returns (bool) {{
+        require(balanceOf[from] >= value, "Insufficient balance");
+        require(allowance[from][msg.sender] >= value, "Allowance exceeded");
+
+        balanceOf[from] -= value;
+        balanceOf[to] += value;
+        allowance[from][msg.sender] -= value;
+
+        emit Transfer(from, to, value);
+        return true;
+    }}
+}}
+'''
+
+
+def measure(label, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<40} {best / number * 1e6:8.2f} us/contract")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark ERC20 rendering")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.number
+
+    assert fstring_generate_erc20("My Token", "MTK", "1000") == generate_erc20("My Token", "MTK", "1000")
+
+    baseline = measure("f-string generate_erc20 (original)",
+                       lambda: fstring_generate_erc20("My Token", "MTK", "1000"), n)
+    measure("generate_erc20 (cached fragments)",
+            lambda: generate_erc20("My Token", "MTK", "1000"), n)
+    template = contract_template(())
+    render = measure("contract_template(()).render",
+                     lambda: template.render(contract="MyToken", name="My Token",
+                                             symbol="MTK", supply="1000"), n)
+    print(f"{'render time vs f-string':<40} {render / baseline:8.2f}x")
+
+    # Variants: cached compiled templates vs formatting the assembled
+    # source with str.format, which re-parses the whole string every call
+    everything = tuple(sorted(FEATURES))
+    variant_source = contract_template(everything)
+    format_source = "".join(
+        "{" + part + "}" if (position, part) in variant_source.fields
+        else part.replace("{", "{{").replace("}", "}}")
+        for position, part in enumerate(variant_source.parts)
+    )
+    slow = measure("str.format, all features",
+                   lambda: format_source.format(contract="MyToken", name="My Token",
+                                                symbol="MTK", supply="1000", cap="5000"), n)
+    fast = measure("generate_erc20, all features (warm)",
+                   lambda: generate_erc20("My Token", "MTK", "1000", everything, 5000), n)
+    print(f"{'speed-up of cached variant vs str.format':<40} {slow / fast:8.2f}x")
+    measure("generate_erc20, all features (cold cache)",
+            lambda: (contract_template.cache_clear(),
+                     generate_erc20("My Token", "MTK", "1000", everything, 5000)), 200)
+
+if __name__ == "__main__":
+    main()
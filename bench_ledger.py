@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+from ledger_sim import Ledger, Transfer, GWEI, np
+
+# ------------------ Ledger Simulator Benchmark ------------------
+# Applies a random payment workload to the in-process ledger and reports
+# transfers per second for the scalar and vectorized batch paths.
+
+
+def make_workload(accounts, transfers, seed):
+    rng = random.Random(seed)
+    addresses = [f"0x{i + 1:040x}" for i in range(accounts)]
+    nonces = dict.fromkeys(addresses, 0)
+    txs = []
+    for _ in range(transfers):
+        sender, receiver = rng.choice(addresses), rng.choice(addresses)
+        txs.append(Transfer(sender, receiver, rng.randint(1, 10**6) * GWEI,
+                            nonces[sender], 21000, 2 * GWEI))
+        nonces[sender] += 1
+    return addresses, txs
+
+
+def fresh_ledger(addresses):
+    ledger = Ledger(base_fee=GWEI)
+    for address in addresses:
+        ledger.fund(address, 100 * 10**18)
+    return ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process ledger simulator")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--transfers", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    addresses, txs = make_workload(args.accounts, args.transfers, args.seed)
+    modes = [("scalar", False)] + ([("vectorized", True)] if np is not None else [])
+    for label, vectorized in modes:
+        ledger = fresh_ledger(addresses)
+        start = time.perf_counter()
+        receipts, rejected = ledger.apply_batch(txs, vectorized=vectorized)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} {len(txs) / elapsed:>10.0f} tx/s   "
+              f"applied {len(receipts)}, rejected {len(rejected)}")
+
+    if np is not None:
+        ledger = fresh_ledger(addresses)
+        count = len(txs)
+        columns = (
+            np.array([ledger.account_id(tx.sender) for tx in txs], np.int64),
+            np.array([ledger.account_id(tx.to) for tx in txs], np.int64),
+            np.array([tx.value // GWEI for tx in txs], np.int64),
+            np.array([tx.nonce for tx in txs], np.int64),
+            np.full(count, 21000, np.int64),
+            np.full(count, 2, np.int64),
+        )
+        start = time.perf_counter()
+        applied, rejected = ledger.apply_columns(*columns)
+        elapsed = time.perf_counter() - start
+        print(f"{'columns':<12} {count / elapsed:>10.0f} tx/s   "
+              f"applied {len(applied)}, rejected {len(rejected)}")
+
+
+if __name__ == "__main__":
+    main()
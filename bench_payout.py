@@ -0,0 +1,88 @@
+import argparse
+import random
+import time
+from eth_account import Account
+from web3 import Web3
+from rpc_standin import StandinNode
+from wallet_hd import HDKeyring
+from wallet_payout import Payment, PayoutPipeline
+
+# ------------------ Payout Benchmark ------------------
+# Sends the same set of payments from HD-derived accounts to the local
+# stand-in node twice: one at a time (get_transaction_count, sign,
+# send_raw_transaction per payment) and through PayoutPipeline, then waits
+# for every receipt. --min-gas-gwei above 1 makes the node leave the first
+# attempt of every payment in its pool, so the pipeline has to bump them;
+# payments that run out of --max-bumps first are reported stuck.
+
+MNEMONIC = "test test test test test test test test test test test junk"
+
+
+def naive(web3, keys, payments, gas_price):
+    start = time.perf_counter()
+    hashes = []
+    for payment in payments:
+        nonce = web3.eth.get_transaction_count(payment.sender, "pending")
+        signed = Account.sign_transaction({"to": payment.to, "value": payment.value, "gas": 21000,
+                                           "gasPrice": gas_price, "nonce": nonce, "chainId": web3.eth.chain_id},
+                                          keys[payment.sender])
+        hashes.append(web3.eth.send_raw_transaction(signed.raw_transaction))
+    sent = time.perf_counter() - start
+    for tx_hash in hashes:
+        web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120, poll_latency=0.1)
+    return sent, time.perf_counter() - start
+
+
+def pipelined(web3, keys, payments, args):
+    pipeline = PayoutPipeline(web3, keys, chunk_size=args.chunk, max_in_flight=args.in_flight,
+                              sign_workers=args.workers, poll_interval=0.2, stuck_after=args.stuck_after,
+                              max_bumps=args.max_bumps)
+    try:
+        start = time.perf_counter()
+        pipeline.submit(payments)
+        sent = time.perf_counter() - start
+        summary = pipeline.wait(timeout=120)
+        return sent, time.perf_counter() - start, summary
+    finally:
+        pipeline.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark one-by-one sends against the payout pipeline")
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--senders", type=int, default=4)
+    parser.add_argument("--chunk", type=int, default=50)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None, help="signing processes (default: one per core)")
+    parser.add_argument("--block-time", type=float, default=0.5)
+    parser.add_argument("--min-gas-gwei", type=float, default=0, help="pipeline run: node's minimum gas price")
+    parser.add_argument("--stuck-after", type=float, default=2.0)
+    parser.add_argument("--max-bumps", type=int, default=8, help="1.125x each; 6 reach 2 gwei from 1")
+    parser.add_argument("--skip-naive", action="store_true")
+    args = parser.parse_args()
+
+    keyring = HDKeyring(MNEMONIC)
+    keys = {keyring.address(i): keyring.private_key(i) for i in range(args.senders)}
+    rng = random.Random(0)
+    payments = [Payment(rng.choice(list(keys)), Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}"), Web3.to_wei(0.001, "ether"))
+                for _ in range(args.payments)]
+    print(f"{args.payments} payments from {args.senders} senders, block time {args.block_time}s")
+
+    if not args.skip_naive:
+        with StandinNode(block_time=args.block_time) as node:
+            web3 = Web3(Web3.HTTPProvider(node.url))
+            sent, done = naive(web3, keys, payments, web3.eth.gas_price)
+            print(f"{'one by one':<12} sent in {sent:6.2f}s ({args.payments / sent:7.1f} tx/s)   "
+                  f"all mined in {done:6.2f}s   HTTP requests: {node.request_count}")
+
+    with StandinNode(block_time=args.block_time, min_gas_price=int(args.min_gas_gwei * 10**9)) as node:
+        web3 = Web3(Web3.HTTPProvider(node.url))
+        sent, done, summary = pipelined(web3, keys, payments, args)
+        print(f"{'pipeline':<12} sent in {sent:6.2f}s ({args.payments / sent:7.1f} tx/s)   "
+              f"finished in  {done:6.2f}s   HTTP requests: {node.request_count}")
+        print(f"mined {summary['mined']}, failed {summary['failed']}, stuck {summary['stuck']}, "
+              f"pending {summary['pending']}, gas bumps {summary['bumps']}, gap fills {summary['gap_fills']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from ide_pump import OutputPump
+
+# ------------------ Output Pump Benchmark ------------------
+# Spawns a child that writes timestamped lines to stdout (and every Nth line
+# to stderr as well), then measures per-line delivery latency and the
+# reader's CPU time for OutputPump and for the old alternating readline()
+# loop from TruffleIDE.execute_truffle_test.
+
+CHILD = r"""
+import sys, time
+lines, stderr_every, payload = int(sys.argv[1]), int(sys.argv[2]), "x" * int(sys.argv[3])
+out, err = sys.stdout, sys.stderr
+for i in range(lines):
+    out.write(f"{time.monotonic()} {i} {payload}\n")
+    if stderr_every and i % stderr_every == 0:
+        err.write(f"{time.monotonic()} {i} warning\n")
+    if i % 1000 == 0:
+        out.flush(); err.flush()
+"""
+
+
+def spawn(args, text):
+    return subprocess.Popen([sys.executable, "-c", CHILD, str(args.lines), str(args.stderr_every),
+                             str(args.payload)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
+
+
+def record(latencies, line):
+    latencies.append(time.monotonic() - float(line.split(" ", 1)[0]))
+
+
+def run_pump(args):
+    process = spawn(args, text=False)
+    latencies = []
+    for line, _is_error in OutputPump(process):
+        if line:
+            record(latencies, line)
+    process.wait()
+    return latencies
+
+
+def run_legacy(args):
+    process = spawn(args, text=True)
+    latencies = []
+    while True:
+        stdout_line = process.stdout.readline()
+        if stdout_line.strip():
+            record(latencies, stdout_line)
+        stderr_line = process.stderr.readline()
+        if stderr_line.strip():
+            record(latencies, stderr_line)
+        if process.poll() is not None:
+            out, err = process.communicate()
+            for line in (out + err).split("\n"):
+                if line.strip():
+                    record(latencies, line)
+            break
+    return latencies
+
+
+def measure(label, runner, args):
+    result = {}
+
+    def target():
+        cpu = time.process_time()
+        start = time.perf_counter()
+        result["latencies"] = runner(args)
+        result["wall"] = time.perf_counter() - start
+        result["cpu"] = time.process_time() - cpu
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(args.timeout)
+    if worker.is_alive():
+        print(f"{label:<10} stalled for {args.timeout}s (pipe deadlock); aborted")
+        return
+    latencies = sorted(result["latencies"])
+    pick = lambda pct: latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] * 1000
+    print(f"{label:<10} {len(latencies):>8} lines  {result['wall']:6.2f}s wall  "
+          f"{result['cpu']:6.2f}s cpu  latency p50 {pick(50):8.2f} ms  p99 {pick(99):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark subprocess output reading")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--payload", type=int, default=80, help="extra characters per line")
+    parser.add_argument("--stderr-every", type=int, default=50, help="0 disables stderr output")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--legacy", action="store_true", help="also run the old readline loop")
+    args = parser.parse_args()
+
+    measure("pump", run_pump, args)
+    if args.legacy:
+        measure("legacy", run_legacy, args)
+
+
+if __name__ == "__main__":
+    main()
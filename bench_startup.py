@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ------------------ Startup Benchmark ------------------
+# Launches each Tk tool in a fresh interpreter through a small wrapper that
+# patches tkinter: the first Tk() call marks the end of module-level imports
+# and setup, and mainloop() waits until the window is mapped and drawn, then
+# reports and exits. Times are measured from process spawn, so they include
+# interpreter startup (reported separately as the "python" baseline).
+# Needs a display (use xvfb-run on a headless box).
+
+TOOLS = {
+    "wallet": "Blockchain_wallet.py",
+    "erc20": "004 (2).py",
+    "ide": "005.py",
+}
+
+WRAPPER = r"""
+import json, os, runpy, sys, time, tkinter
+spawned = float(sys.argv[2])
+marks = {}
+original_init = tkinter.Tk.__init__
+
+def init(self, *args, **kwargs):
+    marks.setdefault("imports", time.time() - spawned)
+    original_init(self, *args, **kwargs)
+
+def mainloop(self, n=0):
+    self.wait_visibility(self)
+    self.update_idletasks()
+    marks["first_frame"] = time.time() - spawned
+    print("STARTUP " + json.dumps(marks), flush=True)
+    os._exit(0)
+
+tkinter.Tk.__init__ = init
+tkinter.Tk.mainloop = mainloop
+tkinter.Misc.mainloop = mainloop
+path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+sys.argv = [path]
+runpy.run_path(path, run_name="__main__")
+"""
+
+
+def launch(path, timeout):
+    spawned = time.time()
+    result = subprocess.run([sys.executable, "-c", WRAPPER, path, repr(spawned)],
+                            capture_output=True, text=True, timeout=timeout,
+                            cwd=os.path.dirname(os.path.abspath(path)))
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):])
+    raise RuntimeError(f"{path} did not reach its first frame:\n{result.stderr.strip()[-500:]}")
+
+
+def python_baseline(runs):
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.time() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-frame of the Tk tools")
+    parser.add_argument("tools", nargs="*", default=list(TOOLS), help=f"any of {', '.join(TOOLS)}")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="also write the medians to this file")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    report = {"python": python_baseline(args.runs)}
+    print(f"{'tool':<8} {'imports':>10} {'first frame':>12}   (median of {args.runs}, from spawn)")
+    print(f"{'python':<8} {report['python'] * 1000:>8.0f} ms {'-':>12}")
+    for tool in args.tools:
+        samples = [launch(os.path.join(here, TOOLS[tool]), args.timeout) for _ in range(args.runs)]
+        imports = statistics.median(s["imports"] for s in samples)
+        first_frame = statistics.median(s["first_frame"] for s in samples)
+        report[tool] = {"imports": imports, "first_frame": first_frame}
+        print(f"{tool:<8} {imports * 1000:>8.0f} ms {first_frame * 1000:>9.0f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
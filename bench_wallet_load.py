@@ -0,0 +1,212 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from rpc_standin import StandinNode
+from tx_index import TxIndexer
+from wallet_cache import BalanceCache
+from wallet_provider import ProviderManager
+from wallet_rpc import BalanceEngine
+
+# ------------------ Wallet Load Generator ------------------
+# Drives the wallet's RPC paths (the same ProviderManager, BalanceEngine,
+# BalanceCache and TxIndexer objects Blockchain_wallet.py builds) at a fixed
+# target rate against a seeded stand-in node, or any --url. Requests are
+# scheduled open-loop: operation i starts at t0 + i / qps whether or not
+# earlier ones have finished, and latency is measured from that scheduled
+# time, so a slow node shows up as latency instead of a quietly lower rate.
+# --json saves the result; --baseline compares against a saved one and
+# exits 1 on a throughput or p99 regression.
+
+DEFAULT_MIX = "balance=4,cached=4,batch=1,head=2,block=1,history=1"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class WalletClient:
+    """The wallet's RPC stack, built the way load_backend() builds it."""
+
+    def __init__(self, url, addresses, pool_size=10, timeout=5.0):
+        self.manager = ProviderManager(url, pool_size=pool_size, timeout=timeout)
+        self.web3 = self.manager.web3
+        self.engine = BalanceEngine(self.web3, chunk_size=100, max_in_flight=4)
+        self.cache = BalanceCache(self.engine, max_entries=10000, ttl=300.0)
+        self.indexer = TxIndexer(self.web3, db_path=":memory:", page_size=50)
+        self.addresses = [Web3.to_checksum_address(a) for a in addresses]
+
+    def close(self):
+        self.engine.close()
+        self.indexer.close()
+        self.manager.stop()
+
+
+def op_balance(client, rng):
+    client.engine.get_balance(rng.choice(client.addresses))
+
+
+def op_cached(client, rng):
+    client.cache.get_balance(rng.choice(client.addresses))
+
+
+def op_batch(client, rng):
+    client.engine.get_balances(rng.sample(client.addresses, min(50, len(client.addresses))))
+
+
+def op_head(client, rng):
+    client.web3.eth.block_number
+
+
+def op_block(client, rng):
+    head = client.web3.eth.block_number
+    client.web3.eth.get_block(rng.randint(max(0, head - 64), head), full_transactions=True)
+
+
+def op_history(client, rng):
+    client.indexer.sync()
+    client.indexer.last_transfers(rng.choice(client.addresses), limit=20)
+
+
+OPERATIONS = {"balance": op_balance, "cached": op_cached, "batch": op_batch, "head": op_head,
+              "block": op_block, "history": op_history}
+
+
+def run_load(client, qps, duration, mix, concurrency=32, seed=0):
+    """Run the mix at `qps` for `duration` seconds; return per-operation stats."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    total = int(qps * duration)
+    plan = rng.choices(names, weights, k=total)
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+
+    def execute(name, scheduled, op_seed):
+        try:
+            OPERATIONS[name](client, random.Random(op_seed))
+            failed = False
+        except Exception:
+            failed = True
+        latency = time.perf_counter() - scheduled
+        with lock:
+            samples[name].append(latency)
+            errors[name] += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        start = time.perf_counter()
+        for i, name in enumerate(plan):
+            scheduled = start + i / qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(execute, name, scheduled, rng.random())
+    elapsed = time.perf_counter() - start
+
+    stats = {}
+    for name in names:
+        latencies = samples[name]
+        if not latencies:
+            continue
+        stats[name] = {"count": len(latencies), "errors": errors[name], "qps": len(latencies) / elapsed,
+                       "p50_ms": percentile(latencies, 50) * 1000, "p95_ms": percentile(latencies, 95) * 1000,
+                       "p99_ms": percentile(latencies, 99) * 1000}
+    done = sum(s["count"] for s in stats.values())
+    return {"target_qps": qps, "achieved_qps": done / elapsed, "seconds": elapsed,
+            "errors": sum(s["errors"] for s in stats.values()), "operations": stats}
+
+
+def compare(result, baseline, threshold):
+    """Regression messages for result vs baseline (empty when none)."""
+    problems = []
+    if result["achieved_qps"] < baseline["achieved_qps"] * (1 - threshold):
+        problems.append(f"throughput {result['achieved_qps']:.0f}/s vs {baseline['achieved_qps']:.0f}/s")
+    error_rate = result["errors"] / max(1, sum(s["count"] for s in result["operations"].values()))
+    base_rate = baseline["errors"] / max(1, sum(s["count"] for s in baseline["operations"].values()))
+    if error_rate > base_rate + 0.01:
+        problems.append(f"error rate {error_rate:.1%} vs {base_rate:.1%}")
+    for name, stats in result["operations"].items():
+        base = baseline["operations"].get(name)
+        if base and stats["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            problems.append(f"{name} p99 {stats['p99_ms']:.1f} ms vs {base['p99_ms']:.1f} ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the wallet's RPC paths at a target request rate")
+    parser.add_argument("--qps", type=float, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="use this node instead of an in-process stand-in")
+    standin = parser.add_argument_group("stand-in node")
+    standin.add_argument("--accounts", type=int, default=500)
+    standin.add_argument("--blocks", type=int, default=200)
+    standin.add_argument("--block-time", type=float, default=1.0)
+    standin.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    standin.add_argument("--jitter", type=float, default=0.0, help="extra uniform(0, jitter) seconds")
+    standin.add_argument("--error-rate", type=float, default=0.0)
+    standin.add_argument("--http-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="write the result to this file")
+    parser.add_argument("--baseline", help="compare with a result saved by --json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression vs the baseline")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    node = None
+    if args.url:
+        url, addresses = args.url, [f"0x{i + 1:040x}" for i in range(args.accounts)]
+    else:
+        node = StandinNode(seed=args.seed, accounts=args.accounts, blocks=args.blocks,
+                           block_time=args.block_time, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, http_error_rate=args.http_error_rate).start()
+        url, addresses = node.url, node.chain.accounts
+    client = WalletClient(url, addresses, pool_size=args.concurrency)
+    try:
+        print(f"Node at {url}: {args.qps:.0f} req/s for {args.duration:.0f}s, mix {args.mix}")
+        result = run_load(client, args.qps, args.duration, mix, args.concurrency, args.seed)
+    finally:
+        client.close()
+        if node:
+            node.stop()
+
+    print(f"{'operation':<10} {'count':>7} {'errors':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in result["operations"].items():
+        print(f"{name:<10} {stats['count']:>7} {stats['errors']:>7} {stats['qps']:>8.1f} "
+              f"{stats['p50_ms']:>6.2f} ms {stats['p95_ms']:>6.2f} ms {stats['p99_ms']:>6.2f} ms")
+    print(f"achieved {result['achieved_qps']:.1f} of {args.qps:.0f} req/s, {result['errors']} errors")
+    if node:
+        print(f"HTTP requests served: {node.request_count}, injected failures: {node.injected_errors}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.threshold)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import argparse
+import json
+import sys
+
+# ------------------ Headless Command Line ------------------
+# Scriptable entry points for the three tools, built on the same modules the
+# GUIs use, with no Tk import and no display needed:
+#
+#   python cli.py wallet balance <address>... [--url URL] [--json]
+#   python cli.py wallet history <address> [--limit N]
+#   python cli.py wallet derive --count N [--mnemonic-file F] [--index hd_index.bin]
+#   python cli.py wallet payout payouts.csv [--mnemonic-file F] [--index hd_index.bin]
+#                            [--cancel-stuck [--cancel-gas-gwei G]]
+#   python cli.py erc20 generate --name N --symbol S --supply X [--out file.sol]
+#   python cli.py erc20 generate --batch tokens.csv [--out dir]
+#   python cli.py ide test --project TruffleProject [--backend python] [--shards N]
+#
+# Heavy imports (web3, eth-tester) happen inside the command that needs them.
+
+GANACHE_URL = "http://127.0.0.1:7545"
+BLOCK_TAGS = ("latest", "earliest", "pending", "safe", "finalized")
+
+
+def block_id(text):
+    """argparse type: a block number (decimal or 0x-hex) or a named tag."""
+    if text in BLOCK_TAGS:
+        return text
+    try:
+        number = int(text, 16) if text.lower().startswith("0x") else int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a block number or one of {', '.join(BLOCK_TAGS)}") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError("block number cannot be negative")
+    return number
+
+
+# ---------- wallet ----------
+def wallet_balance(args):
+    from web3 import Web3
+    from wallet_provider import ProviderManager
+    from wallet_rpc import BalanceEngine
+
+    addresses = args.addresses
+    if args.hd_index:
+        from wallet_hd import KeystoreIndex
+        index = KeystoreIndex(args.hd_index)
+        try:
+            addresses = [index.resolve(int(a) if a.isdigit() else a) for a in addresses]
+        finally:
+            index.close()
+    manager = ProviderManager(args.url, timeout=args.timeout)
+    try:
+        engine = BalanceEngine(manager.web3, chunk_size=100, max_in_flight=4)
+        try:
+            balances = engine.get_balances(addresses, block=args.block)
+        finally:
+            engine.close()
+    finally:
+        manager.stop()
+    if args.json:
+        print(json.dumps({address: balance for address, balance in balances.items()}))
+    else:
+        for address, balance in balances.items():
+            shown = "unavailable" if balance is None else f"{Web3.from_wei(balance, 'ether')} ETH"
+            print(f"{address}  {shown}")
+    return 0 if all(balance is not None for balance in balances.values()) else 1
+
+
+def wallet_history(args):
+    from web3 import Web3
+    from wallet_provider import ProviderManager
+    from tx_index import TxIndexer
+
+    manager = ProviderManager(args.url, timeout=args.timeout)
+    try:
+        indexer = TxIndexer(manager.web3, db_path=args.db, page_size=50)
+        try:
+            indexer.sync()
+            rows = indexer.last_transfers(args.address, limit=args.limit)
+        finally:
+            indexer.close()
+    finally:
+        manager.stop()
+    if args.json:
+        print(json.dumps(rows))
+        return 0
+    for row in rows:
+        direction = "OUT" if row["from"] == args.address.lower() else "IN "
+        other = row["to"] if direction == "OUT" else row["from"]
+        print(f"#{row['block']}  {direction}  {Web3.from_wei(int(row['value']), 'ether')} ETH  "
+              f"{other or '(contract creation)'}")
+    return 0
+
+
+def _keyring(args):
+    import getpass
+    import os
+    from wallet_hd import HDKeyring
+
+    # Never from argv, where it would show up in the process list
+    if args.mnemonic_file:
+        with open(args.mnemonic_file) as f:
+            mnemonic = f.read().strip()
+    else:
+        mnemonic = os.environ.get("WALLET_MNEMONIC") or getpass.getpass("Mnemonic: ")
+    return HDKeyring(" ".join(mnemonic.split()), passphrase=args.passphrase or "", account=args.account)
+
+
+def wallet_derive(args):
+    import time
+    from wallet_hd import KeystoreIndex
+
+    keyring = _keyring(args)
+    start = time.perf_counter()
+    index = KeystoreIndex.build(args.index, keyring, args.count, workers=args.workers)
+    try:
+        print(f"{len(index)} accounts of m/44'/60'/{args.account}'/0 in {args.index} "
+              f"({time.perf_counter() - start:.1f}s)")
+        for i in range(min(args.show, len(index))):
+            print(f"{index.address(i)}  m/44'/60'/{args.account}'/0/{i}")
+    finally:
+        index.close()
+    return 0
+
+
+def wallet_payout(args):
+    import csv
+    from decimal import Decimal
+    from web3 import Web3
+    from wallet_hd import KeystoreIndex
+    from wallet_payout import Payment, PayoutPipeline
+    from wallet_provider import ProviderManager
+
+    # CSV rows: sender (address, derivation path or account number), recipient, amount in ETH
+    index = KeystoreIndex(args.index)
+    try:
+        with open(args.csv, newline="") as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith("#")]
+        if rows and rows[0][0].strip().lower() == "sender":
+            rows = rows[1:]
+        payments = [Payment(index.resolve(int(s) if s.strip().isdigit() else s.strip()), to.strip(),
+                            Web3.to_wei(Decimal(amount), "ether")) for s, to, amount in rows]
+        keys = _keyring(args).keys_for({p.sender for p in payments}, index)
+    finally:
+        index.close()
+
+    def on_update(tx):
+        if tx.kind == "payment" and tx.status in ("mined", "failed", "stuck", "cancelled"):
+            detail = tx.error or f"block {int(tx.receipt['blockNumber'], 16)}"
+            print(f"{tx.status:<9} nonce {tx.nonce:<5} {tx.payment.sender} -> {tx.payment.to}  {detail}", flush=True)
+
+    def to_wei(gwei):
+        return Web3.to_wei(gwei, "gwei") if gwei else None
+
+    manager = ProviderManager(args.url, timeout=args.timeout)
+    pipeline = PayoutPipeline(manager.web3, keys, chunk_size=args.chunk, max_in_flight=args.in_flight,
+                              stuck_after=args.stuck_after, max_bumps=args.max_bumps,
+                              max_gas_price=to_wei(args.max_gas_gwei), on_update=on_update)
+    try:
+        pipeline.submit(payments)
+        summary = pipeline.wait(timeout=args.wait)
+        if args.cancel_stuck and pipeline.stuck():
+            pipeline.cancel(gas_price=to_wei(args.cancel_gas_gwei))
+            summary = pipeline.wait(timeout=args.wait)
+        stuck = pipeline.stuck()
+    finally:
+        pipeline.close()
+        manager.stop()
+    if args.json:
+        print(json.dumps({**summary, "stuck_transactions": [
+            {"sender": tx.payment.sender, "nonce": tx.nonce, "gas_price": tx.gas_price, "hashes": tx.hashes}
+            for tx in stuck]}))
+    else:
+        if stuck:
+            # Still in the node's pool: any of these may be mined later, so paying them again could pay twice
+            print("Stuck transactions (may still be mined; do not pay them again, "
+                  "cancel them with --cancel-stuck or wait):")
+            for tx in stuck:
+                print(f"  {tx.payment.sender} nonce {tx.nonce} at {Web3.from_wei(tx.gas_price, 'gwei')} gwei  {tx.hash}")
+        print(f"{summary['mined']} mined, {summary['failed']} failed, {summary['cancelled']} cancelled, "
+              f"{summary['stuck']} stuck, {summary['pending']} pending, {summary['bumps']} gas bumps")
+    return 0 if summary["mined"] == summary["submitted"] else 1
+
+
+# ---------- erc20 ----------
+def erc20_generate(args):
+    from erc20_gen import generate_erc20, validate_row, validate_options, run_batch, parse_features
+
+    features = parse_features(args.features)
+    if args.batch:
+        if "capped" in features and args.cap is None:
+            print("--features capped needs --cap", file=sys.stderr)
+            return 2
+        stats = run_batch(args)
+        return 1 if stats["errors"] else 0
+
+    error = validate_row(args.name, args.symbol, args.supply) or validate_options(args.supply, features, args.cap)
+    if error:
+        print(error, file=sys.stderr)
+        return 2
+    source = generate_erc20(args.name, args.symbol, args.supply, features, args.cap, optimized=args.optimized)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(source)
+        print(f"Wrote {args.out}")
+    else:
+        sys.stdout.write(source)
+    return 0
+
+
+# ---------- ide ----------
+def ide_test(args):
+    import ide_runner
+    from ide_results import ResultParser
+
+    results = ResultParser()
+
+    def on_line(line, is_error, stream=None):
+        results.feed(line, stream=stream)
+        print(line, file=sys.stderr if is_error else sys.stdout, flush=True)
+
+    def log(message, level="INFO"):
+        print(f"[{level}] {message}", flush=True)
+
+    def record_history(status):
+        from ide_history import RunHistory
+        history = RunHistory(args.history)
+        try:
+            history.record_run(results.records, args.backend, CompileCache(project).source_key(),
+                               results.summary()["ms"] / 1000, status)
+            for item in history.regressions():
+                log(f"regression ({'/'.join(item['kinds'])}): {item['suite']}: {item['title']}", "WARNING")
+        finally:
+            history.close()
+
+    project = args.project
+    from ide_cache import CompileCache
+    version = args.solc or CompileCache(project).compiler_version()
+    try:
+        if args.backend == "python":
+            from ide_evm import EVMTestRunner
+            runner = EVMTestRunner("0.8.0" if version == "default" else version, on_line=on_line)
+            summary = ide_runner.run_python_tests(project, runner, contract=args.contract, selected=args.select)
+            ok = summary["failing"] == 0
+        elif args.shards is not None:
+            from ide_shards import ShardedRunner
+            ide_runner.prepare_build(project, on_line, log=log)
+            runner = ShardedRunner(project, workers=args.shards if args.shards > 0 else None, solc_version=version,
+                                   on_line=lambda shard, line, is_error: on_line(line, is_error, stream=shard),
+                                   compile=False)
+            summary = runner.run()
+            for shard in summary["shards"]:
+                log(f"Shard {shard['shard']}: {shard['passing']} passing, {shard['failing']} failing "
+                    f"in {shard['seconds']:.1f}s", "INFO")
+            ok = summary["ok"]
+        else:
+            ok = ide_runner.run_truffle_tests(project, on_line, log=log) == 0
+    except Exception:
+        if args.history:
+            record_history("error")  # a run that never got to its tests is history too
+        raise
+
+    counts = results.summary()
+    log(f"{counts['passed']} passed, {counts['failed']} failed, {counts['pending']} pending",
+        "SUCCESS" if ok else "ERROR")
+    for record in results.slowest(args.slowest):
+        log(f"slow: {record['ms']:.0f} ms  {record['suite']}: {record['title']}", "INFO")
+    if args.report_dir:
+        for path in ide_runner.write_reports(results, args.report_dir):
+            log(f"Wrote {path}", "INFO")
+    if args.history:
+        record_history("passed" if ok else "failed")
+    return 0 if ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless wallet, ERC20 generator and test runner")
+    tools = parser.add_subparsers(dest="tool", required=True)
+
+    wallet = tools.add_parser("wallet", help="query balances and history from the node")
+    wallet_commands = wallet.add_subparsers(dest="command", required=True)
+    balance = wallet_commands.add_parser("balance", help="ETH balance of one or more addresses")
+    balance.add_argument("addresses", nargs="+")
+    balance.add_argument("--block", type=block_id, default="latest", help="block number or tag (default: latest)")
+    history = wallet_commands.add_parser("history", help="recent transfers of an address")
+    history.add_argument("address")
+    history.add_argument("--limit", type=int, default=20)
+    history.add_argument("--db", default="tx_history.sqlite3")
+    balance.add_argument("--hd-index", default=None,
+                         help="also accept derivation paths and account numbers from this index file")
+    for command, handler in ((balance, wallet_balance), (history, wallet_history)):
+        command.add_argument("--url", default=GANACHE_URL)
+        command.add_argument("--timeout", type=float, default=5.0)
+        command.add_argument("--json", action="store_true")
+        command.set_defaults(handler=handler)
+    derive = wallet_commands.add_parser("derive", help="derive HD accounts into a keystore index")
+    derive.add_argument("--count", type=int, required=True)
+    derive.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    derive.add_argument("--show", type=int, default=5, help="print the first N addresses")
+    derive.set_defaults(handler=wallet_derive)
+    payout = wallet_commands.add_parser("payout", help="sign and send the transfers in a CSV file")
+    payout.add_argument("csv", help="rows of: sender (address, path or account number), recipient, ETH")
+    payout.add_argument("--url", default=GANACHE_URL)
+    payout.add_argument("--timeout", type=float, default=5.0)
+    payout.add_argument("--chunk", type=int, default=50, help="transactions per batch request")
+    payout.add_argument("--in-flight", type=int, default=4, help="batch requests in flight")
+    payout.add_argument("--stuck-after", type=float, default=30.0, help="seconds before a gas bump")
+    payout.add_argument("--max-bumps", type=int, default=3)
+    payout.add_argument("--max-gas-gwei", type=float, default=None)
+    payout.add_argument("--wait", type=float, default=600.0, help="seconds to wait for receipts")
+    payout.add_argument("--cancel-stuck", action="store_true",
+                        help="replace transactions still pending after the last bump with no-op transfers")
+    payout.add_argument("--cancel-gas-gwei", type=float, default=None,
+                        help="gas price for the cancelling transfers (default: one bump above the stuck one)")
+    payout.add_argument("--json", action="store_true")
+    payout.set_defaults(handler=wallet_payout)
+    for command in (derive, payout):
+        command.add_argument("--account", type=int, default=0, help="BIP-44 account (m/44'/60'/<account>')")
+        command.add_argument("--mnemonic-file", default=None, help="default: $WALLET_MNEMONIC, else prompt")
+        command.add_argument("--passphrase", default=None)
+        command.add_argument("--index", default="hd_index.bin")
+
+    erc20 = tools.add_parser("erc20", help="generate ERC20 contracts")
+    erc20_commands = erc20.add_subparsers(dest="command", required=True)
+    generate = erc20_commands.add_parser("generate", help="one token from options, or a batch file")
+    from erc20_gen import add_batch_arguments
+    add_batch_arguments(generate, batch_required=False)
+    generate.add_argument("--name")
+    generate.add_argument("--symbol")
+    generate.add_argument("--supply")
+    generate.set_defaults(handler=erc20_generate)
+
+    ide = tools.add_parser("ide", help="run a Truffle project's tests")
+    ide_commands = ide.add_subparsers(dest="command", required=True)
+    test = ide_commands.add_parser("test", help="run the project's tests")
+    test.add_argument("--project", default="TruffleProject")
+    test.add_argument("--backend", choices=("truffle", "python"), default="truffle")
+    test.add_argument("--shards", type=int, default=None,
+                      help="truffle backend: run on N parallel chains (0 = one per CPU core)")
+    test.add_argument("--contract", default=None,
+                      help="python backend: test this contract file alone instead of the whole project")
+    test.add_argument("--select", default=None, metavar="FILE",
+                      help="python backend: contract file whose main contract the tests' `contract` fixture is "
+                           "(default: --contract, else the last contract built)")
+    test.add_argument("--solc", default=None, help="solc version (default: the one in truffle-config.js)")
+    test.add_argument("--report-dir", default=None, help="write test-results.json and junit.xml here")
+    test.add_argument("--history", default=None, help="append the run to this SQLite history file")
+    test.add_argument("--slowest", type=int, default=5)
+    test.set_defaults(handler=ide_test)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
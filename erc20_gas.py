@@ -0,0 +1,98 @@
+import argparse
+from erc20_gen import generate_erc20
+from erc20_templates import FEATURES
+
+try:
+    import solcx
+except ImportError:
+    solcx = None
+
+try:
+    import eth_tester
+except ImportError:
+    eth_tester = None
+from web3 import Web3, EthereumTesterProvider
+
+# ---------------- Offline Gas Estimator ---------------- #
+# Compiles a generated token with a cached solc binary (py-solc-x), deploys it
+# to an in-memory py-evm chain (eth-tester) and records the gas actually used
+# by deployment and by a fixed script of calls. Running the script against
+# the standard and the gas-optimized variant gives a like-for-like comparison.
+#
+#   pip install py-solc-x "eth-tester[py-evm]"
+
+SOLC_VERSION = "0.8.20"
+TOKEN = 10**18
+
+
+def compile_source(source, solc_version=SOLC_VERSION, optimize_runs=200):
+    """Return (abi, bytecode) of the single contract in `source`."""
+    if solcx is None:
+        raise RuntimeError("py-solc-x is required: pip install py-solc-x")
+    if solc_version not in {str(v) for v in solcx.get_installed_solc_versions()}:
+        solcx.install_solc(solc_version)  # downloaded once, then cached
+    compiled = solcx.compile_source(source, output_values=["abi", "bin"], solc_version=solc_version,
+                                    optimize=True, optimize_runs=optimize_runs)
+    (contract,) = compiled.values()
+    return contract["abi"], contract["bin"]
+
+
+def measure_gas(source, solc_version=SOLC_VERSION):
+    """Gas used by deployment and each scripted call, as an ordered dict."""
+    if eth_tester is None:
+        raise RuntimeError('eth-tester is required: pip install "eth-tester[py-evm]"')
+    abi, bytecode = compile_source(source, solc_version)
+    w3 = Web3(EthereumTesterProvider())
+    owner, alice, bob = w3.eth.accounts[:3]
+
+    tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact({"from": owner})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    results = {"deploy": receipt.gasUsed}
+    token = w3.eth.contract(address=receipt.contractAddress, abi=abi)
+    functions = {entry["name"] for entry in abi if entry["type"] == "function"}
+
+    # Each step is (label, function, sender, args); steps for absent features are skipped
+    script = [
+        ("transfer (new holder)", "transfer", owner, (alice, 10 * TOKEN)),
+        ("transfer (existing holder)", "transfer", owner, (alice, TOKEN)),
+        ("approve", "approve", alice, (bob, 5 * TOKEN)),
+        ("transferFrom", "transferFrom", bob, (alice, bob, TOKEN)),
+        ("mint", "mint", owner, (alice, TOKEN)),
+        ("burn", "burn", alice, (TOKEN,)),
+        ("pause", "pause", owner, ()),
+        ("unpause", "unpause", owner, ()),
+    ]
+    for label, function, sender, args in script:
+        if function not in functions:
+            continue
+        tx_hash = token.functions[function](*args).transact({"from": sender})
+        results[label] = w3.eth.wait_for_transaction_receipt(tx_hash).gasUsed
+    return results
+
+
+def compare(name, symbol, supply, features=(), cap=None):
+    """Measure the standard and optimized variants; return {label: (standard, optimized)}."""
+    standard = measure_gas(generate_erc20(name, symbol, supply, features, cap))
+    optimized = measure_gas(generate_erc20(name, symbol, supply, features, cap, optimized=True))
+    return {label: (standard[label], optimized.get(label)) for label in standard}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate gas for standard vs optimized ERC20 output")
+    parser.add_argument("--name", default="My Token")
+    parser.add_argument("--symbol", default="MTK")
+    parser.add_argument("--supply", default="1000")
+    parser.add_argument("--features", default="", help=f"comma-separated: {', '.join(FEATURES)}")
+    parser.add_argument("--cap", type=int, default=None)
+    args = parser.parse_args()
+
+    features = [f.strip() for f in args.features.split(",") if f.strip()]
+    rows = compare(args.name, args.symbol, args.supply, features, args.cap)
+    print(f"{'operation':<28} {'standard':>10} {'optimized':>10} {'saved':>8}")
+    for label, (standard, optimized) in rows.items():
+        saved = f"{(standard - optimized) / standard:7.1%}" if optimized else "      -"
+        print(f"{label:<28} {standard:>10} {optimized if optimized else '-':>10} {saved:>8}")
+
+
+if __name__ == "__main__":
+    main()
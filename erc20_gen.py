@@ -0,0 +1,177 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from erc20_templates import FEATURES, contract_template, normalize_features
+
+# ---------------- ERC20 Rendering ---------------- #
+# Contracts are assembled from the cached fragments in erc20_templates, so
+# rendering a token is a single join with no format-string parsing.
+def contract_name(name):
+    return name.replace(" ", "")
+
+
+def generate_erc20(name, symbol, supply, features=(), cap=None, optimized=False):
+    """Solidity source for one token; features is any of mintable, burnable,
+    pausable, capped (capped needs cap, in whole tokens like supply).
+    optimized=True emits the gas-optimized variant with the same functions."""
+    features = normalize_features(features)
+    if "capped" in features and cap is None:
+        raise ValueError("The capped feature needs a cap")
+    return contract_template(features, "optimized" if optimized else "standard").render(
+        contract=contract_name(name), name=name, symbol=symbol, supply=str(supply), cap=str(cap))
+
+
+# ---------------- Batch Mode ---------------- #
+def validate_row(name, symbol, supply):
+    """Same rules as the GUI form; returns an error message or None."""
+    if not name or not symbol or not supply:
+        return "All fields are required"
+    if not str(supply).isdigit():
+        return "Total Supply must be a number"
+    return None
+
+
+def validate_options(supply, features, cap):
+    """Check the extension options against a valid supply; returns an error message or None."""
+    if "capped" not in features:
+        return None
+    if not str(cap or "").isdigit():
+        return "Max Supply must be a number for a capped token"
+    if int(cap) < int(supply):
+        return "Max Supply cannot be below Total Supply"
+    return None
+
+
+def read_rows(path):
+    """Read (name, symbol, supply) rows from a CSV (with header) or JSON file."""
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        return [(r["name"], r["symbol"], str(r["supply"])) if isinstance(r, dict)
+                else (r[0], r[1], str(r[2])) for r in data]
+    with open(path, newline="") as f:
+        return [(r["name"], r["symbol"], r["supply"].strip()) for r in csv.DictReader(f)]
+
+
+def row_key(row, features=(), cap=None, optimized=False):
+    key = "\x1f".join((*row, ",".join(features), str(cap), "optimized" if optimized else ""))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def output_name(name, symbol, supply, features=(), optimized=False):
+    safe_symbol = re.sub(r"[^A-Za-z0-9_-]", "_", symbol)
+    suffix = "".join(f"_{feature}" for feature in features) + ("_optimized" if optimized else "")
+    return f"{re.sub(r'[^A-Za-z0-9_]', '_', contract_name(name))}Token_{safe_symbol}_{supply}{suffix}.sol"
+
+
+def _render_chunk(rows, out_dir, features=(), cap=None, optimized=False):
+    """Worker: render and write one chunk of rows; return bytes written."""
+    written = 0
+    for name, symbol, supply in rows:
+        data = generate_erc20(name, symbol, supply, features, cap, optimized).encode()
+        path = os.path.join(out_dir, output_name(name, symbol, supply, features, optimized))
+        with open(path, "wb", buffering=1 << 16) as f:
+            f.write(data)
+        written += len(data)
+    return written
+
+
+def generate_batch(rows, out_dir, workers=None, chunk_size=500, features=(), cap=None,
+                   optimized=False):
+    """Generate contracts for all new rows into out_dir and return a stats dict.
+
+    Rows that fail validation are reported, identical rows are rendered once,
+    and rows already listed in out_dir's manifest from an earlier run are
+    skipped.
+    """
+    start = time.perf_counter()
+    features = normalize_features(features)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, ".erc20_manifest")
+    done = set()
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            done = set(f.read().split())
+
+    errors, todo, keys = [], [], []
+    for line_no, row in enumerate(rows, start=1):
+        error = validate_row(*row) or validate_options(row[2], features, cap)
+        if error:
+            errors.append((line_no, error))
+            continue
+        key = row_key(row, features, cap, optimized)
+        if key in done:
+            continue
+        done.add(key)
+        keys.append(key)
+        todo.append(row)
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    if len(chunks) <= 1:
+        # Not worth starting a process pool
+        written = sum(_render_chunk(chunk, out_dir, features, cap, optimized) for chunk in chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n = len(chunks)
+            written = sum(pool.map(_render_chunk, chunks, [out_dir] * n, [features] * n,
+                                   [cap] * n, [optimized] * n))
+
+    if keys:
+        with open(manifest_path, "a") as f:
+            f.write("\n".join(keys) + "\n")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": len(rows),
+        "generated": len(todo),
+        "skipped": len(rows) - len(todo) - len(errors),
+        "errors": errors,
+        "bytes": written,
+        "seconds": elapsed,
+        "per_second": len(todo) / elapsed if elapsed else 0.0,
+    }
+
+
+def add_batch_arguments(parser, batch_required=True):
+    """Options shared by this script and `cli.py erc20 generate`."""
+    parser.add_argument("--batch", required=batch_required, help="CSV (name,symbol,supply) or JSON file")
+    parser.add_argument("--out", default=None, help="output directory (default: generated_tokens)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--features", default="",
+                        help=f"comma-separated extras: {', '.join(FEATURES)}")
+    parser.add_argument("--cap", type=int, default=None, help="max supply for the capped feature")
+    parser.add_argument("--optimized", action="store_true", help="emit the gas-optimized variant")
+
+
+def parse_features(text):
+    return [f.strip() for f in text.split(",") if f.strip()]
+
+
+def run_batch(args):
+    """Run a batch from parsed arguments, print a summary and return the stats."""
+    stats = generate_batch(read_rows(args.batch), args.out or "generated_tokens", workers=args.workers,
+                           features=parse_features(args.features), cap=args.cap, optimized=args.optimized)
+    for line_no, error in stats["errors"]:
+        print(f"row {line_no}: {error}")
+    print(f"{stats['generated']} generated, {stats['skipped']} skipped, "
+          f"{len(stats['errors'])} invalid in {stats['seconds']:.2f}s "
+          f"({stats['per_second']:.0f} contracts/s, {stats['bytes'] / 1e6:.1f} MB)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate ERC20 contracts in bulk")
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    if "capped" in parse_features(args.features) and args.cap is None:
+        parser.error("--features capped needs --cap")
+    run_batch(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+from functools import lru_cache
+from string import Formatter
+
+# ---------------- ERC20 Template Fragments ---------------- #
+# A contract is assembled from a base token plus optional feature fragments.
+# Every fragment contributes text to named sections of the contract and the
+# sections are joined in a fixed order. Fragment sources use str.format
+# syntax; `{{`/`}}` are literal braces.
+#
+# Two kinds of fields appear in the sources:
+#   * render fields (contract, name, symbol, supply, cap) differ per token;
+#   * slot fields (transfer_guard, mint_guard) let one feature hook into
+#     another feature's code and are fixed once the feature set is known.
+# Each feature combination is assembled, parsed and slot-filled once and then
+# cached, so rendering a token is a single join over precompiled parts.
+
+BASE = {
+    "header": '''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+contract {contract}Token {{
+''',
+    "state": '''    string public name = "{name}";
+    string public symbol = "{symbol}";
+    uint8 public decimals = 18;
+    uint256 public totalSupply;
+
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+''',
+    "events": '''
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+''',
+    "constructor": '''        totalSupply = {supply} * (10 ** uint256(decimals));
+        balanceOf[msg.sender] = totalSupply;
+        emit Transfer(address(0), msg.sender, totalSupply);
+''',
+    "functions": '''
+    function transfer(address to, uint256 value) public{transfer_guard} returns (bool) {{
+        require(balanceOf[msg.sender] >= value, "Insufficient balance");
+        balanceOf[msg.sender] -= value;
+        balanceOf[to] += value;
+        emit Transfer(msg.sender, to, value);
+        return true;
+    }}
+
+    function approve(address spender, uint256 value) public returns (bool) {{
+        allowance[msg.sender][spender] = value;
+        emit Approval(msg.sender, spender, value);
+        return true;
+    }}
+
+    function transferFrom(address from, address to, uint256 value) public{transfer_guard} returns (bool) {{
+        require(balanceOf[from] >= value, "Insufficient balance");
+        require(allowance[from][msg.sender] >= value, "Allowance exceeded");
+
+        balanceOf[from] -= value;
+        balanceOf[to] += value;
+        allowance[from][msg.sender] -= value;
+
+        emit Transfer(from, to, value);
+        return true;
+    }}
+''',
+    "footer": '''}}
+''',
+}
+
+# Shared by mintable and pausable; pulled in automatically
+OWNABLE = {
+    "state": '''    address public owner;
+''',
+    "modifiers": '''
+    modifier onlyOwner() {{
+        require(msg.sender == owner, "Not owner");
+        _;
+    }}
+''',
+    "constructor": '''        owner = msg.sender;
+''',
+}
+
+MINTABLE = {
+    "functions": '''
+    function mint(address to, uint256 value) public onlyOwner{transfer_guard} returns (bool) {{{mint_guard}
+        totalSupply += value;
+        balanceOf[to] += value;
+        emit Transfer(address(0), to, value);
+        return true;
+    }}
+''',
+}
+
+BURNABLE = {
+    "functions": '''
+    function burn(uint256 value) public{transfer_guard} returns (bool) {{
+        require(balanceOf[msg.sender] >= value, "Insufficient balance");
+        balanceOf[msg.sender] -= value;
+        totalSupply -= value;
+        emit Transfer(msg.sender, address(0), value);
+        return true;
+    }}
+''',
+}
+
+PAUSABLE = {
+    "state": '''    bool public paused;
+''',
+    "events": '''    event Paused(address account);
+    event Unpaused(address account);
+''',
+    "modifiers": '''
+    modifier whenNotPaused() {{
+        require(!paused, "Token is paused");
+        _;
+    }}
+''',
+    "functions": '''
+    function pause() public onlyOwner {{
+        paused = true;
+        emit Paused(msg.sender);
+    }}
+
+    function unpause() public onlyOwner {{
+        paused = false;
+        emit Unpaused(msg.sender);
+    }}
+''',
+}
+
+CAPPED = {
+    "state": '''    uint256 public cap = {cap} * (10 ** uint256(decimals));
+''',
+    "constructor": '''        require(totalSupply <= cap, "Cap exceeded");
+''',
+}
+
+FEATURES = {
+    "mintable": MINTABLE,
+    "burnable": BURNABLE,
+    "pausable": PAUSABLE,
+    "capped": CAPPED,
+}
+
+# Values for slot fields, per feature; a slot is empty unless a feature fills it
+SLOTS = {
+    "pausable": {"transfer_guard": " whenNotPaused"},
+    "capped": {"mint_guard": '\n        require(totalSupply + value <= cap, "Cap exceeded");'},
+}
+SLOT_FIELDS = ("transfer_guard", "mint_guard")
+
+# ---------------- Gas-optimized Fragments ---------------- #
+# Same features and the same public functions, written for lower gas:
+#   * name, symbol, decimals and cap are constants and owner is immutable,
+#     so they take no storage slots and reads cost no SLOAD;
+#   * custom errors replace revert strings (smaller bytecode, cheaper reverts);
+#   * balances and allowances are read once, and the subtraction after a
+#     check is `unchecked` because the check already rules out underflow.
+#     Credits are unchecked too: no balance can exceed totalSupply, and
+#     totalSupply itself is only ever increased with checked arithmetic.
+OPTIMIZED_BASE = {
+    "header": '''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.4;
+
+contract {contract}Token {{
+''',
+    "state": '''    string public constant name = "{name}";
+    string public constant symbol = "{symbol}";
+    uint8 public constant decimals = 18;
+    uint256 public totalSupply;
+
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+''',
+    "events": BASE["events"],
+    "errors": '''
+    error InsufficientBalance();
+    error AllowanceExceeded();
+''',
+    "constructor": '''        uint256 supply = {supply} * 10 ** 18;
+        totalSupply = supply;
+        balanceOf[msg.sender] = supply;
+        emit Transfer(address(0), msg.sender, supply);
+''',
+    "functions": '''
+    function transfer(address to, uint256 value) public{transfer_guard} returns (bool) {{
+        uint256 balance = balanceOf[msg.sender];
+        if (balance < value) revert InsufficientBalance();
+        unchecked {{
+            balanceOf[msg.sender] = balance - value;
+            balanceOf[to] += value;
+        }}
+        emit Transfer(msg.sender, to, value);
+        return true;
+    }}
+
+    function approve(address spender, uint256 value) public returns (bool) {{
+        allowance[msg.sender][spender] = value;
+        emit Approval(msg.sender, spender, value);
+        return true;
+    }}
+
+    function transferFrom(address from, address to, uint256 value) public{transfer_guard} returns (bool) {{
+        uint256 balance = balanceOf[from];
+        if (balance < value) revert InsufficientBalance();
+        uint256 allowed = allowance[from][msg.sender];
+        if (allowed < value) revert AllowanceExceeded();
+
+        unchecked {{
+            balanceOf[from] = balance - value;
+            balanceOf[to] += value;
+            allowance[from][msg.sender] = allowed - value;
+        }}
+
+        emit Transfer(from, to, value);
+        return true;
+    }}
+''',
+    "footer": BASE["footer"],
+}
+
+OPTIMIZED_OWNABLE = {
+    "state": '''    address public immutable owner;
+''',
+    "errors": '''    error NotOwner();
+''',
+    "modifiers": '''
+    modifier onlyOwner() {{
+        if (msg.sender != owner) revert NotOwner();
+        _;
+    }}
+''',
+    "constructor": OWNABLE["constructor"],
+}
+
+OPTIMIZED_FEATURES = {
+    "mintable": {
+        "functions": '''
+    function mint(address to, uint256 value) public onlyOwner{transfer_guard} returns (bool) {{
+        uint256 supply = totalSupply + value;{mint_guard}
+        totalSupply = supply;
+        unchecked {{
+            balanceOf[to] += value;
+        }}
+        emit Transfer(address(0), to, value);
+        return true;
+    }}
+''',
+    },
+    "burnable": {
+        "functions": '''
+    function burn(uint256 value) public{transfer_guard} returns (bool) {{
+        uint256 balance = balanceOf[msg.sender];
+        if (balance < value) revert InsufficientBalance();
+        unchecked {{
+            balanceOf[msg.sender] = balance - value;
+            totalSupply -= value;
+        }}
+        emit Transfer(msg.sender, address(0), value);
+        return true;
+    }}
+''',
+    },
+    "pausable": {
+        "state": PAUSABLE["state"],
+        "events": PAUSABLE["events"],
+        "errors": '''    error TokenPaused();
+''',
+        "modifiers": '''
+    modifier whenNotPaused() {{
+        if (paused) revert TokenPaused();
+        _;
+    }}
+''',
+        "functions": PAUSABLE["functions"],
+    },
+    "capped": {
+        "state": '''    uint256 public constant cap = {cap} * 10 ** 18;
+''',
+        "errors": '''    error CapExceeded();
+''',
+        "constructor": '''        if (supply > cap) revert CapExceeded();
+''',
+    },
+}
+
+OPTIMIZED_SLOTS = {
+    "pausable": SLOTS["pausable"],
+    "capped": {"mint_guard": "\n        if (supply > cap) revert CapExceeded();"},
+}
+
+FLAVORS = {
+    "standard": (BASE, OWNABLE, FEATURES, SLOTS),
+    "optimized": (OPTIMIZED_BASE, OPTIMIZED_OWNABLE, OPTIMIZED_FEATURES, OPTIMIZED_SLOTS),
+}
+
+
+class CompiledTemplate:
+    """A str.format-style template compiled once into a render function.
+
+    The literal text and field names are split out a single time; the
+    template is then turned into one generated f-string function, so
+    render() costs the same as a hand-written f-string.
+    """
+
+    def __init__(self, source="", parts=None, fields=None):
+        if parts is None:
+            parts, fields = [], []
+            for literal, field, _spec, _conv in Formatter().parse(source):
+                if literal:
+                    parts.append(literal)
+                if field is not None:
+                    fields.append((len(parts), field))
+                    parts.append(field)
+        self.parts = parts    # literal strings and field names, in order
+        self.fields = fields  # (position in parts, field name)
+        self.render = self._compile()
+
+    def bind(self, **values):
+        """Fill some fields now and merge them into the surrounding literals."""
+        parts, fields = [], []
+        pending = ""
+        field_at = dict(self.fields)
+        for position, part in enumerate(self.parts):
+            if position in field_at and part not in values:
+                if pending:
+                    parts.append(pending)
+                    pending = ""
+                fields.append((len(parts), part))
+                parts.append(part)
+            else:
+                pending += values[part] if position in field_at else part
+        if pending:
+            parts.append(pending)
+        return CompiledTemplate(parts=parts, fields=fields)
+
+    def _compile(self):
+        field_at = dict(self.fields)
+        names = sorted(set(field_at.values()))
+        if not all(name.isidentifier() for name in names):
+            raise ValueError(f"Template fields must be identifiers: {names}")
+        body = "".join(
+            "{" + part + "}" if position in field_at
+            else part.replace("{", "{{").replace("}", "}}")
+            for position, part in enumerate(self.parts)
+        )
+        params = "".join(f"{name}, " for name in names)
+        namespace = {}
+        exec(f"def render(*, {params}**_unused):\n    return f{body!r}\n", namespace)
+        return namespace["render"]
+
+
+def normalize_features(features):
+    """Validate feature names and return them as a sorted tuple (the cache key)."""
+    return _normalize_features(tuple(features))
+
+
+@lru_cache(maxsize=256)
+def _normalize_features(features):
+    features = tuple(sorted(set(features)))
+    unknown = [f for f in features if f not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown feature(s): {', '.join(unknown)}. "
+                         f"Choose from: {', '.join(FEATURES)}")
+    return features
+
+
+@lru_cache(maxsize=None)
+def contract_template(features=(), flavor="standard"):
+    """Compiled template for a feature combination (sorted tuple of names)
+    in the "standard" or gas-"optimized" flavor."""
+    base, ownable, feature_fragments, feature_slots = FLAVORS[flavor]
+    fragments = [base]
+    if "mintable" in features or "pausable" in features:
+        fragments.append(ownable)
+    fragments.extend(feature_fragments[f] for f in ("capped", "pausable", "mintable", "burnable")
+                     if f in features)
+
+    def section(name):
+        return "".join(fragment.get(name, "") for fragment in fragments)
+
+    feature_state = "".join(fragment.get("state", "") for fragment in fragments[1:])
+    source = "".join([
+        section("header"), base["state"], "\n" if feature_state else "", feature_state,
+        section("events"), section("errors"), section("modifiers"),
+        "\n    constructor() {{\n", section("constructor"), "    }}\n",
+        section("functions"), section("footer"),
+    ])
+    slots = dict.fromkeys(SLOT_FIELDS, "")
+    for feature in features:
+        slots.update(feature_slots.get(feature, {}))
+    return CompiledTemplate(source).bind(**slots)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import re
+import shutil
+
+# ------------------ Compile Cache ------------------
+# Keeps Truffle from recompiling unchanged contracts. Editor buffers are only
+# written when their text differs from what is on disk, so file mtimes stay
+# put. Compiled artifacts (build/contracts/*.json) are stored under
+# <project>/.compile_cache/<key>, where the key is a SHA-256 over every
+# contract source plus the solc version and optimizer settings from
+# truffle-config.js. A marker file
+# in build/ records which key the current artifacts belong to, so an
+# unchanged contract costs one hash and no compiler run at all.
+
+CACHE_DIR = ".compile_cache"
+MARKER = ".source_key"
+SOLC_VERSION = re.compile(r"solc\s*:\s*{[^}]*?version\s*:\s*[\"']([^\"']+)[\"']", re.S)
+OPTIMIZER = re.compile(r"optimizer\s*:\s*{([^}]*)}", re.S)
+OPTIMIZER_ENABLED = re.compile(r"enabled\s*:\s*(true|false)\b")
+OPTIMIZER_RUNS = re.compile(r"runs\s*:\s*(\d+)")
+
+
+def write_if_changed(path, content):
+    """Write `content` to `path` unless the file already holds it; return True if written."""
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+class CompileCache:
+    """Content-addressed store of Truffle build artifacts for one project."""
+
+    def __init__(self, project_dir, max_entries=20):
+        self.project_dir = project_dir
+        self.max_entries = max_entries
+        self.cache_dir = os.path.join(project_dir, CACHE_DIR)
+        self.build_dir = os.path.join(project_dir, "build", "contracts")
+
+    def _config(self):
+        try:
+            with open(os.path.join(self.project_dir, "truffle-config.js")) as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def compiler_version(self):
+        match = SOLC_VERSION.search(self._config())
+        return match.group(1) if match else "default"
+
+    def optimizer_settings(self):
+        """(enabled, runs) from the solc optimizer section; Truffle's default is (False, 200)."""
+        match = OPTIMIZER.search(self._config())
+        if not match:
+            return False, 200
+        enabled = OPTIMIZER_ENABLED.search(match.group(1))
+        runs = OPTIMIZER_RUNS.search(match.group(1))
+        return bool(enabled and enabled.group(1) == "true"), int(runs.group(1)) if runs else 200
+
+    def source_key(self):
+        """Hash of all contract sources, the compiler version and the optimizer settings."""
+        digest = hashlib.sha256(f"{self.compiler_version()}\0{self.optimizer_settings()}".encode())
+        contracts_dir = os.path.join(self.project_dir, "contracts")
+        for root, _dirs, files in sorted(os.walk(contracts_dir)):
+            for name in sorted(files):
+                if not name.endswith(".sol"):
+                    continue
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, contracts_dir).replace(os.sep, "/").encode())
+                digest.update(b"\0")
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    def current_key(self):
+        """Key of the artifacts currently in build/, or None."""
+        try:
+            with open(os.path.join(self.build_dir, MARKER)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def restore(self, key):
+        """Make build/ hold the artifacts for `key`. Returns False on a cache miss."""
+        if self.current_key() == key:
+            return True
+        entry = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(entry):
+            return False
+        if os.path.isdir(self.build_dir):
+            shutil.rmtree(self.build_dir)
+        shutil.copytree(entry, self.build_dir)
+        os.utime(entry)  # Mark as recently used
+        self._mark(key)
+        return True
+
+    def store(self, key):
+        """Save the artifacts just compiled into build/ under `key`."""
+        entry = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        shutil.copytree(self.build_dir, entry, ignore=shutil.ignore_patterns(MARKER))
+        self._mark(key)
+        self._evict()
+
+    def _mark(self, key):
+        with open(os.path.join(self.build_dir, MARKER), "w") as f:
+            f.write(key)
+
+    def _evict(self):
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
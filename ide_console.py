@@ -0,0 +1,79 @@
+import threading
+import tkinter as tk
+
+# ------------------ Buffered Console Sink ------------------
+# Collects log lines from any thread and paints them into a Text widget at
+# most `flush_hz` times per second. Each flush is a single insert() call with
+# all (text, tag) pairs, one see(END) and one NORMAL/DISABLED toggle, however
+# many lines arrived. Tags are configured once, the first time a colour is
+# used. Scrollback is capped at `max_lines`; older lines are dropped, or
+# appended to `spill_path` when one is given, so memory and redraw cost stay
+# flat over long runs.
+
+
+class ConsoleSink:
+    """Frame-rate limited, bounded writer for a read-only Text widget."""
+
+    def __init__(self, root, widget, flush_hz=30, max_lines=5000, spill_path=None):
+        self.root = root
+        self.widget = widget
+        self.interval = max(1, int(1000 / flush_hz))
+        self.max_lines = max_lines
+        self.spill_path = spill_path
+        self._pending = []
+        self._scheduled = False
+        self._tags = set()
+        self._lock = threading.Lock()
+
+    def write(self, text, color):
+        """Queue `text` (including its newline) in `color`; safe from any thread."""
+        with self._lock:
+            self._pending.append((text, color))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.root.after(self.interval, self.flush)
+
+    def flush(self):
+        """Paint everything queued so far. Runs on the Tk thread."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+        if not pending:
+            return
+
+        # Lines that would be trimmed straight away never touch the widget
+        if len(pending) > self.max_lines:
+            self._spill("".join(text for text, _ in pending[:-self.max_lines]))
+            pending = pending[-self.max_lines:]
+
+        args = []
+        for text, color in pending:
+            if color not in self._tags:
+                self.widget.tag_config(color, foreground=color)
+                self._tags.add(color)
+            args += (text, color)
+
+        widget = self.widget
+        widget.config(state=tk.NORMAL)
+        widget.insert("end-1c", *args)
+        excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            cut = f"{excess + 1}.0"
+            if self.spill_path:
+                self._spill(widget.get("1.0", cut))
+            widget.delete("1.0", cut)
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
+
+    def _spill(self, text):
+        if self.spill_path and text:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(text)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=tk.DISABLED)
@@ -0,0 +1,149 @@
+import os
+import re
+import tkinter as tk
+from ide_cache import write_if_changed
+
+# ------------------ Code Editor Pane ------------------
+# Wraps one of the IDE's Text widgets so large files stay responsive. The
+# widget's Tcl command is proxied (as idlelib does) so every insert/delete
+# bumps a revision counter without reading the buffer back. Syntax
+# highlighting only ever looks at the lines on screen plus a small margin:
+# edits and scrolling schedule one debounced pass that re-tags that window,
+# so a keystroke costs the same in a 50-line contract as in a 20k-line one
+# and lines scrolled into view are coloured when they appear. Saving skips
+# the buffer entirely when neither the revision nor the file's mtime has
+# moved since the last save to that path, and otherwise writes only if the
+# text differs from disk.
+
+KEYWORDS = {
+    "solidity": r"pragma|import|from|as|contract|abstract|interface|library|is|using|for|struct|enum|event|"
+                r"error|modifier|function|constructor|fallback|receive|returns|return|if|else|while|do|"
+                r"break|continue|emit|revert|require|assert|new|delete|try|catch|public|private|internal|"
+                r"external|view|pure|payable|virtual|override|memory|storage|calldata|constant|immutable|"
+                r"indexed|anonymous|unchecked|assembly|true|false",
+    "javascript": r"const|let|var|function|async|await|return|if|else|for|while|do|break|continue|new|"
+                  r"class|extends|try|catch|finally|throw|typeof|instanceof|of|in|this|null|undefined|"
+                  r"true|false|require|module|exports",
+    "python": r"def|class|return|if|elif|else|for|while|in|not|and|or|is|with|as|try|except|finally|"
+              r"raise|assert|import|from|lambda|yield|pass|break|continue|None|True|False",
+}
+TYPES = r"address|bool|string|bytes\d*|u?int\d*|mapping"
+COMMENT = {"solidity": r"//[^\n]*|/\*.*?(?:\*/|$)", "javascript": r"//[^\n]*|/\*.*?(?:\*/|$)",
+           "python": r"#[^\n]*"}
+STRING = r'"(?:\\.|[^"\\\n])*"?' + r"|'(?:\\.|[^'\\\n])*'?" + r"|`(?:\\.|[^`\\])*`?"
+NUMBER = r"\b(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?(?:e\d+)?)\b"
+EDITS = ("insert", "delete", "replace")  # widget operations that change the text
+COLORS = {"comment": "#6a9955", "string": "#ce9178", "keyword": "#569cd6", "type": "#4ec9b0",
+          "number": "#b5cea8"}
+
+
+def _pattern(language):
+    groups = [f"(?P<comment>{COMMENT[language]})", f"(?P<string>{STRING})",
+              f"(?P<keyword>\\b(?:{KEYWORDS[language]})\\b)", f"(?P<number>{NUMBER})"]
+    if language == "solidity":
+        groups.insert(3, f"(?P<type>\\b(?:{TYPES})\\b)")
+    return re.compile("|".join(groups), re.S)
+
+
+PATTERNS = {language: _pattern(language) for language in KEYWORDS}
+
+
+class CodeEditor:
+    """Revision tracking, windowed highlighting and cheap saves for a Text widget."""
+
+    def __init__(self, widget, language="solidity", delay_ms=50, margin=20, comment_lookback=2000):
+        self.widget = widget
+        self.language = language
+        self.delay_ms = delay_ms
+        self.margin = margin
+        self.comment_lookback = comment_lookback
+        self.revision = 0
+        self._saved = None  # (path, revision, mtime) of the last save or load
+        self._after = None
+        for tag, color in COLORS.items():
+            widget.tag_configure(tag, foreground=color)
+        widget.tag_raise("sel")
+
+        # Route the widget's Tcl command through _dispatch
+        self._original = widget._w + "_orig"
+        widget.tk.call("rename", widget._w, self._original)
+        widget.tk.createcommand(widget._w, self._dispatch)
+
+        # Scrolling (and resizes, which also update the scrollbar) re-colours the window
+        scroll = widget.cget("yscrollcommand")
+        widget.configure(yscrollcommand=lambda first, last: (widget.tk.call(scroll, first, last),
+                                                             self.schedule()))
+
+    def _dispatch(self, operation, *args):
+        try:
+            result = self.widget.tk.call((self._original, operation) + args)
+        except tk.TclError as e:
+            # Text's class bindings edit "sel.first"/"sel.last" even with nothing
+            # selected, and Tk ignores the error; anything else is a real error
+            if operation in EDITS and 'tagged with "sel"' in str(e):
+                return ""
+            raise
+        if operation in EDITS:
+            self.revision += 1
+            self.schedule()
+        return result
+
+    # ---------- content ----------
+    def get(self):
+        return self.widget.get("1.0", "end-1c").rstrip('\n')
+
+    def set(self, content, path=None):
+        """Replace the buffer; `path` marks it as identical to that file."""
+        self.widget.delete("1.0", "end")
+        self.widget.insert("end", content)
+        self.widget.edit_reset()
+        self.widget.yview_moveto(0)
+        self._saved = self._stamp(path) if path else None
+
+    def _stamp(self, path):
+        try:
+            return path, self.revision, os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def save(self, path):
+        """Write the buffer to `path` if it may differ; return True if the file changed."""
+        if self._saved is not None and self._saved == self._stamp(path):
+            return False
+        changed = write_if_changed(path, self.get())
+        self._saved = self._stamp(path)
+        return changed
+
+    def set_language(self, language):
+        self.language = language
+        for tag in COLORS:
+            self.widget.tag_remove(tag, "1.0", "end")
+        self.schedule()
+
+    # ---------- highlighting ----------
+    def schedule(self):
+        """Debounce a highlight pass over the visible lines."""
+        if self._after:
+            self.widget.after_cancel(self._after)
+        self._after = self.widget.after(self.delay_ms, self.highlight)
+
+    def highlight(self):
+        self._after = None
+        widget = self.widget
+        first = int(widget.index("@0,0").split(".")[0])
+        last = int(widget.index(f"@0,{widget.winfo_height()}").split(".")[0])
+        start = f"{max(1, first - self.margin)}.0"
+        end = f"{last + self.margin}.0 lineend"
+
+        # Start earlier when the window opens inside a block comment (looking
+        # back a bounded number of lines, so the pass stays independent of file size)
+        if self.language != "python":
+            opened = widget.search("/*", start, f"{max(1, first - self.comment_lookback)}.0", backwards=True)
+            if opened and not widget.search("*/", opened, start):
+                start = opened
+
+        text = widget.get(start, end)
+        for tag in COLORS:
+            widget.tag_remove(tag, start, end)
+        for match in PATTERNS[self.language].finditer(text):
+            widget.tag_add(match.lastgroup, f"{start}+{match.start()}c", f"{start}+{match.end()}c")
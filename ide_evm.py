@@ -0,0 +1,156 @@
+import hashlib
+import inspect
+import time
+import traceback
+
+# ------------------ In-Process EVM Test Runner ------------------
+# Offline alternative to `truffle test`: compiles the contract with a cached
+# solc binary (py-solc-x), deploys it to an in-memory py-evm chain
+# (eth-tester) and calls the test_* functions of a Python test file directly.
+# The chain is created once per runner; every run reverts it to genesis,
+# deploys, snapshots, and reverts to that snapshot before each test instead
+# of redeploying. Compiler output is memoized on source hash + solc version.
+# py-solc-x, eth-tester and web3 are imported when a runner is created, not
+# when this module is, since eth-tester alone takes over a second to load.
+# Results are printed in Truffle's spec-reporter format, with the gas used by
+# each test's transactions appended to its duration.
+#
+# Test functions receive what they name in their signature:
+#   contract  - the `main` contract (by default the last one deployed)
+#   <Name>    - any deployed contract by name
+#   accounts  - funded test accounts
+#   w3        - the Web3 instance
+#
+#   pip install py-solc-x "eth-tester[py-evm]"
+
+DEFAULT_TESTS = '''def test_stores_value(contract, accounts):
+    contract.functions.set(89).transact({"from": accounts[0]})
+    assert contract.functions.get().call() == 89, "The value 89 was not stored."
+
+
+def test_starts_empty(contract):
+    # Chain state is reverted between tests
+    assert contract.functions.get().call() == 0
+'''
+
+
+class EVMTestRunner:
+    """Compile, deploy and test Solidity in-process against py-evm."""
+
+    def __init__(self, solc_version="0.8.0", on_line=None, max_cached=32):
+        try:
+            import solcx
+            from eth_tester import EthereumTester, PyEVMBackend
+            from web3 import Web3, EthereumTesterProvider
+        except ImportError:
+            raise RuntimeError('The Python backend needs: pip install py-solc-x "eth-tester[py-evm]"')
+        self._solcx = solcx
+        self._backend = (EthereumTester, PyEVMBackend, Web3, EthereumTesterProvider)
+        self.solc_version = solc_version
+        self.on_line = on_line or (lambda line, is_error: print(line))
+        self.max_cached = max_cached
+        self._compiled = {}
+        self._tester = None
+
+    def compile(self, source):
+        """Return {name: (abi, bytecode)}, reusing earlier output for identical source."""
+        key = hashlib.sha256(f"{self.solc_version}\0{source}".encode()).hexdigest()
+        if key in self._compiled:
+            return self._compiled[key]
+        solcx = self._solcx
+        if self.solc_version not in {str(v) for v in solcx.get_installed_solc_versions()}:
+            self.on_line(f"Installing solc {self.solc_version} (one-time download)...", False)
+            solcx.install_solc(self.solc_version)
+        output = solcx.compile_source(source, output_values=["abi", "bin"], solc_version=self.solc_version)
+        artifacts = {name.rsplit(":", 1)[-1]: (data["abi"], data["bin"]) for name, data in output.items()}
+        if len(self._compiled) >= self.max_cached:
+            self._compiled.pop(next(iter(self._compiled)))
+        self._compiled[key] = artifacts
+        return artifacts
+
+    def _chain(self):
+        if self._tester is None:
+            EthereumTester, PyEVMBackend, Web3, EthereumTesterProvider = self._backend
+            tester = EthereumTester(PyEVMBackend())
+            self._tester = (tester, Web3(EthereumTesterProvider(tester)), tester.take_snapshot())
+        return self._tester
+
+    def deploy(self, artifacts):
+        """Deploy every contract with bytecode and a no-argument constructor."""
+        tester, w3, genesis = self._chain()
+        tester.revert_to_snapshot(genesis)
+        deployer = w3.eth.accounts[0]
+        deployed = {}
+        for name, (abi, bytecode) in artifacts.items():
+            constructor = next((e for e in abi if e["type"] == "constructor"), None)
+            if not bytecode or (constructor and constructor["inputs"]):
+                continue
+            factory = w3.eth.contract(abi=abi, bytecode=bytecode)
+            receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact({"from": deployer}))
+            deployed[name] = w3.eth.contract(address=receipt.contractAddress, abi=abi)
+        return deployed
+
+    def collect(self, test_source, filename="test_storage.py"):
+        namespace = {"__name__": "evm_tests"}
+        exec(compile(test_source, filename, "exec"), namespace)
+        return [(name, func) for name, func in namespace.items()
+                if name.startswith("test_") and callable(func)]
+
+    def run(self, source, test_source, artifacts=None, filename="test_storage.py", main=None):
+        """Run the tests in `test_source` against `source`; return a summary dict.
+
+        `main` names the contract the `contract` fixture and the suite title
+        refer to; without it, the last contract deployed.
+        """
+        start = time.perf_counter()
+        if artifacts is None:
+            artifacts = self.compile(source)
+        tests = self.collect(test_source, filename)
+        deployed = self.deploy(artifacts)
+        tester, w3, _genesis = self._chain()
+        fixtures = {"accounts": w3.eth.accounts, "w3": w3, **deployed}
+        suite = main or next(reversed(deployed), filename)
+        if suite in deployed:
+            fixtures["contract"] = deployed[suite]
+        snapshot = tester.take_snapshot()
+
+        summary = {"passing": 0, "failing": 0, "tests": []}
+        failures = []
+        self.on_line(f"  Contract: {suite}", False)
+        for name, func in tests:
+            tester.revert_to_snapshot(snapshot)
+            first_block = w3.eth.block_number + 1
+            test_start = time.perf_counter()
+            try:
+                params = inspect.signature(func).parameters
+                missing = [p for p in params if p not in fixtures]
+                if missing:
+                    raise NameError(f"Unknown fixture(s): {', '.join(missing)}")
+                func(**{p: fixtures[p] for p in params})
+                passed = True
+            except Exception as e:
+                passed = False
+                failures.append((name, e))
+            duration = (time.perf_counter() - test_start) * 1000
+            gas = sum(w3.eth.get_block(n)["gasUsed"] for n in range(first_block, w3.eth.block_number + 1))
+            summary["tests"].append({"name": name, "passed": passed, "ms": duration, "gas": gas})
+            if passed:
+                summary["passing"] += 1
+                self.on_line(f"  ✓ {name} ({duration:.0f}ms, {gas} gas)", False)
+            else:
+                summary["failing"] += 1
+                self.on_line(f"  {len(failures)}) {name}", True)
+
+        summary["seconds"] = time.perf_counter() - start
+        self.on_line(f"  {summary['passing']} passing ({summary['seconds'] * 1000:.0f}ms)", False)
+        if failures:
+            self.on_line(f"  {summary['failing']} failing", True)
+            for index, (name, error) in enumerate(failures, 1):
+                self.on_line(f"  {index}) Contract: {suite}", True)
+                self.on_line(f"       {name}:", True)
+                self.on_line(f"     {type(error).__name__}: {error}", True)
+                # Point at the failing line of the test file, not web3 internals
+                frames = [f for f in traceback.extract_tb(error.__traceback__) if f.filename == filename]
+                if frames:
+                    self.on_line(f"      at {filename}:{frames[-1].lineno}", True)
+        return summary
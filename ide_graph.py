@@ -0,0 +1,392 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ide_cache import CompileCache, write_if_changed
+
+# ------------------ Contract Import Graph ------------------
+# Scans contracts/**/*.sol, resolves `import` statements (relative paths and
+# node_modules packages) and gives every file a closure hash: a hash over the
+# contents of the file and everything it imports, directly or not. A file
+# needs recompiling exactly when its closure hash changed, so an edit costs
+# the files that (transitively) import it and nothing else.
+#
+# ProjectBuilder compiles those files with py-solc-x, one solc process per
+# file spread over a process pool, and writes Truffle-format artifacts to
+# build/contracts so `truffle test --compile-none` and the Python backend can
+# use them. The optimizer settings come from truffle-config.js, so the
+# artifacts match what `truffle compile` would produce. If solc cannot be
+# downloaded, the failure is remembered for SOLC_RETRY seconds so an offline
+# machine does not retry the download on every run.
+# generate_migrations() writes a deploy script from the graph with
+# dependencies first and libraries linked into the contracts that use them.
+
+IMPORT = re.compile(r"""^\s*import\s+(?:[^"';]*?\bfrom\s+)?["']([^"']+)["']""", re.M)
+COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+STRINGS = re.compile(r'"(?:\\.|[^"\\])*"' + r"|'(?:\\.|[^'\\])*'")
+DEFINITION = re.compile(r"\b(abstract\s+contract|contract|interface|library)\s+(\w+)[^{;]*\{")
+CONSTRUCTOR = re.compile(r"\bconstructor\s*\(([^)]*)\)")
+STATE_FILE = ".graph_state.json"
+SOLC_FAILURE_FILE = ".solc_unavailable.json"
+SOLC_RETRY = 3600
+MIGRATION_MARKER = "// Generated by TruffleIDE from the contract import graph"
+# What the IDE wrote before migrations were generated; safe to replace
+LEGACY_MIGRATION = """const SimpleStorage = artifacts.require("SimpleStorage");
+
+module.exports = function(deployer) {
+  deployer.deploy(SimpleStorage);
+};
+"""
+
+
+def _body(text, start):
+    """Text between the brace at text[start - 1] and its matching close."""
+    depth = 1
+    for index in range(start, len(text)):
+        if text[index] == "{":
+            depth += 1
+        elif text[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:index]
+    return text[start:]
+
+
+class SourceFile:
+    """One .sol file: its hash, resolved imports and the definitions it contains."""
+
+    def __init__(self, path, rel, text):
+        self.path = path
+        self.rel = rel
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.imports = []   # resolved absolute paths
+        self.external = []  # import strings that did not resolve
+        code = STRINGS.sub('""', COMMENTS.sub(" ", text))
+        # (kind, name, constructor takes arguments)
+        self.definitions = []
+        for match in DEFINITION.finditer(code):
+            kind = match.group(1).split()[0]
+            body = _body(code, match.end())
+            constructor = CONSTRUCTOR.search(body)
+            self.definitions.append((kind, match.group(2), bool(constructor and constructor.group(1).strip())))
+        self._raw_imports = IMPORT.findall(COMMENTS.sub(" ", text))
+
+
+class SourceGraph:
+    """Import graph over a project's contracts directory."""
+
+    def __init__(self, project_dir):
+        self.project_dir = os.path.abspath(project_dir)
+        self.contracts_dir = os.path.join(self.project_dir, "contracts")
+        self.node_modules = os.path.join(self.project_dir, "node_modules")
+        self.files = {}
+        self._closure = {}
+        pending = []
+        for root, _dirs, names in os.walk(self.contracts_dir):
+            pending += [os.path.join(root, name) for name in names if name.endswith(".sol")]
+        # Imported files outside contracts/ (node_modules) join the graph too
+        while pending:
+            path = os.path.normpath(pending.pop())
+            if path in self.files:
+                continue
+            with open(path, encoding="utf-8") as f:
+                source = SourceFile(path, os.path.relpath(path, self.project_dir).replace(os.sep, "/"), f.read())
+            for spec in source._raw_imports:
+                resolved = self.resolve(spec, path)
+                if resolved:
+                    source.imports.append(resolved)
+                    pending.append(resolved)
+                else:
+                    source.external.append(spec)
+            self.files[path] = source
+
+    def resolve(self, spec, importer):
+        if spec.startswith("."):
+            candidate = os.path.normpath(os.path.join(os.path.dirname(importer), spec))
+        else:
+            candidate = os.path.normpath(os.path.join(self.node_modules, spec))
+            if not os.path.isfile(candidate):
+                candidate = os.path.normpath(os.path.join(self.project_dir, spec))
+        return candidate if os.path.isfile(candidate) else None
+
+    def local_files(self):
+        """Files under contracts/, in a stable order."""
+        return sorted(p for p in self.files if p.startswith(self.contracts_dir + os.sep))
+
+    def closure(self, path):
+        """All files `path` imports, directly or transitively, including itself."""
+        if path not in self._closure:
+            seen, stack = set(), [path]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                stack += self.files[current].imports
+            self._closure[path] = seen
+        return self._closure[path]
+
+    def closure_hash(self, path):
+        digest = hashlib.sha256()
+        for member in sorted(self.closure(path)):
+            digest.update(self.files[member].rel.encode() + b"\0" + self.files[member].digest.encode())
+        return digest.hexdigest()
+
+    def order(self):
+        """Local files with every file after the files it imports (cycles broken arbitrarily)."""
+        ordered, seen = [], set()
+        for start in self.local_files():
+            if start in seen:
+                continue
+            seen.add(start)
+            stack = [(start, iter(self.files[start].imports))]
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    ordered.append(node)
+                elif child not in seen:
+                    seen.add(child)
+                    stack.append((child, iter(self.files[child].imports)))
+        local = set(self.local_files())
+        return [p for p in ordered if p in local]
+
+    def dependents(self, path):
+        """Local files whose closure includes `path` (itself included if local)."""
+        path = os.path.normpath(os.path.abspath(path))
+        return [p for p in self.local_files() if path in self.closure(p)]
+
+    def remappings(self):
+        """solc remappings for package imports found under node_modules."""
+        prefixes = set()
+        for source in self.files.values():
+            for spec in source._raw_imports:
+                if not spec.startswith("."):
+                    parts = spec.split("/")
+                    prefixes.add("/".join(parts[:2] if spec.startswith("@") else parts[:1]) + "/")
+        return sorted(f"{prefix}={os.path.join(self.node_modules, prefix)}" for prefix in prefixes
+                      if os.path.isdir(os.path.join(self.node_modules, prefix)))
+
+
+def _compile_file(path, solc_version, allow_paths, remappings, optimizer=(False, 200)):
+    """Worker: compile one file; return {name: output} for contracts defined in it."""
+    import solcx
+    enabled, runs = optimizer
+    try:
+        output = solcx.compile_files(
+            [path], output_values=["abi", "bin", "bin-runtime", "srcmap", "srcmap-runtime", "metadata"],
+            solc_version=solc_version, allow_paths=allow_paths, import_remappings=remappings,
+            **({"optimize": True, "optimize_runs": runs} if enabled else {}))
+    except solcx.exceptions.SolcError as e:
+        # SolcError does not survive pickling back to the parent process
+        raise RuntimeError(f"{os.path.basename(path)}: {e.stderr_data or e}") from None
+    target = os.path.normcase(os.path.abspath(path))
+    return {key.rsplit(":", 1)[1]: data for key, data in output.items()
+            if os.path.normcase(os.path.abspath(key.rsplit(":", 1)[0])) == target}
+
+
+class ProjectBuilder:
+    """Incremental, parallel solc build of a project into build/contracts."""
+
+    def __init__(self, project_dir, solc_version="0.8.0", workers=None, optimizer=None):
+        import solcx  # ImportError tells callers to fall back to `truffle compile`
+        self._solcx = solcx
+        self.project_dir = os.path.abspath(project_dir)
+        self.solc_version = solc_version
+        self.workers = workers
+        # (enabled, runs); by default whatever truffle-config.js says
+        self.optimizer = tuple(optimizer) if optimizer else CompileCache(self.project_dir).optimizer_settings()
+        self.build_dir = os.path.join(self.project_dir, "build", "contracts")
+
+    def ensure_compiler(self, on_line=None):
+        """Install the configured solc if missing.
+
+        Raises RuntimeError if it cannot be fetched, and keeps raising
+        without another download attempt for SOLC_RETRY seconds.
+        """
+        if self.solc_version in {str(v) for v in self._solcx.get_installed_solc_versions()}:
+            return
+        failure_path = os.path.join(self.build_dir, SOLC_FAILURE_FILE)
+        try:
+            with open(failure_path) as f:
+                failure = json.load(f)
+        except (OSError, ValueError):
+            failure = {}
+        if failure.get("version") == self.solc_version and time.time() - failure.get("at", 0) < SOLC_RETRY:
+            raise RuntimeError(f"solc {self.solc_version} is not installed and the last download failed "
+                               f"({failure.get('error')}); next attempt in "
+                               f"{(SOLC_RETRY - (time.time() - failure['at'])) / 60:.0f} min")
+        if on_line:
+            on_line(f"Installing solc {self.solc_version} (one-time download)...", False)
+        try:
+            self._solcx.install_solc(self.solc_version)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            os.makedirs(self.build_dir, exist_ok=True)
+            with open(failure_path, "w") as f:
+                json.dump({"version": self.solc_version, "at": time.time(), "error": error}, f)
+            raise RuntimeError(f"solc {self.solc_version} is not installed and could not be downloaded "
+                               f"(offline?): {error}") from None
+        if os.path.exists(failure_path):
+            os.remove(failure_path)
+
+    def _load_state(self):
+        try:
+            with open(os.path.join(self.build_dir, STATE_FILE)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if state.get("solc") != self.solc_version or state.get("optimizer") != list(self.optimizer):
+            return {}
+        return state
+
+    def plan(self, graph=None):
+        """(graph, files to compile, stale file entries) without compiling anything."""
+        graph = graph or SourceGraph(self.project_dir)
+        state = self._load_state().get("files", {})
+        local = graph.local_files()
+        dirty = []
+        for path in local:
+            entry = state.get(graph.files[path].rel)
+            if entry is None or entry["closure"] != graph.closure_hash(path) or not all(
+                    os.path.exists(os.path.join(self.build_dir, f"{name}.json")) for name in entry["contracts"]):
+                dirty.append(path)
+        current = {graph.files[p].rel for p in local}
+        removed = {rel: entry for rel, entry in state.items() if rel not in current}
+        return graph, dirty, removed
+
+    def build(self, on_line=None):
+        """Compile what changed; return a stats dict."""
+        on_line = on_line or (lambda line, is_error: None)
+        start = time.perf_counter()
+        graph, dirty, removed = self.plan()
+        state = self._load_state().get("files", {})
+        os.makedirs(self.build_dir, exist_ok=True)
+
+        for rel, entry in removed.items():
+            for name in entry["contracts"]:
+                artifact = os.path.join(self.build_dir, f"{name}.json")
+                if os.path.exists(artifact):
+                    os.remove(artifact)
+            state.pop(rel)
+
+        if dirty:
+            self.ensure_compiler(on_line)
+            allow = [graph.project_dir] + ([graph.node_modules] if os.path.isdir(graph.node_modules) else [])
+            remappings = graph.remappings()
+            for path in dirty:
+                on_line(f"Compiling {graph.files[path].rel}", False)
+            if len(dirty) == 1:
+                outputs = [_compile_file(dirty[0], self.solc_version, allow, remappings, self.optimizer)]
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    n = len(dirty)
+                    outputs = list(pool.map(_compile_file, dirty, [self.solc_version] * n,
+                                            [allow] * n, [remappings] * n, [self.optimizer] * n))
+            # Contracts deleted from a rebuilt file lose their artifact, unless
+            # another file defines a contract of the same name now
+            dropped = set()
+            for path, contracts in zip(dirty, outputs):
+                source = graph.files[path]
+                dropped.update(set(state.get(source.rel, {}).get("contracts", ())) - set(contracts))
+                for name, data in contracts.items():
+                    self._write_artifact(name, data, source)
+                state[source.rel] = {"closure": graph.closure_hash(path), "contracts": sorted(contracts)}
+            dropped -= {name for entry in state.values() for name in entry["contracts"]}
+            for name in dropped:
+                artifact = os.path.join(self.build_dir, f"{name}.json")
+                if os.path.exists(artifact):
+                    os.remove(artifact)
+
+        with open(os.path.join(self.build_dir, STATE_FILE), "w") as f:
+            json.dump({"solc": self.solc_version, "optimizer": list(self.optimizer), "files": state}, f, indent=1)
+        return {"files": len(graph.local_files()), "compiled": len(dirty), "removed": len(removed),
+                "seconds": time.perf_counter() - start}
+
+    def _write_artifact(self, name, data, source):
+        with open(source.path, encoding="utf-8") as f:
+            text = f.read()
+        artifact = {
+            "contractName": name,
+            "abi": data["abi"],
+            "metadata": data.get("metadata", ""),
+            "bytecode": "0x" + data["bin"],
+            "deployedBytecode": "0x" + data["bin-runtime"],
+            "sourceMap": data.get("srcmap", ""),
+            "deployedSourceMap": data.get("srcmap-runtime", ""),
+            "source": text,
+            "sourcePath": source.path,
+            "compiler": {"name": "solc", "version": self.solc_version},
+            "networks": {},
+            "schemaVersion": "3.4.16",
+            "updatedAt": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        }
+        with open(os.path.join(self.build_dir, f"{name}.json"), "w") as f:
+            json.dump(artifact, f, indent=2)
+
+    def artifacts(self):
+        """{name: (abi, bytecode)} for everything built, as EVMTestRunner takes them.
+
+        Contracts whose bytecode still has library placeholders are left out.
+        """
+        state = self._load_state().get("files", {})
+        result = {}
+        for entry in state.values():
+            for name in entry["contracts"]:
+                with open(os.path.join(self.build_dir, f"{name}.json")) as f:
+                    artifact = json.load(f)
+                if "__" not in artifact["bytecode"]:
+                    result[name] = (artifact["abi"], artifact["bytecode"][2:])
+        return result
+
+
+def generate_migrations(graph):
+    """Deploy script for every concrete contract, dependencies first.
+
+    Libraries are deployed first and linked into the contracts of their own
+    file and of files that import them; contracts whose constructors take
+    arguments are listed in a comment instead of being deployed.
+    """
+    requires, deploys, skipped, libraries = [], [], [], {}
+    for path in graph.order():
+        source = graph.files[path]
+        imported_libraries = [name for dep in graph.closure(path) if dep != path
+                              for name in libraries.get(dep, [])]
+        # A file's libraries go out before its contracts, and are linked into them
+        for kind, name, needs_args in sorted(source.definitions, key=lambda d: d[0] != "library"):
+            if kind in ("abstract", "interface"):
+                continue
+            if needs_args:
+                skipped.append(name)
+                continue
+            requires.append(f'const {name} = artifacts.require("{name}");')
+            for library in imported_libraries + libraries.get(path, []):
+                deploys.append(f"  await deployer.link({library}, {name});")
+            deploys.append(f"  await deployer.deploy({name});")
+            if kind == "library":
+                libraries.setdefault(path, []).append(name)
+    lines = [MIGRATION_MARKER] + requires + ["", "module.exports = async function(deployer) {"] + deploys
+    if skipped:
+        lines.append(f"  // Constructor arguments required, deploy manually: {', '.join(skipped)}")
+    lines.append("};")
+    return "\n".join(lines) + "\n"
+
+
+def sync_migrations(project_dir, graph=None):
+    """Regenerate migrations/1_deploy_contracts.js unless it was written by hand.
+
+    Returns True when the file was (re)written.
+    """
+    path = os.path.join(project_dir, "migrations", "1_deploy_contracts.js")
+    try:
+        with open(path, encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current is not None and not current.startswith(MIGRATION_MARKER) and current != LEGACY_MIGRATION:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return write_if_changed(path, generate_migrations(graph or SourceGraph(project_dir)))
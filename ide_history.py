@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+import time
+
+# ------------------ Test Run History ------------------
+# Append-only SQLite record of every test run: one row per run (backend,
+# contract source hash, outcome, counts) and one row per test result (status,
+# duration, gas). Each result row also stores the rolling baseline it was
+# compared against, taken from a per-test aggregate table that keeps running
+# sums over the last `window` passing samples. Recording a run and listing
+# the regressions of any stored run are therefore both short indexed lookups,
+# however many runs have been stored. Runs that produced no results (a
+# compile error, a crash) are stored too, with status "error", so the run
+# list shows every attempt and not only the ones that got as far as testing.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    started     REAL    NOT NULL,
+    backend     TEXT    NOT NULL,
+    source_hash TEXT,
+    passed      INTEGER NOT NULL,
+    failed      INTEGER NOT NULL,
+    pending     INTEGER NOT NULL,
+    seconds     REAL,
+    status      TEXT       -- passed, failed or error
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id    INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    title TEXT NOT NULL,
+    UNIQUE (suite, title)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id   INTEGER NOT NULL,
+    test_id  INTEGER NOT NULL,
+    status   TEXT    NOT NULL,
+    ms       REAL,
+    gas      INTEGER,
+    base_ms  REAL,      -- rolling baseline at the time of the run
+    base_gas REAL,
+    PRIMARY KEY (run_id, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_test ON results (test_id, status, run_id);
+CREATE TABLE IF NOT EXISTS baseline (
+    test_id INTEGER PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    ms_sum  REAL    NOT NULL,
+    ms_n    INTEGER NOT NULL,
+    gas_sum REAL    NOT NULL,
+    gas_n   INTEGER NOT NULL
+);
+"""
+
+
+class RunHistory:
+    """Stores test runs and flags duration/gas regressions against a rolling baseline."""
+
+    def __init__(self, db_path="test_history.sqlite3", window=10, ms_threshold=0.25, min_ms=5.0,
+                 gas_threshold=0.01, min_samples=3):
+        self.window = window
+        self.ms_threshold = ms_threshold
+        self.min_ms = min_ms
+        self.gas_threshold = gas_threshold
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        # Runs finish on worker threads and the Tk thread; the lock
+        # serialises them on this one connection
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if "status" not in [row[1] for row in self.db.execute("PRAGMA table_info(runs)")]:
+            self.db.execute("ALTER TABLE runs ADD COLUMN status TEXT")  # stores from before the column
+
+    # ---------- recording ----------
+    def record_run(self, records, backend, source_hash=None, seconds=None, status=None):
+        """Store a run's test records (ResultParser dicts); return the new run id.
+
+        status is "passed", "failed" or "error"; by default it follows the
+        records. A failed run without any records is stored as "error".
+        """
+        counts = {"passed": 0, "failed": 0, "pending": 0}
+        for record in records:
+            counts[record["status"]] += 1
+        if status is None:
+            status = "failed" if counts["failed"] else "passed" if records else "error"
+        elif status == "failed" and not records:
+            status = "error"
+        with self._lock, self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (started, backend, source_hash, passed, failed, pending, seconds, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), backend, source_hash, counts["passed"], counts["failed"], counts["pending"],
+                 seconds, status)).lastrowid
+            for record in records:
+                test_id = self._test_id(record["suite"] or "", record["title"])
+                base = self.db.execute("SELECT samples, ms_sum, ms_n, gas_sum, gas_n FROM baseline "
+                                       "WHERE test_id = ?", (test_id,)).fetchone()
+                base_ms = base[1] / base[2] if base and base[2] >= self.min_samples else None
+                base_gas = base[3] / base[4] if base and base[4] else None
+                # A test may appear twice in one run (same title in two shards); keep the first
+                inserted = self.db.execute(
+                    "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, test_id, record["status"], record["ms"], record["gas"], base_ms, base_gas)).rowcount
+                if inserted and record["status"] == "passed":
+                    self._roll(test_id, base, record["ms"], record["gas"], run_id)
+        return run_id
+
+    def _test_id(self, suite, title):
+        row = self.db.execute("SELECT id FROM tests WHERE suite = ? AND title = ?", (suite, title)).fetchone()
+        if row:
+            return row[0]
+        return self.db.execute("INSERT INTO tests (suite, title) VALUES (?, ?)", (suite, title)).lastrowid
+
+    def _roll(self, test_id, base, ms, gas, run_id):
+        # Add the new sample and, once the window is full, subtract the one
+        # that just fell out of it (found through the results_test index)
+        samples, ms_sum, ms_n, gas_sum, gas_n = base or (0, 0.0, 0, 0.0, 0)
+        samples += 1
+        if ms is not None:
+            ms_sum, ms_n = ms_sum + ms, ms_n + 1
+        if gas is not None:
+            gas_sum, gas_n = gas_sum + gas, gas_n + 1
+        if samples > self.window:
+            dropped = self.db.execute(
+                "SELECT ms, gas FROM results WHERE test_id = ? AND status = 'passed' AND run_id <= ? "
+                "ORDER BY run_id DESC LIMIT 1 OFFSET ?", (test_id, run_id, self.window)).fetchone()
+            samples -= 1
+            if dropped and dropped[0] is not None:
+                ms_sum, ms_n = ms_sum - dropped[0], ms_n - 1
+            if dropped and dropped[1] is not None:
+                gas_sum, gas_n = gas_sum - dropped[1], gas_n - 1
+        self.db.execute("INSERT OR REPLACE INTO baseline VALUES (?, ?, ?, ?, ?, ?)",
+                        (test_id, samples, ms_sum, ms_n, gas_sum, gas_n))
+
+    # ---------- queries ----------
+    def runs(self, limit=50):
+        """Most recent runs as (id, started, backend, source_hash, passed, failed, pending, seconds, status)."""
+        with self._lock:
+            return self.db.execute("SELECT id, started, backend, source_hash, passed, failed, pending, seconds, "
+                                   "status FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    def regressions(self, run_id=None):
+        """Tests in a run (default: the latest) whose duration or gas rose past the thresholds."""
+        with self._lock:
+            if run_id is None:
+                row = self.db.execute("SELECT MAX(id) FROM runs").fetchone()
+                run_id = row[0]
+            rows = self.db.execute(
+                "SELECT t.suite, t.title, r.ms, r.base_ms, r.gas, r.base_gas FROM results r "
+                "JOIN tests t ON t.id = r.test_id WHERE r.run_id = ? AND r.status = 'passed'",
+                (run_id,)).fetchall()
+        flagged = []
+        for suite, title, ms, base_ms, gas, base_gas in rows:
+            kinds = []
+            if ms is not None and base_ms is not None and ms - base_ms >= self.min_ms \
+                    and ms > base_ms * (1 + self.ms_threshold):
+                kinds.append("time")
+            if gas is not None and base_gas is not None and gas > base_gas * (1 + self.gas_threshold):
+                kinds.append("gas")
+            if kinds:
+                flagged.append({"suite": suite, "title": title, "kinds": kinds, "ms": ms, "base_ms": base_ms,
+                                "gas": gas, "base_gas": base_gas})
+        return flagged
+
+    def test_history(self, suite, title, limit=50):
+        """Recent (run_id, status, ms, gas) rows for one test."""
+        with self._lock:
+            return self.db.execute(
+                "SELECT r.run_id, r.status, r.ms, r.gas FROM results r JOIN tests t ON t.id = r.test_id "
+                "WHERE t.suite = ? AND t.title = ? ORDER BY r.run_id DESC LIMIT ?",
+                (suite, title, limit)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
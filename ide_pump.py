@@ -0,0 +1,70 @@
+import codecs
+import os
+import queue
+import threading
+
+# ------------------ Subprocess Output Pump ------------------
+# Reads a child process's stdout and stderr at the same time, one reader
+# thread per pipe, and hands complete lines to a single consumer through a
+# queue. Readers pull whatever bytes are available (up to CHUNK_SIZE) with
+# os.read, so a burst of output costs one queue hand-off instead of one per
+# line, while a lone line is delivered as soon as it is written. Neither
+# side polls: the consumer blocks on the queue until there is work.
+# Threads rather than selectors because select() does not work on pipes
+# under Windows.
+
+CHUNK_SIZE = 64 * 1024
+
+
+class OutputPump:
+    """Iterate over (line, is_error) pairs from a Popen with stdout/stderr pipes."""
+
+    def __init__(self, process, encoding="utf-8"):
+        self.process = process
+        self.encoding = encoding
+        self._queue = queue.SimpleQueue()
+        self._open = 0
+        for stream, is_error in ((process.stdout, False), (process.stderr, True)):
+            if stream is None:
+                continue
+            self._open += 1
+            threading.Thread(target=self._reader, args=(stream, is_error),
+                             name="pump-stderr" if is_error else "pump-stdout",
+                             daemon=True).start()
+
+    def _reader(self, stream, is_error):
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        fd = stream.fileno()
+        pending = ""
+        try:
+            while True:
+                chunk = os.read(fd, CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = pending + decoder.decode(chunk)
+                lines = text.splitlines(keepends=True)
+                # Hold back a trailing partial line until its newline arrives
+                pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+                if lines:
+                    self._queue.put((is_error, [line.rstrip("\r\n") for line in lines]))
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                self._queue.put((is_error, [pending]))
+        except OSError:
+            pass  # Pipe closed under us, e.g. the process was killed
+        finally:
+            self._queue.put(None)
+
+    def batches(self):
+        """Yield (is_error, [lines]) batches until both pipes are closed."""
+        while self._open:
+            item = self._queue.get()
+            if item is None:
+                self._open -= 1
+                continue
+            yield item
+
+    def __iter__(self):
+        for is_error, lines in self.batches():
+            for line in lines:
+                yield line, is_error
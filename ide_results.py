@@ -0,0 +1,129 @@
+import json
+import re
+import xml.etree.ElementTree as ET
+
+# ------------------ Test Result Parser ------------------
+# Turns Mocha/Truffle spec-reporter output into per-test records as the lines
+# stream in. Each record is a dict with suite, title, status
+# (passed/failed/pending), ms, gas and error. Mocha only prints a duration
+# for tests slower than half its "slow" threshold, so fast tests have
+# ms=None; gas is read from a "(12ms, 43294 gas)" suffix when the reporter
+# provides one (the Python EVM backend always does). Lines from concurrent
+# runs (sharded workers) are kept apart by passing a `stream` key to feed().
+
+SUITE = re.compile(r"^\s*Contract:\s*(.+?)\s*$")
+PASSED = re.compile(r"^\s*[✓✔]\s+(.+?)(?:\s+\(([^)]*)\))?\s*$")
+FAILED = re.compile(r"^\s*(\d+)\)\s+(.+?)\s*$")
+PENDING = re.compile(r"^\s*-\s+(.+?)\s*$")
+FAILING = re.compile(r"^\s*(\d+) failing\b")
+DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*ms\b")
+GAS = re.compile(r"(\d+)\s*gas\b")
+
+
+class ResultParser:
+    """Streaming parser collecting test records from reporter output."""
+
+    def __init__(self):
+        self.records = []
+        self._streams = {}
+
+    def _state(self, stream):
+        if stream not in self._streams:
+            self._streams[stream] = {"suite": None, "failures": None, "numbered": {}, "current": None}
+        return self._streams[stream]
+
+    def feed(self, line, stream=None):
+        """Consume one output line; return the new record, if the line produced one."""
+        state = self._state(stream)
+
+        # After "N failing" Mocha repeats each failure with its error text
+        if state["failures"] is not None:
+            match = FAILED.match(line)
+            if match and int(match.group(1)) in state["numbered"]:
+                state["current"] = state["numbered"][int(match.group(1))]
+            elif state["current"] is not None and line.strip() and line.strip() != state["current"]["title"] + ":":
+                record = state["current"]
+                if record["error"] is None or len(record["error"]) < 500:
+                    record["error"] = ((record["error"] + "\n") if record["error"] else "") + line.strip()
+            return None
+
+        if FAILING.match(line):
+            state["failures"] = int(FAILING.match(line).group(1))
+            return None
+        match = SUITE.match(line)
+        if match:
+            state["suite"] = match.group(1)
+            return None
+        if state["suite"] is None:
+            return None
+
+        match = PASSED.match(line)
+        if match:
+            return self._add(state, match.group(1), "passed", match.group(2))
+        match = FAILED.match(line)
+        if match:
+            record = self._add(state, match.group(2), "failed", None)
+            state["numbered"][int(match.group(1))] = record
+            return record
+        match = PENDING.match(line)
+        if match:
+            return self._add(state, match.group(1), "pending", None)
+        return None
+
+    def _add(self, state, title, status, extra):
+        ms = gas = None
+        if extra:
+            duration = DURATION.search(extra)
+            ms = float(duration.group(1)) if duration else None
+            used = GAS.search(extra)
+            gas = int(used.group(1)) if used else None
+        record = {"suite": state["suite"], "title": title, "status": status, "ms": ms, "gas": gas,
+                  "error": None}
+        self.records.append(record)
+        return record
+
+    def summary(self):
+        counts = {"passed": 0, "failed": 0, "pending": 0}
+        for record in self.records:
+            counts[record["status"]] += 1
+        counts["ms"] = sum(r["ms"] for r in self.records if r["ms"] is not None)
+        return counts
+
+    def slowest(self, count=5):
+        timed = [r for r in self.records if r["ms"] is not None]
+        return sorted(timed, key=lambda r: r["ms"], reverse=True)[:count]
+
+    def gas_hotspots(self, count=5):
+        metered = [r for r in self.records if r["gas"] is not None]
+        return sorted(metered, key=lambda r: r["gas"], reverse=True)[:count]
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "tests": self.records}, f, indent=2)
+
+    def write_junit(self, path, name="truffle"):
+        summary = self.summary()
+        root = ET.Element("testsuites", name=name, tests=str(len(self.records)),
+                          failures=str(summary["failed"]), skipped=str(summary["pending"]),
+                          time=f"{summary['ms'] / 1000:.3f}")
+        suites = {}
+        for record in self.records:
+            suite_name = record["suite"] or name
+            if suite_name not in suites:
+                suites[suite_name] = ET.SubElement(root, "testsuite", name=suite_name)
+            case = ET.SubElement(suites[suite_name], "testcase", classname=suite_name, name=record["title"],
+                                 time=f"{(record['ms'] or 0) / 1000:.3f}")
+            if record["gas"] is not None:
+                properties = ET.SubElement(case, "properties")
+                ET.SubElement(properties, "property", name="gas", value=str(record["gas"]))
+            if record["status"] == "failed":
+                message = (record["error"] or "").split("\n", 1)[0]
+                ET.SubElement(case, "failure", message=message).text = record["error"]
+            elif record["status"] == "pending":
+                ET.SubElement(case, "skipped")
+        for suite in suites.values():
+            cases = suite.findall("testcase")
+            suite.set("tests", str(len(cases)))
+            suite.set("failures", str(len(suite.findall("testcase/failure"))))
+            suite.set("skipped", str(len(suite.findall("testcase/skipped"))))
+        ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
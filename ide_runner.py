@@ -0,0 +1,156 @@
+import glob
+import os
+import shutil
+import subprocess
+from ide_cache import CompileCache
+from ide_graph import ProjectBuilder, SourceFile, sync_migrations
+from ide_pump import OutputPump
+
+# ------------------ Headless Test Runner ------------------
+# The test steps behind TruffleIDE's buttons, without any Tk: compile through
+# the import graph (parallel solc, only what changed) or the content-hash
+# cache, run `truffle test --compile-none`, run the Python EVM backend over
+# test/*.py, and write JSON/JUnit reports. The IDE and
+# `cli.py ide test` both call these. Output goes to on_line(line, is_error);
+# status messages go to log(message, level) with the IDE's level names.
+
+TRUFFLE = "truffle.cmd" if os.name == "nt" else "truffle"
+
+
+def _ignore(message, level="INFO"):
+    pass
+
+
+def spawn(cmd, project_dir):
+    """Start a Truffle subprocess with raw stdout/stderr pipes for OutputPump."""
+    return subprocess.Popen(cmd, cwd=project_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False)
+
+
+def graph_builder(project_dir, solc_version=None, log=_ignore):
+    """A ProjectBuilder with its compiler installed, or None to fall back to Truffle."""
+    cache = CompileCache(project_dir)
+    version = solc_version or cache.compiler_version()
+    if version == "default":
+        return None
+    try:
+        builder = ProjectBuilder(project_dir, version)
+        builder.ensure_compiler()
+    except ImportError:
+        return None
+    except RuntimeError as e:
+        log(f"{e}; compiling with Truffle", "WARNING")
+        return None
+    except Exception as e:
+        log(f"solc {version} unavailable ({type(e).__name__}), compiling with Truffle", "WARNING")
+        return None
+    return builder
+
+
+def prepare_build(project_dir, on_line, on_process=None, log=_ignore):
+    """Make build/ match the current sources, compiling as little as possible.
+
+    With py-solc-x, only the contracts whose import closure changed are
+    recompiled, in parallel; otherwise the whole-project cache decides.
+    Returns True when nothing had to be compiled.
+    """
+    if sync_migrations(project_dir):
+        log("Regenerated migrations from the contract graph", "INFO")
+    builder = graph_builder(project_dir, log=log)
+    if builder is not None:
+        try:
+            stats = builder.build(on_line)
+        except RuntimeError as e:
+            on_line(str(e), True)
+            raise RuntimeError("Compilation failed") from None
+        if stats["compiled"]:
+            log(f"Compiled {stats['compiled']} of {stats['files']} contract files in {stats['seconds']:.2f}s",
+                "INFO")
+        else:
+            log(f"Contracts unchanged ({stats['files']} files)", "SUCCESS")
+        return not stats["compiled"]
+
+    cache = CompileCache(project_dir)
+    key = cache.source_key()
+    if cache.restore(key):
+        log(f"Contracts unchanged, using cached build ({key[:12]})", "SUCCESS")
+        return True
+
+    log("Contracts changed, compiling...", "INFO")
+    process = spawn([TRUFFLE, "compile"], project_dir)
+    if on_process:
+        on_process(process)
+    for line, is_error in OutputPump(process):
+        on_line(line, is_error)
+    if process.wait() != 0:
+        raise RuntimeError("Compilation failed")
+    cache.store(key)
+    log(f"Cached build ({key[:12]})", "INFO")
+    return False
+
+
+def run_truffle_tests(project_dir, on_line, on_process=None, log=_ignore):
+    """Compile (or restore) and run `truffle test`; return its exit code."""
+    if shutil.which(TRUFFLE) is None:
+        raise FileNotFoundError("Truffle not found in PATH")
+    prepare_build(project_dir, on_line, on_process, log)
+    process = spawn([TRUFFLE, "test", "--compile-none"], project_dir)
+    if on_process:
+        on_process(process)
+    for line, is_error in OutputPump(process):
+        on_line(line, is_error)
+    return process.wait()
+
+
+def main_contract(path):
+    """Name of the last contract in a .sol file that deploys without arguments, or None."""
+    with open(path, encoding="utf-8") as f:
+        source = SourceFile(path, os.path.basename(path), f.read())
+    names = [name for kind, name, has_args in source.definitions if kind == "contract" and not has_args]
+    return names[-1] if names else None
+
+
+def run_python_tests(project_dir, runner, contract=None, tests=None, selected=None):
+    """Run test/*.py (or `tests`) with an EVMTestRunner; return the merged summary.
+
+    Every contract in the project is built through the import graph and
+    deployed, unless `contract` names a single file to compile on its own.
+    The tests' `contract` fixture is the main contract of `selected` (a file
+    under contracts/, by default `contract`).
+    """
+    source = artifacts = main = None
+    selected = selected or contract
+    if selected:
+        main = main_contract(os.path.join(project_dir, "contracts", selected))
+    if contract:
+        with open(os.path.join(project_dir, "contracts", contract), encoding="utf-8") as f:
+            source = f.read()
+    else:
+        builder = ProjectBuilder(project_dir, runner.solc_version)
+        stats = builder.build(runner.on_line)
+        if stats["compiled"]:
+            runner.on_line(f"Compiled {stats['compiled']} of {stats['files']} contract files "
+                           f"in {stats['seconds']:.2f}s", False)
+        artifacts = builder.artifacts()
+    if tests is None:
+        tests = sorted(glob.glob(os.path.join(project_dir, "test", "*.py")))
+    if not tests:
+        raise FileNotFoundError(f"No Python tests found in {os.path.join(project_dir, 'test')}")
+
+    merged = {"passing": 0, "failing": 0, "tests": [], "seconds": 0.0}
+    for path in tests:
+        with open(path, encoding="utf-8") as f:
+            summary = runner.run(source, f.read(), artifacts=artifacts, filename=os.path.basename(path), main=main)
+        for key in ("passing", "failing", "seconds"):
+            merged[key] += summary[key]
+        merged["tests"] += summary["tests"]
+    return merged
+
+
+def write_reports(results, report_dir):
+    """Write a ResultParser's records as test-results.json and junit.xml; return the paths."""
+    os.makedirs(report_dir, exist_ok=True)
+    json_path = os.path.join(report_dir, "test-results.json")
+    junit_path = os.path.join(report_dir, "junit.xml")
+    results.write_json(json_path)
+    results.write_junit(junit_path)
+    return json_path, junit_path
@@ -0,0 +1,176 @@
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+from ide_pump import OutputPump
+
+# ------------------ Sharded Test Runner ------------------
+# Splits the files in <project>/test across N workers. Every worker gets its
+# own local chain (ganache on its own port), its own generated
+# truffle-config.shard<N>.js pointing at that chain, and its own
+# `truffle test <files>` process. Contracts are compiled once up front (or
+# by the caller, with compile=False) and the shards run with --compile-none,
+# so workers never race on build/. The shard configs use the project's
+# solc version (CompileCache.compiler_version()) so shards compile exactly
+# what `truffle compile` would.
+# Output lines are tagged with the shard number and the per-shard Mocha
+# summaries are merged at the end.
+
+TEST_EXTENSIONS = (".js", ".ts", ".sol")
+SUMMARY = re.compile(r"^\s*(\d+) (passing|failing|pending)\b")
+
+SHARD_CONFIG = """module.exports = {{
+  networks: {{
+    shard{index}: {{
+      host: "127.0.0.1",
+      port: {port},
+      network_id: "*",
+    }},
+  }},{compilers}
+}};
+"""
+
+SHARD_COMPILERS = """
+  compilers: {{
+    solc: {{
+      version: "{solc_version}",
+    }}
+  }},"""
+
+
+def default_workers(test_count):
+    return max(1, min(test_count, os.cpu_count() or 1))
+
+
+def split_tests(paths, workers):
+    """Greedy longest-first split using file size as the cost estimate."""
+    shards = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for path in sorted(paths, key=os.path.getsize, reverse=True):
+        target = loads.index(min(loads))
+        shards[target].append(path)
+        loads[target] += os.path.getsize(path)
+    return [shard for shard in shards if shard]
+
+
+def wait_for_port(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class ShardedRunner:
+    """Run a Truffle project's tests in parallel, one chain per shard."""
+
+    def __init__(self, project_dir, workers=None, base_port=9600, solc_version=None,
+                 on_line=None, chain_timeout=30, compile=True):
+        self.project_dir = project_dir
+        self.workers = workers
+        self.base_port = base_port
+        self.solc_version = None if solc_version == "default" else solc_version  # None: truffle's own
+        self.on_line = on_line or (lambda shard, line, is_error: print(line))
+        self.chain_timeout = chain_timeout
+        self.compile = compile
+        is_windows = os.name == "nt"
+        self.truffle_cmd = "truffle.cmd" if is_windows else "truffle"
+        self.chain_cmd = "ganache.cmd" if is_windows else "ganache"
+        self._processes = []
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def test_files(self):
+        test_dir = os.path.join(self.project_dir, "test")
+        return sorted(
+            os.path.join(test_dir, name) for name in os.listdir(test_dir)
+            if name.endswith(TEST_EXTENSIONS)
+        )
+
+    def run(self):
+        """Run all shards and return the merged summary dict."""
+        files = self.test_files()
+        if not files:
+            raise FileNotFoundError(f"No test files found in {os.path.join(self.project_dir, 'test')}")
+        shards = split_tests(files, self.workers or default_workers(len(files)))
+        if self.compile:
+            compiled = self._spawn([self.truffle_cmd, "compile"], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+            for line, is_error in OutputPump(compiled):
+                self.on_line(None, line, is_error)
+            if compiled.wait() != 0:
+                raise RuntimeError("truffle compile failed")
+        results = [None] * len(shards)
+        threads = [
+            threading.Thread(target=self._run_shard, args=(index, shard_files, results),
+                             name=f"shard-{index}", daemon=True)
+            for index, shard_files in enumerate(shards)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        summary = {"passing": 0, "failing": 0, "pending": 0, "seconds": time.perf_counter() - start,
+                   "shards": results, "ok": all(r["returncode"] == 0 for r in results)}
+        for result in results:
+            for key in ("passing", "failing", "pending"):
+                summary[key] += result[key]
+        return summary
+
+    def _run_shard(self, index, files, results):
+        port = self.base_port + index
+        config_name = f"truffle-config.shard{index}.js"
+        config_path = os.path.join(self.project_dir, config_name)
+        result = {"shard": index, "files": [os.path.basename(f) for f in files], "port": port,
+                  "passing": 0, "failing": 0, "pending": 0, "returncode": None, "seconds": 0.0}
+        results[index] = result
+        start = time.perf_counter()
+        chain = None
+        try:
+            with open(config_path, "w") as f:
+                compilers = SHARD_COMPILERS.format(solc_version=self.solc_version) if self.solc_version else ""
+                f.write(SHARD_CONFIG.format(index=index, port=port, compilers=compilers))
+            chain = self._spawn([self.chain_cmd, "--port", str(port), "--quiet"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not wait_for_port(port, self.chain_timeout):
+                raise RuntimeError(f"Chain on port {port} did not start within {self.chain_timeout}s")
+            relative = [os.path.relpath(f, self.project_dir) for f in files]
+            tests = self._spawn([self.truffle_cmd, "test", *relative, "--network", f"shard{index}",
+                                 "--config", config_name, "--compile-none"],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            for line, is_error in OutputPump(tests):
+                match = SUMMARY.match(line)
+                if match:
+                    result[match.group(2)] += int(match.group(1))
+                self.on_line(index, line, is_error)
+            result["returncode"] = tests.wait()
+        except Exception as e:
+            result["returncode"] = -1
+            self.on_line(index, f"Shard failed: {e}", True)
+        finally:
+            if chain is not None:
+                chain.terminate()
+            if os.path.exists(config_path):
+                os.remove(config_path)
+            result["seconds"] = time.perf_counter() - start
+
+    def _spawn(self, cmd, **kwargs):
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Stopped")
+            process = subprocess.Popen(cmd, cwd=self.project_dir, **kwargs)
+            self._processes.append(process)
+            return process
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            for process in self._processes:
+                if process.poll() is None:
+                    process.terminate()
@@ -0,0 +1,154 @@
+import codecs
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from ide_graph import SourceGraph
+
+# ------------------ Watch-Mode Test Daemon ------------------
+# Keeps one `truffle develop` process alive (its built-in chain plus a warm
+# Node/Truffle runtime) and drives it through the REPL by writing
+# `test <files>` to stdin. The REPL prints its prompt when a command has
+# finished, which marks the end of a run; prompts carry no newline, so the
+# reader works on raw chunks instead of going through OutputPump. Each run
+# reports the time to the first test result and to completion. Truffle's
+# REPL only recompiles contracts that changed since the last run. If the
+# process dies on its own, any run in flight is dropped and on_exit fires
+# with its return code.
+
+PROMPT = "truffle(develop)>"
+ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+RESULT = re.compile(r"^\s*(✓|✔|\d+\) )")
+SUMMARY = re.compile(r"^\s*(\d+) (passing|failing|pending)\b")
+
+
+def affected_tests(project_dir, changed_paths):
+    """Test files to re-run for a set of changed contract/test paths."""
+    test_dir = os.path.join(project_dir, "test")
+    tests = sorted(os.path.join(test_dir, name) for name in os.listdir(test_dir)
+                   if name.endswith((".js", ".ts", ".sol")))
+    affected = {os.path.abspath(p) for p in changed_paths if os.path.dirname(os.path.abspath(p)) ==
+                os.path.abspath(test_dir)}
+    # A changed contract also affects every contract that imports it
+    changed_sources = [p for p in changed_paths if p.endswith(".sol") and os.path.abspath(p) not in affected]
+    names = set()
+    if changed_sources:
+        graph = SourceGraph(project_dir)
+        for path in changed_sources:
+            for dependent in graph.dependents(path):
+                names.update(definition[1] for definition in graph.files[dependent].definitions)
+    if names:
+        for test in tests:
+            with open(test, encoding="utf-8") as f:
+                text = f.read()
+            if any(name in text for name in names):
+                affected.add(os.path.abspath(test))
+    return [t for t in tests if os.path.abspath(t) in affected]
+
+
+class TestDaemon:
+    """A long-lived `truffle develop` session that runs tests on request."""
+
+    def __init__(self, project_dir, on_line=None, on_ready=None, on_done=None, on_exit=None):
+        self.project_dir = project_dir
+        self.on_line = on_line or (lambda line, is_error: print(line))
+        self.on_ready = on_ready or (lambda: None)
+        self.on_done = on_done or (lambda summary: None)
+        self.on_exit = on_exit or (lambda returncode: self.on_line(f"truffle develop exited ({returncode})", True))
+        self.process = None
+        self.ready = False
+        self._stopping = False
+        self._run = None
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self):
+        return self._run is not None
+
+    def start(self):
+        """Spawn `truffle develop`; on_ready fires once its prompt appears."""
+        cmd = shutil.which("truffle.cmd" if os.name == "nt" else "truffle")
+        if cmd is None:
+            raise FileNotFoundError("Truffle not found in PATH")
+        self.process = subprocess.Popen(
+            [cmd, "develop"],
+            cwd=self.project_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=False
+        )
+        threading.Thread(target=self._reader, name="truffle-develop", daemon=True).start()
+
+    def run(self, test_files, started=None):
+        """Run `test_files` (all tests if empty). Returns False while busy or not ready."""
+        with self._lock:
+            if not self.ready or self._run is not None:
+                return False
+            self._run = {"started": started or time.perf_counter(), "first_result": None,
+                         "passing": 0, "failing": 0, "pending": 0,
+                         "files": [os.path.basename(f) for f in test_files]}
+        relative = [os.path.relpath(f, self.project_dir).replace(os.sep, "/") for f in test_files]
+        self.process.stdin.write(("test " + " ".join(relative)).rstrip().encode() + b"\n")
+        self.process.stdin.flush()
+        return True
+
+    def _reader(self):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        fd = self.process.stdout.fileno()
+        pending = ""
+        while True:
+            try:
+                chunk = os.read(fd, 64 * 1024)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                break
+            lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+            pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+            for line in lines:
+                self._line(ANSI.sub("", line).rstrip("\r\n"))
+            if PROMPT in ANSI.sub("", pending):
+                pending = ""
+                self._prompt()
+        with self._lock:
+            self.ready = False
+            self._run = None
+        if not self._stopping:
+            process = self.process
+            self.on_exit(process.wait() if process else None)
+
+    def _line(self, line):
+        run = self._run
+        if run is not None:
+            if run["first_result"] is None and RESULT.match(line):
+                run["first_result"] = time.perf_counter() - run["started"]
+            match = SUMMARY.match(line)
+            if match:
+                run[match.group(2)] += int(match.group(1))
+        self.on_line(line, False)
+
+    def _prompt(self):
+        if not self.ready:
+            self.ready = True
+            self.on_ready()
+            return
+        with self._lock:
+            run, self._run = self._run, None
+        if run is not None:
+            run["elapsed"] = time.perf_counter() - run["started"]
+            self.on_done(run)
+
+    def stop(self):
+        self.ready = False
+        self._stopping = True
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.write(b".exit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
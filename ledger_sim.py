@@ -0,0 +1,241 @@
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # batch mode falls back to the scalar path
+    np = None
+
+# ------------------ In-process Ledger Simulator ------------------
+# An offline stand-in for the node's account state, for load-testing payment
+# flows without Ganache. Accounts get a small integer ID on first sight and
+# their balances and nonces live in flat int64 arrays indexed by that ID.
+#
+# Balances are stored in multiples of `unit` wei (1 gwei by default) so they
+# fit in 64 bits: up to ~9.2 billion ETH at gwei resolution. Values and gas
+# prices that are not whole units are rejected.
+#
+# Validation follows the node's rules for plain value transfers: the nonce
+# must equal the account nonce, gas must cover the intrinsic cost and stay
+# under the block gas limit, the gas price must meet the base fee, and the
+# sender must hold value + gas * gas_price. The base fee is burned and the
+# rest of the fee goes to the coinbase.
+
+GWEI = 10**9
+TX_GAS = 21000
+TX_DATA_ZERO_GAS = 4
+TX_DATA_NONZERO_GAS = 16
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+Transfer = namedtuple("Transfer", "sender to value nonce gas gas_price data",
+                      defaults=(TX_GAS, 0, b""))
+Receipt = namedtuple("Receipt", "index gas_used fee")
+
+
+class TransactionRejected(ValueError):
+    """The transaction would not be accepted by the node."""
+
+
+def intrinsic_gas(data):
+    zeros = data.count(0)
+    return TX_GAS + TX_DATA_ZERO_GAS * zeros + TX_DATA_NONZERO_GAS * (len(data) - zeros)
+
+
+class Ledger:
+    """Account table that applies transfers with node-style validation."""
+
+    def __init__(self, unit=GWEI, base_fee=0, block_gas_limit=30_000_000,
+                 coinbase=ZERO_ADDRESS):
+        self.unit = unit
+        self.block_gas_limit = block_gas_limit
+        self.base_fee = self._units(base_fee, "base fee")
+        self.burned = 0
+        self.applied = 0
+        self._ids = {}
+        self._balances = array("q")
+        self._nonces = array("q")
+        self.coinbase = self.account_id(coinbase)
+
+    # ---------- accounts ----------
+    def account_id(self, address):
+        """ID of `address`, creating an empty account the first time it is seen."""
+        key = address.lower()
+        account = self._ids.get(key)
+        if account is None:
+            account = self._ids[key] = len(self._balances)
+            self._balances.append(0)
+            self._nonces.append(0)
+        return account
+
+    def fund(self, address, wei):
+        self._balances[self.account_id(address)] += self._units(wei, "amount")
+
+    def balance_of(self, address):
+        account = self._ids.get(address.lower())
+        return 0 if account is None else self._balances[account] * self.unit
+
+    def nonce_of(self, address):
+        account = self._ids.get(address.lower())
+        return 0 if account is None else self._nonces[account]
+
+    def __len__(self):
+        return len(self._balances)
+
+    def _units(self, wei, what):
+        units, remainder = divmod(wei, self.unit)
+        if remainder or wei < 0:
+            raise TransactionRejected(f"{what} {wei} is not a whole multiple of {self.unit} wei")
+        return units
+
+    # ---------- single transactions ----------
+    def apply(self, tx, index=0):
+        """Validate and apply one Transfer; raise TransactionRejected if invalid."""
+        sender = self.account_id(tx.sender)
+        receiver = self.account_id(tx.to)
+        value = self._units(tx.value, "value")
+        price = self._units(tx.gas_price, "gas price")
+        gas_used = intrinsic_gas(tx.data)
+
+        nonce = self._nonces[sender]
+        if tx.nonce < nonce:
+            raise TransactionRejected(f"nonce too low: have {nonce}, got {tx.nonce}")
+        if tx.nonce > nonce:
+            raise TransactionRejected(f"nonce too high: have {nonce}, got {tx.nonce}")
+        if tx.gas < gas_used:
+            raise TransactionRejected(f"intrinsic gas too low: need {gas_used}, got {tx.gas}")
+        if tx.gas > self.block_gas_limit:
+            raise TransactionRejected("exceeds block gas limit")
+        if price < self.base_fee:
+            raise TransactionRejected("max fee per gas less than block base fee")
+        if self._balances[sender] < value + tx.gas * price:
+            raise TransactionRejected("insufficient funds for gas * price + value")
+
+        fee = gas_used * price
+        burn = gas_used * self.base_fee
+        self._balances[sender] -= value + fee
+        self._balances[receiver] += value
+        self._balances[self.coinbase] += fee - burn
+        self._nonces[sender] = nonce + 1
+        self.burned += burn
+        self.applied += 1
+        return Receipt(index, gas_used, fee * self.unit)
+
+    # ---------- batches ----------
+    def apply_batch(self, txs, vectorized=True):
+        """Apply many transfers; return (receipts, [(index, reason), ...]).
+
+        The scalar path applies transactions strictly in list order. The
+        vectorized path (needs numpy, data-less transfers only) orders them
+        like a block builder: each sender's transactions keep their relative
+        order, but transactions of different senders are applied in waves,
+        one per sender per wave, and a wave's credits land after its debits.
+        """
+        txs = list(txs)
+        if vectorized and np is not None and not any(tx.data for tx in txs):
+            return self._apply_vectorized(txs)
+        receipts, rejected = [], []
+        for index, tx in enumerate(txs):
+            try:
+                receipts.append(self.apply(tx, index))
+            except TransactionRejected as e:
+                rejected.append((index, str(e)))
+        return receipts, rejected
+
+    def _apply_vectorized(self, txs):
+        count = len(txs)
+        account_id = self.account_id
+        senders = np.fromiter((account_id(tx.sender) for tx in txs), np.int64, count)
+        receivers = np.fromiter((account_id(tx.to) for tx in txs), np.int64, count)
+        nonces = np.zeros(count, np.int64)
+        gas = np.zeros(count, np.int64)
+        values = np.zeros(count, np.int64)
+        prices = np.zeros(count, np.int64)
+        valid = np.ones(count, bool)
+        rejected = []
+        unit = self.unit
+        int64_max = np.iinfo(np.int64).max
+        for i, tx in enumerate(txs):
+            value, value_rest = divmod(tx.value, unit)
+            price, price_rest = divmod(tx.gas_price, unit)
+            # Rows that do not fit the int64 columns are rejected here with the
+            # reason the scalar path would give, since no balance can cover them
+            if value_rest or price_rest or value < 0 or price < 0:
+                reason = f"value or gas price is not a whole multiple of {unit} wei"
+            elif tx.nonce > int64_max:
+                reason = "nonce too high"
+            elif tx.gas > self.block_gas_limit:
+                reason = "exceeds block gas limit"
+            elif value + tx.gas * price > int64_max:
+                reason = "insufficient funds for gas * price + value"
+            else:
+                nonces[i], gas[i], values[i], prices[i] = tx.nonce, tx.gas, value, price
+                continue
+            valid[i] = False
+            rejected.append((i, reason))
+        applied, reasons = self.apply_columns(senders, receivers, values, nonces, gas, prices, valid)
+        receipts = [Receipt(i, TX_GAS, fee * unit)
+                    for i, fee in zip(applied.tolist(), (prices[applied] * TX_GAS).tolist())]
+        rejected.extend(reasons)
+        rejected.sort()
+        return receipts, rejected
+
+    def apply_columns(self, senders, receivers, values, nonces, gas, prices, valid=None):
+        """Vectorized core of apply_batch for data-less transfers.
+
+        Takes numpy int64 columns (account IDs, amounts in units) and returns
+        (indices of applied rows, [(index, reason), ...]). Rows with
+        valid=False are skipped without a reason.
+        """
+        count = len(senders)
+        if valid is None:
+            valid = np.ones(count, bool)
+        # Views over the account arrays; no accounts may be added while they live
+        balances = np.frombuffer(self._balances, np.int64)
+        account_nonces = np.frombuffer(self._nonces, np.int64)
+
+        # Wave k holds the k-th transaction of every sender
+        by_sender = np.argsort(senders, kind="stable")
+        sorted_senders = senders[by_sender]
+        starts = np.flatnonzero(np.r_[True, sorted_senders[1:] != sorted_senders[:-1]])
+        waves = np.empty(count, np.int64)
+        waves[by_sender] = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+        by_wave = np.argsort(waves, kind="stable")
+        bounds = np.searchsorted(waves[by_wave], np.arange(int(waves.max()) + 2 if count else 1))
+
+        applied = []
+        reasons = []
+        for wave in range(len(bounds) - 1):
+            idx = by_wave[bounds[wave]:bounds[wave + 1]]
+            idx = idx[valid[idx]]
+            if not len(idx):
+                continue
+            s, r = senders[idx], receivers[idx]
+            expected = account_nonces[s]
+            checks = [
+                (nonces[idx] < expected, "nonce too low"),
+                (nonces[idx] > expected, "nonce too high"),
+                (gas[idx] < TX_GAS, "intrinsic gas too low"),
+                (gas[idx] > self.block_gas_limit, "exceeds block gas limit"),
+                (prices[idx] < self.base_fee, "max fee per gas less than block base fee"),
+                (balances[s] < values[idx] + gas[idx] * prices[idx],
+                 "insufficient funds for gas * price + value"),
+            ]
+            ok = np.ones(len(idx), bool)
+            for failed, reason in checks:
+                failed &= ok
+                if failed.any():
+                    reasons.extend((i, reason) for i in idx[failed].tolist())
+                    ok &= ~failed
+            idx, s, r = idx[ok], s[ok], r[ok]
+            fee = TX_GAS * prices[idx]
+            balances[s] -= values[idx] + fee                 # senders are unique per wave
+            np.add.at(balances, r, values[idx])              # receivers may repeat
+            burn = TX_GAS * self.base_fee * len(idx)
+            balances[self.coinbase] += int(fee.sum()) - burn
+            account_nonces[s] += 1
+            self.burned += burn
+            applied.append(idx)
+
+        applied = np.sort(np.concatenate(applied)) if applied else np.empty(0, np.int64)
+        self.applied += len(applied)
+        return applied, reasons
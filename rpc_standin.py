@@ -0,0 +1,379 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from bisect import bisect_right
+import rlp
+from eth_account import Account
+from eth_account._utils.legacy_transactions import Transaction
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils import keccak
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ------------------ Local JSON-RPC Stand-in ------------------
+# A tiny Ethereum-like JSON-RPC server used by the benchmarks and the load
+# generator, so the wallet code can be exercised without a running Ganache.
+# The chain is generated from a seed: the same seed always gives the same
+# accounts, blocks, transfers and balances, so runs are repeatable. Blocks
+# are mined on demand (mine()) or every `block_time` seconds. Latency and
+# failures can be injected per HTTP request, also from a seeded generator,
+# and changed while the node is running. Signed transfers sent with
+# eth_sendRawTransaction wait in a pool, with geth's nonce, funds and
+# replacement rules, and are mined in nonce order once their gas price
+# reaches min_gas_price, which makes stuck transactions easy to reproduce.
+
+CHAIN_ID = 1337
+GWEI = 10**9
+TX_GAS = 21000
+REPLACE_BUMP = 1.1  # a replacement must raise the gas price by 10%
+
+
+def seeded_balance(address):
+    """Deterministic balance (in wei) derived from the address bytes."""
+    return (int(address[-8:], 16) % 1000) * 10**16
+
+
+def _hash(*parts):
+    return "0x" + hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class SeededChain:
+    """Deterministic block and balance history built from a seed.
+
+    Every address starts at seeded_balance(); blocks carry plain value
+    transfers between `accounts` generated addresses.
+    """
+
+    def __init__(self, seed=0, accounts=100, txs_per_block=4, genesis_time=1_700_000_000):
+        self.seed = seed
+        self.txs_per_block = txs_per_block
+        self.genesis_time = genesis_time
+        self.accounts = ["0x" + _hash(seed, "account", i)[-40:] for i in range(accounts)]
+        self.blocks = [self._make_block(0, [])]
+        # address -> ([block numbers], [balance from that block on])
+        self._history = {}
+        self.nonces = {}
+        self.min_gas_price = 0
+        self.pool = {}      # (sender, nonce) -> transaction waiting to be mined
+        self.receipts = {}  # transaction hash -> receipt
+        self._lock = threading.Lock()
+
+    @property
+    def head(self):
+        return len(self.blocks) - 1
+
+    def _make_block(self, number, transactions):
+        parent = self.blocks[number - 1]["hash"] if number else "0x" + "00" * 32
+        block_hash = _hash(self.seed, "block", number)
+        for tx in transactions:
+            tx["blockHash"] = block_hash
+        return {
+            "number": hex(number), "hash": block_hash, "parentHash": parent,
+            "nonce": "0x0000000000000000", "sha3Uncles": "0x" + "00" * 32, "logsBloom": "0x" + "00" * 256,
+            "transactionsRoot": _hash(self.seed, "txroot", number), "stateRoot": _hash(self.seed, "state", number),
+            "receiptsRoot": _hash(self.seed, "receipts", number), "miner": "0x" + "00" * 20,
+            "difficulty": "0x0", "totalDifficulty": "0x0", "extraData": "0x", "size": hex(1000),
+            "gasLimit": hex(30_000_000), "gasUsed": hex(21_000 * len(transactions)),
+            "baseFeePerGas": hex(GWEI), "timestamp": hex(self.genesis_time + 2 * number),
+            "transactions": transactions, "uncles": [],
+        }
+
+    def mine(self, count=1):
+        """Append `count` blocks of seeded transfers; return the new head."""
+        with self._lock:
+            for _ in range(count):
+                number = len(self.blocks)
+                rng = random.Random(f"{self.seed}:{number}")
+                transactions = []
+                for index in range(self.txs_per_block):
+                    sender, receiver = rng.sample(self.accounts, 2)
+                    available = self._balance_at(sender, number)
+                    value = rng.randrange(1, available // 10) if available >= 20 else 0
+                    self._set_balance(sender, number, available - value)
+                    self._set_balance(receiver, number, self._balance_at(receiver, number) + value)
+                    transactions.append({
+                        "hash": _hash(self.seed, "tx", number, index), "nonce": hex(self._nonce(sender)),
+                        "blockNumber": hex(number), "transactionIndex": hex(index),
+                        "from": sender, "to": receiver, "value": hex(value), "gas": hex(21_000),
+                        "gasPrice": hex(GWEI), "input": "0x", "type": "0x0", "chainId": hex(CHAIN_ID),
+                        "v": "0x0", "r": "0x0", "s": "0x0",
+                    })
+                transactions += self._take_pool(number, len(transactions))
+                self.blocks.append(self._make_block(number, transactions))
+            return self.head
+
+    def _take_pool(self, number, first_index):
+        """Pooled transactions that can run now, in nonce order per sender."""
+        taken, gas_left = [], 30_000_000 - TX_GAS * first_index
+        for sender in sorted({sender for sender, _nonce in self.pool}):
+            nonce = self.nonces.get(sender, 0)
+            while gas_left >= TX_GAS:
+                tx = self.pool.get((sender, nonce))
+                if tx is None or int(tx["gasPrice"], 16) < self.min_gas_price:
+                    break
+                cost = int(tx["value"], 16) + TX_GAS * int(tx["gasPrice"], 16)
+                available = self._balance_at(sender, number)
+                if available < cost:
+                    break
+                del self.pool[(sender, nonce)]
+                self._set_balance(sender, number, available - cost)
+                self._set_balance(tx["to"], number, self._balance_at(tx["to"], number) + int(tx["value"], 16))
+                self.nonces[sender] = nonce = nonce + 1
+                tx.update(blockNumber=hex(number), transactionIndex=hex(first_index + len(taken)))
+                taken.append(tx)
+                gas_left -= TX_GAS
+        block_hash = _hash(self.seed, "block", number)
+        for tx in taken:
+            self.receipts[tx["hash"]] = {
+                "transactionHash": tx["hash"], "transactionIndex": tx["transactionIndex"],
+                "blockNumber": hex(number), "blockHash": block_hash, "from": tx["from"], "to": tx["to"],
+                "cumulativeGasUsed": hex(TX_GAS * (int(tx["transactionIndex"], 16) + 1)),
+                "gasUsed": hex(TX_GAS), "effectiveGasPrice": tx["gasPrice"], "contractAddress": None,
+                "logs": [], "logsBloom": "0x" + "00" * 256, "status": "0x1", "type": tx["type"],
+            }
+        return taken
+
+    def add_transaction(self, raw):
+        """Validate a signed transfer and pool it; return its hash.
+
+        Raises ValueError with the node's message when it is rejected.
+        """
+        if raw[0] <= 0x7f:
+            fields = TypedTransaction.from_bytes(raw).as_dict()
+            chain_id, tx_type = fields["chainId"], raw[0]
+            price = fields.get("gasPrice") or min(fields["maxFeePerGas"],
+                                                  GWEI + fields["maxPriorityFeePerGas"])
+        else:
+            fields = rlp.decode(raw, Transaction).as_dict()
+            chain_id, tx_type, price = (fields["v"] - 35) // 2, 0, fields["gasPrice"]
+        if chain_id != CHAIN_ID:
+            raise ValueError(f"invalid chain id {chain_id}")
+        if not fields["to"]:
+            raise ValueError("contract creation is not supported")
+        if fields["gas"] < TX_GAS:
+            raise ValueError("intrinsic gas too low")
+        sender = Account.recover_transaction(raw).lower()
+        tx_hash = "0x" + keccak(raw).hex()
+        with self._lock:
+            nonce = fields["nonce"]
+            if tx_hash in self.receipts or any(tx["hash"] == tx_hash for tx in self.pool.values()):
+                raise ValueError("already known")
+            if nonce < self.nonces.get(sender, 0):
+                raise ValueError("nonce too low")
+            if self._balance_at(sender, self.head) < fields["value"] + fields["gas"] * price:
+                raise ValueError("insufficient funds for gas * price + value")
+            queued = self.pool.get((sender, nonce))
+            if queued and price < int(queued["gasPrice"], 16) * REPLACE_BUMP:
+                raise ValueError("replacement transaction underpriced")
+            self.pool[(sender, nonce)] = {
+                "hash": tx_hash, "nonce": hex(nonce), "blockNumber": None, "transactionIndex": None,
+                "from": sender, "to": "0x" + bytes(fields["to"]).hex(), "value": hex(fields["value"]),
+                "gas": hex(fields["gas"]), "gasPrice": hex(price), "input": "0x" + bytes(fields["data"]).hex(),
+                "type": hex(tx_type), "chainId": hex(CHAIN_ID), "v": hex(fields["v"]), "r": hex(fields["r"]),
+                "s": hex(fields["s"]),
+            }
+        return tx_hash
+
+    def transaction_count(self, address, pending=False):
+        with self._lock:
+            address = address.lower()
+            nonce = self.nonces.get(address, 0)
+            while pending and (address, nonce) in self.pool:
+                nonce += 1
+            return nonce
+
+    def _nonce(self, address):
+        nonce = self.nonces.get(address, 0)
+        self.nonces[address] = nonce + 1
+        return nonce
+
+    def _set_balance(self, address, number, balance):
+        numbers, balances = self._history.setdefault(address, ([], []))
+        if numbers and numbers[-1] == number:
+            balances[-1] = balance
+        else:
+            numbers.append(number)
+            balances.append(balance)
+
+    def _balance_at(self, address, number):
+        history = self._history.get(address)
+        if history:
+            index = bisect_right(history[0], number)
+            if index:
+                return history[1][index - 1]
+        return seeded_balance(address)
+
+    def balance(self, address, number=None):
+        with self._lock:
+            return self._balance_at(address.lower(), self.head if number is None else number)
+
+    def block(self, number, full_transactions=False):
+        """Block dict as returned by eth_getBlockByNumber, or None past the head."""
+        with self._lock:
+            if not 0 <= number < len(self.blocks):
+                return None
+            block = self.blocks[number]
+        if full_transactions:
+            return block
+        return {**block, "transactions": [tx["hash"] for tx in block["transactions"]]}
+
+
+class StandinNode:
+    """Serves a SeededChain over JSON-RPC (single and batch) on localhost.
+
+    latency + uniform(0, jitter) seconds is added to each HTTP request;
+    error_rate of requests get a JSON-RPC error and http_error_rate an
+    HTTP 503. These, and chain.min_gas_price, can be changed on a running node.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, seed=0, accounts=100, txs_per_block=4, blocks=0,
+                 block_time=None, latency=0.0, jitter=0.0, error_rate=0.0, http_error_rate=0.0,
+                 min_gas_price=0):
+        self.chain = SeededChain(seed, accounts=accounts, txs_per_block=txs_per_block)
+        self.chain.min_gas_price = min_gas_price
+        if blocks:
+            self.chain.mine(blocks)
+        self.block_time = block_time
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.request_count = 0
+        self.call_counts = {}
+        self.injected_errors = 0
+        self._rng = random.Random(f"{seed}:faults")
+        self._filters = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                status, reply = node.serve(payload)
+                body = json.dumps(reply).encode() if reply is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+        self._miner = None
+
+    @property
+    def block_number(self):
+        return self.chain.head
+
+    def serve(self, payload):
+        """(HTTP status, reply) for one request body, after injected latency/faults."""
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._rng.random()
+            if roll < self.http_error_rate + self.error_rate:
+                self.injected_errors += 1
+        if delay:
+            time.sleep(delay)
+        if roll < self.http_error_rate:
+            return 503, None
+        if roll < self.http_error_rate + self.error_rate:
+            # A single error object, as nodes answer a rejected (batch) request
+            return 200, {"jsonrpc": "2.0", "id": None,
+                         "error": {"code": -32005, "message": "Injected failure"}}
+        if isinstance(payload, list):
+            return 200, [self.handle(call) for call in payload]
+        return 200, self.handle(payload)
+
+    def _block_param(self, tag):
+        if tag in ("latest", "pending", "safe", "finalized", None):
+            return self.chain.head
+        if tag == "earliest":
+            return 0
+        return int(tag, 16)
+
+    def handle(self, call):
+        """Answer a single JSON-RPC call object."""
+        method = call.get("method")
+        params = call.get("params", [])
+        with self._lock:
+            self.call_counts[method] = self.call_counts.get(method, 0) + 1
+        if method == "eth_getBalance":
+            number = self._block_param(params[1] if len(params) > 1 else "latest")
+            if number > self.chain.head:
+                return self._error(call, -32000, f"header for block {number} not found")
+            result = hex(self.chain.balance(params[0], number))
+        elif method == "eth_blockNumber":
+            result = hex(self.chain.head)
+        elif method == "eth_getBlockByNumber":
+            result = self.chain.block(self._block_param(params[0]), bool(params[1]) if len(params) > 1 else False)
+        elif method == "eth_newBlockFilter":
+            with self._lock:
+                filter_id = hex(len(self._filters) + 1)
+                self._filters[filter_id] = self.chain.head
+            result = filter_id
+        elif method == "eth_getFilterChanges":
+            with self._lock:
+                if params[0] not in self._filters:
+                    return self._error(call, -32000, "filter not found")
+                seen, self._filters[params[0]] = self._filters[params[0]], self.chain.head
+            result = [self.chain.blocks[n]["hash"] for n in range(seen + 1, self.chain.head + 1)]
+        elif method == "eth_getTransactionCount":
+            result = hex(self.chain.transaction_count(params[0], pending=len(params) > 1 and params[1] == "pending"))
+        elif method == "eth_sendRawTransaction":
+            try:
+                result = self.chain.add_transaction(bytes.fromhex(params[0][2:]))
+            except ValueError as e:
+                return self._error(call, -32000, str(e))
+        elif method == "eth_getTransactionReceipt":
+            result = self.chain.receipts.get(params[0])
+        elif method == "eth_gasPrice":
+            # Quoted regardless of min_gas_price, like a market that has moved on
+            result = hex(GWEI)
+        elif method == "eth_chainId":
+            result = hex(CHAIN_ID)
+        elif method == "net_version":
+            result = str(CHAIN_ID)
+        elif method == "web3_clientVersion":
+            result = "StandinNode/v0.2"
+        else:
+            return self._error(call, -32601, f"Method {method} not found")
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    @staticmethod
+    def _error(call, code, message):
+        return {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": code, "message": message}}
+
+    def _mine_loop(self):
+        while not self._stop.wait(self.block_time):
+            self.chain.mine()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        if self.block_time:
+            self._miner = threading.Thread(target=self._mine_loop, name="standin-miner", daemon=True)
+            self._miner.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,85 @@
+import os
+import pytest
+from erc20_gen import generate_batch, generate_erc20, output_name, read_rows, validate_options, validate_row
+from erc20_templates import CompiledTemplate, contract_template, normalize_features
+
+
+def test_compiled_template_renders_like_str_format():
+    source = "contract {contract} {{ uint x = {supply}; string s = \"{contract}\"; }}"
+    template = CompiledTemplate(source)
+    assert template.render(contract="A", supply="5") == source.format(contract="A", supply="5")
+
+
+def test_bind_fills_slots_and_leaves_render_fields():
+    template = CompiledTemplate("a{guard}b{name}c").bind(guard="!")
+    assert [field for _position, field in template.fields] == ["name"]
+    assert template.render(name="X") == "a!bXc"
+
+
+def test_feature_sets_are_normalized_and_cached():
+    assert normalize_features(["pausable", "capped", "capped"]) == ("capped", "pausable")
+    assert contract_template(("capped", "pausable")) is contract_template(("capped", "pausable"))
+    with pytest.raises(ValueError, match="Unknown feature"):
+        normalize_features(["taxed"])
+
+
+@pytest.mark.parametrize("optimized", [False, True])
+def test_generated_contract_has_requested_features(optimized):
+    source = generate_erc20("My Token", "MTK", 1000, ["mintable", "capped"], cap=5000, optimized=optimized)
+    assert "contract MyToken" in source
+    assert "function mint(" in source
+    assert "5000" in source
+    assert "function burn(" not in source
+    assert "{" in source and "{{" not in source
+
+
+def test_capped_without_cap_is_rejected():
+    with pytest.raises(ValueError, match="needs a cap"):
+        generate_erc20("T", "T", 10, ["capped"])
+
+
+@pytest.mark.parametrize("row, error", [
+    (("Token", "TKN", "100"), None),
+    (("", "TKN", "100"), "All fields are required"),
+    (("Token", "TKN", "1e5"), "Total Supply must be a number"),
+])
+def test_validate_row(row, error):
+    assert validate_row(*row) == error
+
+
+@pytest.mark.parametrize("supply, features, cap, error", [
+    ("100", (), None, None),
+    ("100", ("capped",), 100, None),
+    ("100", ("capped",), None, "Max Supply must be a number for a capped token"),
+    ("1000", ("capped",), 10, "Max Supply cannot be below Total Supply"),
+])
+def test_validate_options(supply, features, cap, error):
+    assert validate_options(supply, features, cap) == error
+
+
+def test_batch_rejects_rows_whose_supply_exceeds_the_cap(tmp_path):
+    rows = [("Small", "SML", "5"), ("Big", "BIG", "1000")]
+    stats = generate_batch(rows, str(tmp_path), features=["capped"], cap=10)
+
+    assert stats["generated"] == 1
+    assert stats["errors"] == [(2, "Max Supply cannot be below Total Supply")]
+    assert sorted(os.listdir(tmp_path)) == [".erc20_manifest", output_name("Small", "SML", "5", ("capped",))]
+
+
+def test_batch_skips_duplicates_and_rows_from_earlier_runs(tmp_path):
+    rows = [("A", "AAA", "1"), ("A", "AAA", "1"), ("B", "BBB", "x")]
+    first = generate_batch(rows, str(tmp_path))
+    assert (first["generated"], first["skipped"], len(first["errors"])) == (1, 1, 1)
+
+    second = generate_batch(rows + [("C", "CCC", "3")], str(tmp_path))
+    assert (second["generated"], second["skipped"]) == (1, 2)
+
+
+def test_read_rows_accepts_csv_and_json(tmp_path):
+    csv_path = tmp_path / "tokens.csv"
+    csv_path.write_text("name,symbol,supply\nAlpha,ALP, 10\n")
+    json_path = tmp_path / "tokens.json"
+    json_path.write_text('[{"name": "Beta", "symbol": "BET", "supply": 20}, ["Gamma", "GAM", 30]]')
+
+    assert read_rows(str(csv_path)) == [("Alpha", "ALP", "10")]
+    assert read_rows(str(json_path)) == [("Beta", "BET", "20"), ("Gamma", "GAM", "30")]
@@ -0,0 +1,146 @@
+import json
+import os
+import pytest
+import ide_graph
+from ide_graph import ProjectBuilder, SourceGraph, generate_migrations, sync_migrations
+
+pytest.importorskip("solcx")
+
+
+def write(project, rel, text):
+    path = os.path.join(project, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return os.path.normpath(path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    project = str(tmp_path)
+    write(project, "contracts/Math.sol", "pragma solidity ^0.8.0;\nlibrary Math { function one() internal pure returns (uint) { return 1; } }\n")
+    write(project, "contracts/Token.sol", 'pragma solidity ^0.8.0;\nimport "./Math.sol";\ncontract Token { }\n')
+    write(project, "contracts/Vault.sol",
+          'import {Token} from "./Token.sol";\n// import "./Missing.sol";\n'
+          "contract Vault { constructor(address owner) {} }\n")
+    write(project, "contracts/Solo.sol", "contract Solo { string s = \"contract Fake {\"; }\n")
+    return project
+
+
+def test_imports_definitions_and_order(project):
+    graph = SourceGraph(project)
+    by_rel = {source.rel: path for path, source in graph.files.items()}
+    vault = graph.files[by_rel["contracts/Vault.sol"]]
+    assert vault.imports == [by_rel["contracts/Token.sol"]]
+    assert vault.definitions == [("contract", "Vault", True)]
+    assert graph.files[by_rel["contracts/Solo.sol"]].definitions == [("contract", "Solo", False)]
+
+    order = [graph.files[p].rel for p in graph.order()]
+    assert order.index("contracts/Math.sol") < order.index("contracts/Token.sol") < order.index("contracts/Vault.sol")
+    assert [graph.files[p].rel for p in graph.dependents(by_rel["contracts/Math.sol"])] == \
+        ["contracts/Math.sol", "contracts/Token.sol", "contracts/Vault.sol"]
+
+
+def test_closure_hash_changes_only_for_importers(project):
+    before = SourceGraph(project)
+    hashes = {before.files[p].rel: before.closure_hash(p) for p in before.local_files()}
+    write(project, "contracts/Token.sol", 'pragma solidity ^0.8.0;\nimport "./Math.sol";\ncontract Token { uint x; }\n')
+    after = SourceGraph(project)
+    changed = {after.files[p].rel for p in after.local_files() if after.closure_hash(p) != hashes[after.files[p].rel]}
+    assert changed == {"contracts/Token.sol", "contracts/Vault.sol"}
+
+
+def test_migrations_link_libraries_and_skip_constructor_arguments(project):
+    script = generate_migrations(SourceGraph(project))
+    assert script.index("deployer.deploy(Math)") < script.index("deployer.link(Math, Token)") \
+        < script.index("deployer.deploy(Token)")
+    assert "deployer.deploy(Vault)" not in script
+    assert "deploy manually: Vault" in script
+
+
+def test_libraries_are_linked_into_contracts_of_their_own_file(project):
+    write(project, "contracts/Pool.sol", "contract Pool { function f() public { Fees.take(); } }\n"
+          "library Fees { function take() public {} }\n")
+    script = generate_migrations(SourceGraph(project))
+    assert script.index("deployer.deploy(Fees)") < script.index("deployer.link(Fees, Pool)") \
+        < script.index("deployer.deploy(Pool)")
+    assert "deployer.link(Fees, Fees)" not in script
+
+
+def test_hand_written_migrations_are_left_alone(project):
+    path = write(project, "migrations/1_deploy_contracts.js", "module.exports = () => {};\n")
+    assert sync_migrations(project) is False
+    with open(path) as f:
+        assert f.read() == "module.exports = () => {};\n"
+
+
+def fake_compile(path, solc_version, allow_paths, remappings, optimizer=(False, 200)):
+    with open(path, encoding="utf-8") as f:
+        source = ide_graph.SourceFile(path, path, f.read())
+    return {name: {"abi": [], "bin": "00", "bin-runtime": "00", "optimizer": list(optimizer)}
+            for _kind, name, _args in source.definitions}
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    project = str(tmp_path)
+    write(project, "contracts/Pair.sol", "contract A { }\ncontract B { }\n")
+    monkeypatch.setattr(ide_graph, "_compile_file", fake_compile)
+    builder = ProjectBuilder(project, "0.8.19")
+    monkeypatch.setattr(builder, "ensure_compiler", lambda on_line=None: None)
+    return builder
+
+
+def test_build_is_incremental_and_removes_deleted_contracts(builder):
+    assert builder.build()["compiled"] == 1
+    assert builder.build()["compiled"] == 0
+    assert sorted(builder.artifacts()) == ["A", "B"]
+
+    write(builder.project_dir, "contracts/Pair.sol", "contract A { uint x; }\n")
+    assert builder.build()["compiled"] == 1
+    assert sorted(builder.artifacts()) == ["A"]
+    assert not os.path.exists(os.path.join(builder.build_dir, "B.json"))
+
+
+def test_contract_moved_to_another_file_keeps_its_artifact(builder):
+    builder.build()
+    write(builder.project_dir, "contracts/Pair.sol", "contract A { }\n")
+    write(builder.project_dir, "contracts/Other.sol", "contract B { }\n")
+    assert builder.build()["compiled"] == 2
+    assert sorted(builder.artifacts()) == ["A", "B"]
+
+
+def test_optimizer_settings_come_from_truffle_config(builder):
+    write(builder.project_dir, "truffle-config.js",
+          'module.exports = { compilers: { solc: { version: "0.8.19", settings: { optimizer: '
+          '{ enabled: true, runs: 1000 } } } } };\n')
+    optimized = ProjectBuilder(builder.project_dir, "0.8.19")
+    assert optimized.optimizer == (True, 1000)
+    assert builder.optimizer == (False, 200)
+
+    builder.build()
+    optimized.ensure_compiler = lambda on_line=None: None
+    assert optimized.build()["compiled"] == 1  # different settings invalidate the build state
+    with open(os.path.join(builder.build_dir, ide_graph.STATE_FILE)) as f:
+        assert json.load(f)["optimizer"] == [True, 1000]
+
+
+def test_failed_solc_download_is_not_retried(tmp_path, monkeypatch):
+    builder = ProjectBuilder(str(tmp_path), "0.8.19")
+    attempts = []
+
+    def offline(version):
+        attempts.append(version)
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(builder._solcx, "get_installed_solc_versions", lambda: [])
+    monkeypatch.setattr(builder._solcx, "install_solc", offline)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="solc 0.8.19 is not installed"):
+            builder.ensure_compiler()
+    assert attempts == ["0.8.19"]
+
+    monkeypatch.setattr(ide_graph, "SOLC_RETRY", 0)
+    with pytest.raises(RuntimeError, match="could not be downloaded"):
+        builder.ensure_compiler()
+    assert len(attempts) == 2
@@ -0,0 +1,86 @@
+import sqlite3
+import pytest
+from ide_history import RunHistory
+
+
+def record(title, ms=None, gas=None, status="passed", suite="Token"):
+    return {"suite": suite, "title": title, "status": status, "ms": ms, "gas": gas, "error": None}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite3"), window=3, min_samples=3)
+    yield history
+    history.close()
+
+
+def test_runs_store_counts_and_status(history):
+    first = history.record_run([record("a", 10), record("b", status="failed")], "truffle", "abc", 0.5)
+    second = history.record_run([record("a", 11)], "python")
+    runs = history.runs()
+    assert [run[0] for run in runs] == [second, first]
+    assert runs[1][2:] == ("truffle", "abc", 1, 1, 0, 0.5, "failed")
+    assert runs[0][-1] == "passed"
+
+
+def test_runs_without_results_are_recorded_as_errors(history):
+    compile_error = history.record_run([], "truffle", status="failed")
+    crashed = history.record_run([], "truffle")
+    assert {run[0]: run[-1] for run in history.runs()} == {compile_error: "error", crashed: "error"}
+    assert history.regressions(compile_error) == []
+
+
+def test_regressions_need_a_full_baseline(history):
+    for ms in (10, 10):
+        history.record_run([record("a", ms)], "truffle")
+    history.record_run([record("a", 100)], "truffle")
+    assert history.regressions() == []  # only two earlier samples
+
+    history.record_run([record("a", 100)], "truffle")
+    (item,) = history.regressions()
+    assert item["kinds"] == ["time"]
+    assert item["base_ms"] == pytest.approx(40.0)
+
+
+def test_baseline_rolls_over_the_last_window_of_passing_samples(history):
+    for ms in (10, 10, 10, 50, 50, 50):
+        history.record_run([record("a", ms)], "truffle")
+    history.record_run([record("a", 55)], "truffle")
+    assert history.regressions() == []  # the 10 ms samples have left the window
+    history.record_run([record("a", 500, status="failed")], "truffle")
+    history.record_run([record("a", 80)], "truffle")
+    (item,) = history.regressions()
+    assert item["base_ms"] == pytest.approx((50 + 50 + 55) / 3)
+
+
+def test_gas_regressions_and_small_time_changes(history):
+    for _ in range(3):
+        history.record_run([record("a", 2, 50000)], "truffle")
+    history.record_run([record("a", 4, 50000)], "truffle")
+    assert history.regressions() == []  # 2 ms slower is under min_ms
+    history.record_run([record("a", 2, 60000)], "truffle")
+    assert [item["kinds"] for item in history.regressions()] == [["gas"]]
+
+
+def test_test_history_lists_every_status(history):
+    history.record_run([record("a", 5)], "truffle")
+    history.record_run([record("a", status="failed")], "truffle")
+    assert [row[1] for row in history.test_history("Token", "a")] == ["failed", "passed"]
+
+
+def test_opens_stores_created_before_the_status_column(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, started REAL NOT NULL, backend TEXT NOT NULL, "
+               "source_hash TEXT, passed INTEGER NOT NULL, failed INTEGER NOT NULL, pending INTEGER NOT NULL, "
+               "seconds REAL)")
+    db.execute("INSERT INTO runs VALUES (1, 0, 'truffle', NULL, 1, 0, 0, 1.0)")
+    db.commit()
+    db.close()
+
+    history = RunHistory(path)
+    try:
+        history.record_run([], "truffle")
+        assert [run[-1] for run in history.runs()] == ["error", None]
+    finally:
+        history.close()
@@ -0,0 +1,87 @@
+import json
+import xml.etree.ElementTree as ET
+from ide_results import ResultParser
+
+OUTPUT = """\
+Compiling your contracts...
+
+  Contract: Token
+    ✓ has a name
+    ✔ transfers tokens (152ms, 51234 gas)
+    1) rejects overdrafts
+    - approves later
+
+
+  2 passing (1s)
+  1 pending
+  1 failing
+
+  1) Contract: Token
+       rejects overdrafts:
+     Error: VM Exception while processing transaction: revert
+      at Context.<anonymous> (test/token.js:20:5)
+"""
+
+
+def parse(text, parser=None, stream=None):
+    parser = parser or ResultParser()
+    for line in text.splitlines():
+        parser.feed(line, stream=stream)
+    return parser
+
+
+def test_records_status_timing_gas_and_error():
+    records = parse(OUTPUT).records
+    assert [(r["title"], r["status"]) for r in records] == [
+        ("has a name", "passed"), ("transfers tokens", "passed"),
+        ("rejects overdrafts", "failed"), ("approves later", "pending"),
+    ]
+    assert all(r["suite"] == "Token" for r in records)
+    assert (records[0]["ms"], records[0]["gas"]) == (None, None)
+    assert (records[1]["ms"], records[1]["gas"]) == (152.0, 51234)
+    assert records[2]["error"].startswith("Error: VM Exception while processing transaction: revert")
+    assert "test/token.js:20:5" in records[2]["error"]
+
+
+def test_lines_before_the_first_suite_are_ignored():
+    parser = ResultParser()
+    assert parser.feed("  ✓ not a test yet") is None
+    assert parser.records == []
+
+
+def test_streams_keep_interleaved_runs_apart():
+    parser = ResultParser()
+    first = OUTPUT.splitlines()
+    second = OUTPUT.replace("Contract: Token", "Contract: Vault").splitlines()
+    for a, b in zip(first, second):
+        parser.feed(a, stream=0)
+        parser.feed(b, stream=1)
+    by_suite = {}
+    for record in parser.records:
+        by_suite.setdefault(record["suite"], []).append(record["status"])
+    assert by_suite == {"Token": ["passed", "passed", "failed", "pending"],
+                        "Vault": ["passed", "passed", "failed", "pending"]}
+    assert all(r["error"] for r in parser.records if r["status"] == "failed")
+
+
+def test_summary_slowest_and_gas_hotspots():
+    parser = parse(OUTPUT)
+    assert parser.summary() == {"passed": 2, "failed": 1, "pending": 1, "ms": 152.0}
+    assert [r["title"] for r in parser.slowest()] == ["transfers tokens"]
+    assert [r["gas"] for r in parser.gas_hotspots()] == [51234]
+
+
+def test_json_and_junit_reports(tmp_path):
+    parser = parse(OUTPUT)
+    parser.write_json(tmp_path / "results.json")
+    parser.write_junit(tmp_path / "results.xml")
+
+    data = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert data["summary"]["failed"] == 1 and len(data["tests"]) == 4
+
+    suite = ET.parse(tmp_path / "results.xml").getroot().find("testsuite")
+    assert suite.get("name") == "Token"
+    assert (suite.get("tests"), suite.get("failures"), suite.get("skipped")) == ("4", "1", "1")
+    failure = suite.find("testcase[@name='rejects overdrafts']/failure")
+    assert failure.get("message").startswith("Error: VM Exception")
+    assert suite.find("testcase[@name='transfers tokens']/properties/property").get("value") == "51234"
@@ -0,0 +1,69 @@
+import os
+import pytest
+import ide_runner
+
+pytest.importorskip("eth_tester")
+from ide_evm import EVMTestRunner  # noqa: E402
+
+TESTS = '''def test_main_contract(contract, Other):
+    assert contract.name == "Storage" and Other.name == "Other"
+'''
+
+
+class FakeContract:
+    def __init__(self, name):
+        self.name = name
+
+
+def write(project, name, text):
+    path = os.path.join(project, "contracts", name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def test_main_contract_skips_libraries_abstract_and_constructor_arguments(tmp_path):
+    path = write(str(tmp_path), "Storage.sol",
+                 "library L { }\ncontract Storage { }\nabstract contract Base { }\n"
+                 "contract Vault { constructor(address o) {} }\ninterface I { }\n")
+    assert ide_runner.main_contract(path) == "Storage"
+    assert ide_runner.main_contract(write(str(tmp_path), "Only.sol", "library L { }\n")) is None
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    lines = []
+    runner = EVMTestRunner(on_line=lambda line, is_error: lines.append(line))
+    runner.lines = lines
+    # Storage is deployed before Other, as a build of two files may order them
+    monkeypatch.setattr(runner, "deploy", lambda artifacts: {name: FakeContract(name) for name in artifacts})
+    return runner
+
+
+def test_contract_fixture_is_the_selected_files_contract(tmp_path, runner, monkeypatch):
+    project = str(tmp_path)
+    write(project, "Storage.sol", "contract Storage { }\n")
+    write(project, "Other.sol", "contract Other { }\n")
+    tests = os.path.join(project, "test", "test_storage.py")
+    os.makedirs(os.path.dirname(tests))
+    with open(tests, "w") as f:
+        f.write(TESTS)
+
+    class Builder:
+        def __init__(self, project_dir, solc_version):
+            pass
+
+        def build(self, on_line):
+            return {"compiled": 0}
+
+        def artifacts(self):
+            return {"Storage": None, "Other": None}
+
+    monkeypatch.setattr(ide_runner, "ProjectBuilder", Builder)
+    summary = ide_runner.run_python_tests(project, runner, selected="Storage.sol")
+    assert summary["passing"] == 1
+    assert "  Contract: Storage" in runner.lines
+
+    # Without a selection the last contract deployed is used
+    assert ide_runner.run_python_tests(project, runner)["failing"] == 1
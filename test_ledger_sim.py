@@ -0,0 +1,126 @@
+import pytest
+from ledger_sim import GWEI, TX_GAS, Ledger, TransactionRejected, Transfer, intrinsic_gas
+
+ALICE = "0x00000000000000000000000000000000000000a1"
+BOB = "0x00000000000000000000000000000000000000b2"
+CAROL = "0x00000000000000000000000000000000000000c3"
+MINER = "0x00000000000000000000000000000000000000ff"
+
+
+def funded_ledger(**kwargs):
+    ledger = Ledger(coinbase=MINER, **kwargs)
+    ledger.fund(ALICE, 10**18)
+    ledger.fund(BOB, 10**18)
+    return ledger
+
+
+def test_intrinsic_gas_counts_zero_and_nonzero_bytes():
+    assert intrinsic_gas(b"") == TX_GAS
+    assert intrinsic_gas(b"\x00\x01\x02") == TX_GAS + 4 + 16 * 2
+
+
+def test_apply_moves_value_and_splits_fee_between_burn_and_coinbase():
+    ledger = funded_ledger(base_fee=GWEI)
+    receipt = ledger.apply(Transfer(ALICE, CAROL, 5 * GWEI, 0, gas_price=3 * GWEI))
+
+    assert receipt.gas_used == TX_GAS
+    assert receipt.fee == TX_GAS * 3 * GWEI
+    assert ledger.balance_of(CAROL) == 5 * GWEI
+    assert ledger.balance_of(ALICE) == 10**18 - 5 * GWEI - receipt.fee
+    assert ledger.balance_of(MINER) == TX_GAS * 2 * GWEI
+    assert ledger.burned * ledger.unit == TX_GAS * GWEI
+    assert ledger.nonce_of(ALICE) == 1
+
+
+@pytest.mark.parametrize("tx, reason", [
+    (Transfer(ALICE, BOB, GWEI, 1), "nonce too high"),
+    (Transfer(ALICE, BOB, GWEI, 0, gas=20999), "intrinsic gas too low"),
+    (Transfer(ALICE, BOB, GWEI, 0, gas=40_000_000), "exceeds block gas limit"),
+    (Transfer(ALICE, BOB, 2 * 10**18, 0), "insufficient funds"),
+    (Transfer(ALICE, BOB, 1, 0), "not a whole multiple"),
+])
+def test_apply_rejects_like_the_node(tx, reason):
+    ledger = funded_ledger()
+    with pytest.raises(TransactionRejected, match=reason):
+        ledger.apply(tx)
+    assert ledger.nonce_of(ALICE) == 0
+    assert ledger.balance_of(ALICE) == 10**18
+
+
+def test_apply_rejects_gas_price_below_base_fee_and_replayed_nonce():
+    ledger = funded_ledger(base_fee=2 * GWEI)
+    with pytest.raises(TransactionRejected, match="base fee"):
+        ledger.apply(Transfer(ALICE, BOB, GWEI, 0, gas_price=GWEI))
+    ledger.apply(Transfer(ALICE, BOB, GWEI, 0, gas_price=2 * GWEI))
+    with pytest.raises(TransactionRejected, match="nonce too low"):
+        ledger.apply(Transfer(ALICE, BOB, GWEI, 0, gas_price=2 * GWEI))
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_apply_batch_reports_rejections_by_index(vectorized):
+    ledger = funded_ledger()
+    txs = [
+        Transfer(ALICE, CAROL, GWEI, 0),
+        Transfer(ALICE, CAROL, GWEI, 5),          # gap
+        Transfer(BOB, CAROL, GWEI, 0),
+        Transfer(BOB, CAROL, 10**19, 1),          # more than Bob holds
+    ]
+    receipts, rejected = ledger.apply_batch(txs, vectorized=vectorized)
+
+    assert [r.index for r in receipts] == [0, 2]
+    assert [(index, reason.split(":")[0]) for index, reason in rejected] == \
+        [(1, "nonce too high"), (3, "insufficient funds for gas * price + value")]
+    assert ledger.balance_of(CAROL) == 2 * GWEI
+    assert ledger.applied == 2
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_amounts_beyond_64_bits_reject_only_their_row(vectorized):
+    ledger = funded_ledger()
+    txs = [
+        Transfer(ALICE, CAROL, 2**64 * GWEI, 0),            # value overflows int64 units
+        Transfer(ALICE, CAROL, GWEI, 0, gas_price=2**70 * GWEI),
+        Transfer(ALICE, CAROL, GWEI, 2**64),
+        Transfer(ALICE, CAROL, GWEI, 0),
+    ]
+    receipts, rejected = ledger.apply_batch(txs, vectorized=vectorized)
+    assert [r.index for r in receipts] == [3]
+    assert [(index, reason.split(":")[0]) for index, reason in rejected] == [
+        (0, "insufficient funds for gas * price + value"),
+        (1, "insufficient funds for gas * price + value"),
+        (2, "nonce too high"),
+    ]
+    assert ledger.balance_of(CAROL) == GWEI
+
+
+def test_vectorized_batch_matches_scalar_for_independent_senders():
+    pytest.importorskip("numpy")
+    senders = [f"0x{i:040x}" for i in range(1, 21)]
+    txs = [Transfer(senders[i % 20], senders[(i * 7 + 3) % 20], (i + 1) * GWEI, i // 20, gas_price=GWEI)
+           for i in range(200)]
+    results = []
+    for vectorized in (True, False):
+        ledger = Ledger(coinbase=MINER)
+        for sender in senders:
+            ledger.fund(sender, 10**18)
+        receipts, rejected = ledger.apply_batch(txs, vectorized=vectorized)
+        results.append(([r.index for r in receipts], rejected,
+                        [ledger.balance_of(a) for a in senders + [MINER]]))
+    assert results[0] == results[1]
+
+
+def test_vectorized_wave_credits_land_after_debits():
+    pytest.importorskip("numpy")
+    ledger = Ledger(coinbase=MINER)
+    ledger.fund(ALICE, 10**18)
+    # Carol starts empty: in the same wave she cannot spend what Alice sends her
+    txs = [Transfer(ALICE, CAROL, 10**17, 0), Transfer(CAROL, BOB, GWEI, 0)]
+    receipts, rejected = ledger.apply_batch(txs, vectorized=True)
+    assert [r.index for r in receipts] == [0]
+    assert rejected == [(1, "insufficient funds for gas * price + value")]
+
+    # The scalar path applies strictly in order, so the second transfer goes through
+    ledger = Ledger(coinbase=MINER)
+    ledger.fund(ALICE, 10**18)
+    receipts, rejected = ledger.apply_batch(txs, vectorized=False)
+    assert [r.index for r in receipts] == [0, 1]
@@ -0,0 +1,59 @@
+import pytest
+from web3 import Web3
+from rpc_standin import StandinNode
+from tx_index import TxIndexer
+
+
+def web3_for(node):
+    return Web3(Web3.HTTPProvider(node.url))
+
+
+def chain_rows(node):
+    return [(int(tx["blockNumber"], 16), tx["hash"])
+            for block in node.chain.blocks for tx in block["transactions"]]
+
+
+def indexed_rows(indexer):
+    return [(row["block"], row["hash"]) for row in indexer.transfers_in_blocks(0, 10**9)]
+
+
+@pytest.fixture
+def node():
+    with StandinNode(blocks=30) as node:
+        yield node
+
+
+@pytest.fixture
+def indexer(node, tmp_path):
+    indexer = TxIndexer(web3_for(node), str(tmp_path / "history.sqlite3"), page_size=8, reorg_depth=4)
+    yield indexer
+    indexer.close()
+
+
+def test_sync_resumes_from_the_checkpoint(node, indexer):
+    assert indexer.sync(max_blocks=10) == 10
+    assert indexer.sync() == 21
+    node.chain.mine(3)
+    assert indexer.sync() == 3
+    assert indexed_rows(indexer) == chain_rows(node)
+    address = node.chain.blocks[5]["transactions"][0]["from"]
+    assert all(address in (row["from"], row["to"]) for row in indexer.last_transfers(address))
+
+
+def test_shallow_reorg_reindexes_only_the_forked_blocks(node, indexer):
+    indexer.sync()
+    for number in (28, 29, 30):
+        node.chain.blocks[number] = {**node.chain.blocks[number], "hash": "0x" + f"{number:064x}",
+                                     "transactions": []}
+    assert indexer.sync() == 3
+    assert indexer.checkpoint() == (30, "0x" + f"{30:064x}")
+    assert indexed_rows(indexer) == chain_rows(node)
+
+
+@pytest.mark.parametrize("blocks", [20, 60])
+def test_switching_to_another_chain_rebuilds_the_index(indexer, blocks):
+    indexer.sync()
+    with StandinNode(seed=1, blocks=blocks) as other:
+        indexer.web3 = web3_for(other)
+        assert indexer.sync() == blocks + 1
+        assert indexed_rows(indexer) == chain_rows(other)
@@ -0,0 +1,80 @@
+import threading
+import time
+import tkinter as tk
+import pytest
+from wallet_async import BackgroundRPCClient
+
+
+class FakeRoot:
+    """Runs root.after callbacks immediately, on the calling thread."""
+
+    def __init__(self, destroyed=False):
+        self.destroyed = destroyed
+
+    def after(self, _ms, callback, *args):
+        if self.destroyed:
+            raise tk.TclError('can\'t invoke "after" command: application has been destroyed')
+        callback(*args)
+
+
+@pytest.fixture
+def client():
+    client = BackgroundRPCClient(FakeRoot(), timeout=0.3, max_in_flight=2)
+    yield client
+    client.close()
+
+
+def test_results_and_errors_reach_the_callbacks(client):
+    results, errors = [], []
+    client.submit(lambda x: x * 2, 21, on_result=results.append).result(timeout=5)
+    future = client.submit(lambda: 1 / 0, on_error=errors.append)
+    with pytest.raises(ZeroDivisionError):
+        future.result(timeout=5)
+    time.sleep(0.05)
+    assert results == [42] and isinstance(errors[0], ZeroDivisionError)
+
+
+def test_queued_jobs_time_out_while_the_node_hangs(client):
+    release = threading.Event()
+    running, peak, errors = [0], [0], []
+    lock = threading.Lock()
+
+    def hang():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(5)
+        with lock:
+            running[0] -= 1
+
+    start = time.monotonic()
+    futures = [client.submit(hang, on_error=errors.append) for _ in range(5)]
+    for future in futures:
+        with pytest.raises(TimeoutError):
+            future.result(timeout=5)
+    assert time.monotonic() - start < 1.0  # queued ones too, not after the running ones
+    release.set()
+    time.sleep(0.1)
+    assert peak[0] == 2
+    assert len(errors) == 5 and all(isinstance(e, TimeoutError) for e in errors)
+
+
+def test_cancelled_job_does_not_run(client):
+    release = threading.Event()
+    ran = []
+    for _ in range(2):
+        client.submit(release.wait, 5)
+    queued = client.submit(ran.append, 1)
+    assert queued.cancel()
+    release.set()
+    client.submit(lambda: None).result(timeout=5)
+    assert ran == []
+
+
+def test_results_after_the_window_closed_are_dropped():
+    client = BackgroundRPCClient(FakeRoot(destroyed=True), timeout=1)
+    try:
+        assert client.submit(lambda: 1, on_result=print).result(timeout=5) == 1
+        client._to_gui(print, 1)  # must not raise TclError
+    finally:
+        client.close()
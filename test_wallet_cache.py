@@ -0,0 +1,55 @@
+import pytest
+from web3 import Web3
+from rpc_standin import StandinNode
+from wallet_cache import BalanceCache
+from wallet_rpc import BalanceEngine
+
+
+@pytest.fixture
+def node():
+    with StandinNode(blocks=5) as node:
+        yield node
+
+
+@pytest.fixture
+def cache(node):
+    engine = BalanceEngine(Web3(Web3.HTTPProvider(node.url)))
+    return BalanceCache(engine, head_refresh_interval=0)
+
+
+def on_chain(node, addresses):
+    return {a: node.chain.balance(a) for a in addresses}
+
+
+def test_balances_follow_the_head(node, cache):
+    addresses = [Web3.to_checksum_address(a) for a in node.chain.accounts[:20]]
+    assert cache.get_balances(addresses) == on_chain(node, addresses)
+    for _ in range(3):
+        node.chain.mine(2)
+        assert cache.get_balances(addresses) == on_chain(node, addresses)
+    assert cache.stats()["hits"] > 0
+
+
+def test_invalidation_while_choosing_the_head_is_not_lost(node, cache, monkeypatch):
+    address = Web3.to_checksum_address(node.chain.accounts[0])
+    old_head = cache.head()
+    real_head = cache.head
+
+    def racing_head():
+        # Another thread advances the head and invalidates the address
+        # after this lookup picked its block
+        cache.invalidate([address])
+        return old_head
+
+    monkeypatch.setattr(cache, "head", racing_head)
+    cache.get_balances([address])
+    monkeypatch.setattr(cache, "head", real_head)
+    assert (address, old_head) not in cache._entries
+
+
+def test_going_backwards_clears_the_cache(node, cache):
+    address = Web3.to_checksum_address(node.chain.accounts[0])
+    cache.get_balances([address])
+    node.chain.blocks = node.chain.blocks[:3]
+    cache.head()
+    assert cache.stats()["entries"] == 0
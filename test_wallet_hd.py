@@ -0,0 +1,112 @@
+import os
+import pytest
+from eth_account import Account
+from wallet_hd import HDKeyring, KeystoreIndex, bip44_path
+
+MNEMONIC = "test test test test test test test test test test test junk"
+# Well-known first accounts of the Hardhat/Anvil development mnemonic
+KNOWN = ["0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266", "0x70997970C51812dc3A010C7d01b50e0d17dc79C8",
+         "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"]
+
+Account.enable_unaudited_hdwallet_features()
+
+
+@pytest.fixture(scope="module")
+def keyring():
+    return HDKeyring(MNEMONIC)
+
+
+def test_addresses_match_known_vectors(keyring):
+    assert [keyring.address(i) for i in range(3)] == KNOWN
+
+
+@pytest.mark.parametrize("account, index", [(0, 0), (0, 7), (1, 3)])
+def test_private_keys_match_eth_account(account, index):
+    expected = Account.from_mnemonic(MNEMONIC, account_path=bip44_path(account, index))
+    keyring = HDKeyring(MNEMONIC, account=account)
+    assert keyring.private_key(index) == bytes(expected.key)
+    assert keyring.address(index) == expected.address
+
+
+def test_passphrase_changes_the_accounts():
+    assert HDKeyring(MNEMONIC, passphrase="x").address(0) != KNOWN[0]
+
+
+def test_invalid_mnemonic_is_a_value_error():
+    with pytest.raises(ValueError, match="Invalid mnemonic"):
+        HDKeyring("not a mnemonic")
+
+
+def test_invalid_child_keys_are_refused_in_both_paths(keyring, monkeypatch):
+    import wallet_hd
+    # Pretend every HMAC output is at least the curve order
+    monkeypatch.setattr(wallet_hd, "hmac_sha512", lambda key, data: b"\xff" * 64)
+    with pytest.raises(ValueError, match="Index 4 derives an invalid key"):
+        keyring.private_key(4)
+    with pytest.raises(ValueError, match="Index 4 derives an invalid key"):
+        keyring.derive(4, 2, workers=1)
+
+
+def test_parallel_derivation_matches_serial(keyring, monkeypatch):
+    import wallet_hd
+    monkeypatch.setattr(wallet_hd, "CHUNK", 4)
+    serial = keyring.derive(2, 10, workers=1)
+    assert keyring.derive(2, 10, workers=2) == serial
+    assert len(serial) == 200
+    assert serial[:20] == bytes.fromhex(KNOWN[2][2:])
+
+
+def test_index_lookups(keyring, tmp_path):
+    path = str(tmp_path / "index.bin")
+    index = KeystoreIndex.build(path, keyring, 5, workers=1)
+    try:
+        assert len(index) == 5
+        assert index.addresses(0, 3) == KNOWN
+        assert index.find(KNOWN[1].lower()) == 1
+        assert index.find("0x" + "00" * 20) is None
+        assert index.path_of(KNOWN[2]) == "m/44'/60'/0'/0/2"
+        assert index.resolve(1) == index.resolve("m/44'/60'/0'/0/1") == index.resolve(KNOWN[1].lower()) == KNOWN[1]
+        with pytest.raises(ValueError):
+            index.resolve("m/44'/60'/1'/0/1")
+        with pytest.raises(IndexError):
+            index.address(5)
+    finally:
+        index.close()
+
+
+def test_index_grows_without_rederiving(keyring, tmp_path, monkeypatch):
+    path = str(tmp_path / "index.bin")
+    KeystoreIndex.build(path, keyring, 3, workers=1).close()
+    derived = []
+    original = keyring.derive
+
+    def spy(start, count, workers=None):
+        derived.append((start, count))
+        return original(start, count, workers)
+
+    monkeypatch.setattr(keyring, "derive", spy)
+    index = KeystoreIndex.build(path, keyring, 6, workers=1)
+    try:
+        assert derived == [(3, 3)]
+        assert index.addresses(0, 3) == KNOWN
+        assert index.find(keyring.address(5)) == 5
+    finally:
+        index.close()
+
+
+def test_keys_for_indexed_addresses(keyring, tmp_path):
+    index = KeystoreIndex.build(str(tmp_path / "index.bin"), keyring, 3, workers=1)
+    try:
+        keys = keyring.keys_for([KNOWN[2].lower()], index)
+        assert Account.from_key(keys[KNOWN[2]]).address == KNOWN[2]
+        with pytest.raises(KeyError):
+            keyring.keys_for(["0x" + "11" * 20], index)
+    finally:
+        index.close()
+
+
+def test_rejects_files_that_are_not_indexes(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(os.urandom(64))
+    with pytest.raises(ValueError, match="not a keystore index"):
+        KeystoreIndex(str(path))
@@ -0,0 +1,142 @@
+import pytest
+from web3 import Web3
+from rpc_standin import GWEI, StandinNode, seeded_balance
+from wallet_hd import HDKeyring
+from wallet_payout import NonceManager, Payment, PayoutPipeline
+
+MNEMONIC = "test test test test test test test test test test test junk"
+ETH = 10**18
+
+
+@pytest.fixture(scope="module")
+def keys():
+    keyring = HDKeyring(MNEMONIC)
+    return {keyring.address(i): keyring.private_key(i) for i in range(2)}
+
+
+@pytest.fixture
+def node():
+    with StandinNode(block_time=0.05) as node:
+        yield node
+
+
+def recipient(i):
+    return Web3.to_checksum_address(f"0x{i + 1:040x}")
+
+
+def payments(keys, count, value=ETH // 1000):
+    senders = list(keys)
+    return [Payment(senders[i % len(senders)], recipient(i), value) for i in range(count)]
+
+
+def pipeline(node, keys, **options):
+    options = {"sign_workers": 1, "poll_interval": 0.05, "stuck_after": 0.3, **options}
+    return PayoutPipeline(Web3(Web3.HTTPProvider(node.url)), keys, **options)
+
+
+def received(node, i):
+    return node.chain.balance(recipient(i)) - seeded_balance(recipient(i).lower())
+
+
+def test_batch_is_sent_and_confirmed_in_few_requests(node, keys):
+    payout = pipeline(node, keys, chunk_size=10)
+    try:
+        payout.submit(payments(keys, 20))
+        summary = payout.wait(timeout=30)
+    finally:
+        payout.close()
+    assert summary["mined"] == summary["submitted"] == 20
+    assert summary["failed"] == summary["stuck"] == summary["gap_fills"] == 0
+    assert node.call_counts["eth_getTransactionCount"] == 2
+    assert node.call_counts["eth_sendRawTransaction"] == 20
+
+
+def test_rejected_payment_does_not_hold_up_later_ones(node, keys):
+    sender = list(keys)[0]
+    batch = [Payment(sender, recipient(i), ETH // 1000) for i in range(5)]
+    batch[2] = batch[2]._replace(value=node.chain.balance(sender) + 1)  # overdraft
+    payout = pipeline(node, {sender: keys[sender]})
+    try:
+        txs = payout.submit(batch)
+        summary = payout.wait(timeout=30)
+        assert [tx.status for tx in txs] == ["mined", "mined", "failed", "mined", "mined"]
+        assert "insufficient funds" in txs[2].error
+        assert summary["gap_fills"] == 1
+        assert received(node, 2) == 0
+
+        # Paying the failed one again uses a fresh nonce and pays it exactly once
+        (retry,) = payout.submit([batch[2]._replace(value=ETH // 1000)])
+        payout.wait(timeout=30)
+        assert retry.status == "mined" and retry.nonce == 5
+        assert [received(node, i) for i in range(5)] == [ETH // 1000] * 5
+    finally:
+        payout.close()
+
+
+def test_trailing_rejection_hands_its_nonce_back(node, keys):
+    sender = list(keys)[0]
+    payout = pipeline(node, {sender: keys[sender]})
+    try:
+        (rejected,) = payout.submit([Payment(sender, recipient(0), node.chain.balance(sender) + 1)])
+        assert rejected.status == "failed"
+        (paid,) = payout.submit([Payment(sender, recipient(1), ETH // 1000)])
+        payout.wait(timeout=30)
+        assert paid.nonce == rejected.nonce and paid.status == "mined"
+        assert payout.summary()["gap_fills"] == 0
+    finally:
+        payout.close()
+
+
+def test_payments_below_the_node_minimum_are_stuck_not_final(node, keys):
+    node.chain.min_gas_price = 2 * GWEI
+    payout = pipeline(node, keys, max_bumps=2)
+    try:
+        txs = payout.submit(payments(keys, 4))
+        summary = payout.wait(timeout=30)
+        assert summary["stuck"] == 4 and summary["mined"] == 0
+        assert payout.stuck() == txs
+        assert all("may still be mined" in tx.error for tx in txs)
+
+        payout.resume(max_gas_price=3 * GWEI, extra_bumps=5)
+        summary = payout.wait(timeout=30)
+        assert summary["mined"] == 4 and summary["stuck"] == 0
+    finally:
+        payout.close()
+
+
+def test_stuck_payments_can_be_cancelled(node, keys):
+    node.chain.min_gas_price = 2 * GWEI
+    payout = pipeline(node, keys, max_bumps=0)
+    try:
+        txs = payout.submit(payments(keys, 4))
+        payout.wait(timeout=30)
+        assert payout.cancel(gas_price=2 * GWEI) == txs
+        summary = payout.wait(timeout=30)
+        assert summary["cancelled"] == 4 and summary["stuck"] == summary["mined"] == 0
+        assert [received(node, i) for i in range(4)] == [0] * 4
+    finally:
+        payout.close()
+
+
+def test_injected_errors_are_retried(keys):
+    with StandinNode(block_time=0.05, error_rate=0.2, http_error_rate=0.1) as node:
+        payout = pipeline(node, keys, chunk_size=5, retries=10)
+        try:
+            payout.submit(payments(keys, 20))
+            summary = payout.wait(timeout=60)
+        finally:
+            payout.close()
+    assert summary["mined"] == 20
+    assert [received(node, i) for i in range(20)] == [ETH // 1000] * 20
+
+
+def test_nonce_manager_counts_locally(node, keys):
+    sender = list(keys)[0]
+    nonces = NonceManager(Web3(Web3.HTTPProvider(node.url)))
+    assert [nonces.reserve(sender) for _ in range(3)] == [0, 1, 2]
+    nonces.rewind(sender, 1)
+    assert nonces.reserve(sender) == 1
+    nonces.rewind(sender, 5)  # never moves forward
+    assert nonces.reserve(sender) == 2
+    nonces.resync(sender)
+    assert nonces.reserve(sender) == 0
@@ -0,0 +1,77 @@
+import time
+import pytest
+from web3 import Web3
+from rpc_standin import StandinNode
+from wallet_rpc import BalanceEngine
+from wallet_stream import BlockSubscriber
+
+
+def subscriber_for(node, **options):
+    return BlockSubscriber(BalanceEngine(Web3(Web3.HTTPProvider(node.url))), **options)
+
+
+def on_chain(node, addresses):
+    return {a: node.chain.balance(a) for a in addresses}
+
+
+def switch_node(subscriber, node):
+    subscriber.web3 = subscriber.engine.web3 = Web3(Web3.HTTPProvider(node.url))
+
+
+@pytest.fixture
+def node():
+    with StandinNode(blocks=10) as node:
+        yield node
+
+
+@pytest.fixture
+def addresses(node):
+    return [Web3.to_checksum_address(a) for a in node.chain.accounts[:30]]
+
+
+@pytest.mark.parametrize("use_filter", [True, False])
+def test_new_blocks_update_tracked_balances(node, addresses, use_filter):
+    updates = []
+    subscriber = subscriber_for(node, use_filter=use_filter, on_update=lambda changed, head: updates.append(head))
+    subscriber.track(addresses)
+    subscriber.poll()
+    assert subscriber.snapshot(addresses) == on_chain(node, addresses)
+    for _ in range(3):
+        node.chain.mine(2)
+        subscriber.poll()
+        assert subscriber.snapshot(addresses) == on_chain(node, addresses)
+    assert updates[-1] == node.chain.head == subscriber.block_number
+
+
+@pytest.mark.parametrize("extra_blocks", [0, 5])
+def test_replaced_chain_at_the_same_height_or_higher_is_reread(node, addresses, extra_blocks):
+    subscriber = subscriber_for(node, use_filter=False)
+    subscriber.track(addresses)
+    subscriber.poll()
+    with StandinNode(seed=1, blocks=10 + extra_blocks) as other:
+        other_addresses = [Web3.to_checksum_address(a) for a in other.chain.accounts[:5]]
+        subscriber.track(other_addresses)
+        switch_node(subscriber, other)
+        subscriber.poll()
+        assert subscriber.block_number == other.chain.head
+        assert subscriber.snapshot(addresses + other_addresses) == on_chain(other, addresses + other_addresses)
+
+
+def test_stopped_subscriber_is_not_live_and_resyncs_on_restart(node, addresses):
+    subscriber = subscriber_for(node, use_filter=False, poll_interval=0.02)
+    subscriber.track(addresses)
+    subscriber.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not subscriber.live and time.monotonic() < deadline:
+            time.sleep(0.01)
+        subscriber.stop()
+        assert subscriber.snapshot(addresses) is None
+        node.chain.mine(3)
+        subscriber.start()
+        deadline = time.monotonic() + 5
+        while subscriber.block_number != node.chain.head and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert subscriber.snapshot(addresses) == on_chain(node, addresses)
+    finally:
+        subscriber.stop()
@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+
+# ------------------ Transaction History Index ------------------
+# Copies (block, tx index, from, to, value) rows out of the chain into a local
+# SQLite file so history lookups never scan blocks on the node. Blocks are
+# fetched in pages with one JSON-RPC batch per page, and each page is written
+# in a single transaction together with the checkpoint, so an interrupted
+# sync resumes where it stopped instead of starting again from genesis.
+#
+# The hashes of the last `reorg_depth` indexed blocks are kept as well. When
+# the checkpoint's block no longer matches the node (a reorg, or Ganache
+# restarted on another chain), the index is cut back to the newest of those
+# blocks the node still has; if none match, the fork is deeper than
+# reorg_depth and the whole index is rebuilt.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    block     INTEGER NOT NULL,
+    tx_index  INTEGER NOT NULL,
+    tx_hash   TEXT    NOT NULL,
+    tx_from   TEXT    NOT NULL,
+    tx_to     TEXT,
+    value     TEXT    NOT NULL,   -- decimal wei; can exceed SQLite's 64-bit INTEGER
+    PRIMARY KEY (block, tx_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transfers_from ON transfers (tx_from, block, tx_index);
+CREATE INDEX IF NOT EXISTS transfers_to   ON transfers (tx_to, block, tx_index);
+CREATE TABLE IF NOT EXISTS block_hashes (
+    block      INTEGER PRIMARY KEY,
+    block_hash TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id         INTEGER PRIMARY KEY CHECK (id = 0),
+    block      INTEGER NOT NULL,
+    block_hash TEXT    NOT NULL
+);
+"""
+
+
+class TxIndexer:
+    """Incremental block indexer with address and block range queries."""
+
+    def __init__(self, web3, db_path="tx_history.sqlite3", page_size=50,
+                 start_block=0, reorg_depth=12):
+        self.web3 = web3
+        self.page_size = page_size
+        self.start_block = start_block
+        self.reorg_depth = reorg_depth
+        self._lock = threading.Lock()
+        # Queries and syncs may come from different worker threads; the lock
+        # serialises them on this one connection
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # ---------- checkpoint ----------
+    def checkpoint(self):
+        """(block, hash) of the last indexed block, or None before the first sync."""
+        return self.db.execute("SELECT block, block_hash FROM checkpoint WHERE id = 0").fetchone()
+
+    def _fork_point(self, head, block):
+        """Newest recently indexed block the node still has, or None if none of them match."""
+        stored = self.db.execute(
+            "SELECT block, block_hash FROM block_hashes WHERE block <= ? ORDER BY block DESC",
+            (min(head, block),),
+        ).fetchall()
+        if not stored:
+            return None
+        on_chain = self._fetch_blocks([number for number, _hash in stored])
+        for (number, block_hash), chain_block in zip(stored, on_chain):
+            if chain_block["hash"] == block_hash:
+                return number
+        return None
+
+    def _rewind(self, to_block):
+        # Drop everything after to_block and point the checkpoint at it;
+        # None drops the whole index
+        if to_block is None:
+            for table in ("transfers", "block_hashes", "checkpoint"):
+                self.db.execute(f"DELETE FROM {table}")
+            return
+        self.db.execute("DELETE FROM transfers WHERE block > ?", (to_block,))
+        self.db.execute("DELETE FROM block_hashes WHERE block > ?", (to_block,))
+        self.db.execute(
+            "UPDATE checkpoint SET block = ?, block_hash = "
+            "(SELECT block_hash FROM block_hashes WHERE block = ?) WHERE id = 0",
+            (to_block, to_block),
+        )
+
+    # ---------- sync ----------
+    def sync(self, max_blocks=None):
+        """Index blocks up to the current head; return how many were added."""
+        with self._lock:
+            head = self.web3.eth.block_number
+            done = self.checkpoint()
+            if done is not None:
+                block, block_hash = done
+                # The chain may have changed under the checkpoint (reorg or reset)
+                if block > head or self._fetch_blocks([block])[0]["hash"] != block_hash:
+                    fork = self._fork_point(head, block)
+                    with self.db:
+                        self._rewind(fork)
+                    done = self.checkpoint()
+            next_block = self.start_block if done is None else done[0] + 1
+            last = head if max_blocks is None else min(head, next_block + max_blocks - 1)
+            indexed = 0
+            for page_start in range(next_block, last + 1, self.page_size):
+                numbers = list(range(page_start, min(page_start + self.page_size, last + 1)))
+                blocks = self._fetch_blocks(numbers)
+                rows = [
+                    (int(tx["blockNumber"], 16), int(tx["transactionIndex"], 16), tx["hash"],
+                     tx["from"].lower(), tx["to"].lower() if tx.get("to") else None,
+                     str(int(tx["value"], 16)))
+                    for block in blocks for tx in block["transactions"]
+                ]
+                with self.db:
+                    self.db.executemany("INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    self.db.executemany("INSERT OR REPLACE INTO block_hashes VALUES (?, ?)",
+                                        [(n, block["hash"]) for n, block in zip(numbers, blocks)])
+                    self.db.execute("DELETE FROM block_hashes WHERE block < ?", (numbers[-1] - self.reorg_depth,))
+                    self.db.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?, ?)",
+                                    (numbers[-1], blocks[-1]["hash"]))
+                indexed += len(numbers)
+            return indexed
+
+    def _fetch_blocks(self, numbers):
+        responses = self.web3.provider.make_batch_request(
+            [("eth_getBlockByNumber", [hex(n), True]) for n in numbers]
+        )
+        if not isinstance(responses, list):
+            error = responses.get("error", {})
+            raise RuntimeError(f"Batch request failed: {error.get('message', error)}")
+        blocks = []
+        for number, response in zip(numbers, responses):
+            if response.get("result") is None:
+                raise RuntimeError(f"Block {number} not available: {response.get('error')}")
+            blocks.append(response["result"])
+        return blocks
+
+    # ---------- queries ----------
+    def last_transfers(self, address, limit=100):
+        """Newest `limit` transfers sent or received by `address`."""
+        address = address.lower()
+        with self._lock:
+            # Each branch walks its own index backwards; the merge only sees 2 * limit rows
+            rows = self.db.execute(
+                """
+                SELECT * FROM (SELECT * FROM transfers WHERE tx_from = ?
+                               ORDER BY block DESC, tx_index DESC LIMIT ?)
+                UNION
+                SELECT * FROM (SELECT * FROM transfers WHERE tx_to = ?
+                               ORDER BY block DESC, tx_index DESC LIMIT ?)
+                ORDER BY block DESC, tx_index DESC LIMIT ?
+                """,
+                (address, limit, address, limit, limit),
+            ).fetchall()
+        return [_row_dict(row) for row in rows]
+
+    def transfers_in_blocks(self, first_block, last_block):
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT * FROM transfers WHERE block BETWEEN ? AND ? ORDER BY block, tx_index",
+                (first_block, last_block),
+            ).fetchall()
+        return [_row_dict(row) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def _row_dict(row):
+    block, tx_index, tx_hash, tx_from, tx_to, value = row
+    return {"block": block, "tx_index": tx_index, "hash": tx_hash,
+            "from": tx_from, "to": tx_to, "value": int(value)}
@@ -0,0 +1,101 @@
+import threading
+import tkinter as tk
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+# ------------------ Background RPC Client ------------------
+# Runs node requests on a small thread pool so a slow or offline node never
+# blocks the Tk mainloop. Results are handed back to the GUI thread with
+# root.after(), the same way TruffleIDE.log() does.
+#
+# Jobs are blocking callables (the balance cache, the history indexer), so
+# they run on max_in_flight worker threads; there is no event loop. Each
+# request's timeout starts when it is submitted and covers the time it
+# waits for a free thread. A timeout or cancel only stops the GUI waiting: a
+# job still queued is dropped, and one already on the wire runs until the
+# provider's own request timeout, keeping its thread, so the in-flight limit
+# holds.
+
+
+class BackgroundRPCClient:
+    """Submit node requests from Tk callbacks without blocking the window."""
+
+    def __init__(self, root, timeout=5.0, max_in_flight=8):
+        self.root = root
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="wallet-rpc")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job, *args, on_result=None, on_error=None, timeout=None):
+        """Schedule a request and return a concurrent.futures.Future.
+
+        `job` is a blocking callable, run as job(*args) on the client's
+        threads. At most max_in_flight jobs run at once; the rest wait their
+        turn. `timeout` seconds after submission the future fails with
+        TimeoutError, whether the job is still queued or running. on_result /
+        on_error are invoked on the Tk thread.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        future = Future()
+        timer = threading.Timer(timeout, _settle, (future, TimeoutError(f"No answer within {timeout} seconds")))
+        timer.daemon = True
+
+        def work():
+            if future.done():
+                return  # cancelled or timed out while queued
+            try:
+                result = job(*args)
+            except BaseException as e:
+                _settle(future, e)
+            else:
+                _settle(future, result=result)
+
+        def deliver(done):
+            timer.cancel()
+            with self._lock:
+                self._pending.discard(done)
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None:
+                if on_error is not None:
+                    self._to_gui(on_error, error)
+            elif on_result is not None:
+                self._to_gui(on_result, done.result())
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(deliver)
+        timer.start()
+        try:
+            self._executor.submit(work)
+        except RuntimeError as e:  # closed
+            _settle(future, e)
+        return future
+
+    def _to_gui(self, callback, value):
+        try:
+            self.root.after(0, callback, value)
+        except (RuntimeError, tk.TclError):
+            pass  # Window already destroyed
+
+    def cancel_all(self):
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+
+    def close(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _settle(future, error=None, result=None):
+    """Complete `future` unless a timeout, cancel or the job got there first."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
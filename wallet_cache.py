@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import OrderedDict
+from web3 import Web3
+
+# ------------------ Block-aware Balance Cache ------------------
+# Balances only change when a block touches the address, so a balance read at
+# block N is still correct at N+1 unless that block moved value in or out.
+# Entries are keyed by (address, block number); when the head advances, only
+# the addresses seen in the new blocks are dropped and the rest carry over.
+#
+# Value moved by contract-internal calls does not show up in a transaction's
+# from/to fields, so entries also expire after `ttl` seconds as a safety net.
+#
+# Balances and new blocks are fetched without holding the lock. Every
+# invalidation bumps an epoch, and a fetched balance is only stored if its
+# address has not been invalidated since the lookup started (before the head
+# it is read at was chosen), so a value read just before a block touched the
+# address cannot be carried forward.
+
+
+class BalanceCache:
+    """LRU cache of balances in front of a BalanceEngine."""
+
+    def __init__(self, engine, max_entries=10000, ttl=300.0,
+                 head_refresh_interval=1.0, max_block_scan=64):
+        self.engine = engine
+        self.web3 = engine.web3
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.head_refresh_interval = head_refresh_interval
+        self.max_block_scan = max_block_scan
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()   # (address, block) -> (balance, stored_at)
+        self._entry_block = {}          # address -> block of its current entry
+        self._head = None
+        self._head_checked_at = 0.0
+        self._epoch = 0                 # bumped by every invalidate() and clear()
+        self._invalidated = OrderedDict()  # address -> epoch of its last invalidation
+        self._forgotten_epoch = 0       # invalidations at or below this are no longer listed
+        self._lock = threading.RLock()
+        self._advance_lock = threading.Lock()
+
+    # ---------- head tracking ----------
+    def head(self):
+        """Current block number, re-read at most every head_refresh_interval seconds."""
+        now = time.monotonic()
+        with self._lock:
+            if self._head is not None and now - self._head_checked_at < self.head_refresh_interval:
+                return self._head
+        if not self._advance_lock.acquire(blocking=self._head is None):
+            return self._head  # another thread is already moving the head forward
+        try:
+            new_head = self.web3.eth.block_number
+            old_head = self._head
+            touched = None
+            if old_head is not None and old_head < new_head <= old_head + self.max_block_scan:
+                # The block scan is the slow part; readers keep using the old head meanwhile
+                touched = set()
+                for number in range(old_head + 1, new_head + 1):
+                    touched |= touched_addresses(self.web3.eth.get_block(number, full_transactions=True))
+            with self._lock:
+                self._head_checked_at = now
+                if touched is not None:
+                    self.invalidate(touched)
+                elif old_head is not None and new_head != old_head:
+                    # Too many blocks to scan, or the chain went backwards (reorg or
+                    # node reset): nothing can be trusted
+                    self.clear()
+                self._head = new_head
+                return new_head
+        finally:
+            self._advance_lock.release()
+
+    # ---------- lookups ----------
+    def get_balances(self, addresses, block=None):
+        """Return {checksum address: wei}, fetching only the misses in one batch.
+
+        block=None means the current head.
+        """
+        addresses = [Web3.to_checksum_address(a) for a in addresses]
+        with self._lock:
+            # Read before head(): an invalidation between choosing the block and
+            # storing the fetched balance must be seen
+            epoch = self._epoch
+        at_block = self.head() if block is None else block
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for address in dict.fromkeys(addresses):
+                balance = self._lookup(address, at_block, now, carry_forward=block is None)
+                if balance is None:
+                    missing.append(address)
+                else:
+                    found[address] = balance
+            self.hits += len(found)
+            self.misses += len(missing)
+        if missing:
+            fetched = self.engine.get_balances(missing, at_block)
+            with self._lock:
+                for address, balance in fetched.items():
+                    if balance is not None and (block is not None or self._unchanged_since(address, epoch)):
+                        self._store(address, at_block, balance, now)
+            found.update(fetched)
+        return {address: found[address] for address in dict.fromkeys(addresses)}
+
+    def get_balance(self, address, block=None):
+        return self.get_balances([address], block)[Web3.to_checksum_address(address)]
+
+    def _lookup(self, address, at_block, now, carry_forward):
+        key = (address, at_block)
+        entry = self._entries.get(key)
+        if entry is None and carry_forward:
+            # An older entry that survived every block since is still valid at the head
+            old_block = self._entry_block.get(address)
+            if old_block is not None and old_block < at_block:
+                entry = self._entries.pop((address, old_block))
+                self._entries[key] = entry
+                self._entry_block[address] = at_block
+        if entry is None:
+            return None
+        balance, stored_at = entry
+        if self.ttl is not None and now - stored_at > self.ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return balance
+
+    def _store(self, address, at_block, balance, now):
+        key = (address, at_block)
+        current = self._entry_block.get(address)
+        if current is not None and current <= at_block:
+            self._entries.pop((address, current), None)
+        if current is None or current <= at_block:
+            self._entry_block[address] = at_block
+        self._entries[key] = (balance, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            if self._entry_block.get(old_key[0]) == old_key[1]:
+                del self._entry_block[old_key[0]]
+            self.evictions += 1
+
+    def _unchanged_since(self, address, epoch):
+        """True if nothing invalidated `address` after `epoch` was read."""
+        if self._forgotten_epoch > epoch:
+            return False
+        return self._invalidated.get(address, 0) <= epoch
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        if self._entry_block.get(key[0]) == key[1]:
+            del self._entry_block[key[0]]
+
+    # ---------- invalidation ----------
+    def invalidate(self, addresses):
+        """Forget the head entry of every given address."""
+        with self._lock:
+            self._epoch += 1
+            for address in addresses:
+                self._invalidated[address] = self._epoch
+                self._invalidated.move_to_end(address)
+                block = self._entry_block.get(address)
+                if block is not None:
+                    self._drop((address, block))
+                    self.invalidations += 1
+            while len(self._invalidated) > self.max_entries:
+                _address, forgotten = self._invalidated.popitem(last=False)
+                self._forgotten_epoch = max(self._forgotten_epoch, forgotten)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._forgotten_epoch = self._epoch
+            self._invalidated.clear()
+            self._entries.clear()
+            self._entry_block.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "head": self._head,
+            }
+
+
+def touched_addresses(block):
+    """Addresses whose balance a block may have changed (senders, receivers, miner)."""
+    touched = {Web3.to_checksum_address(block["miner"])}
+    for tx in block["transactions"]:
+        touched.add(Web3.to_checksum_address(tx["from"]))
+        if tx.get("to"):
+            touched.add(Web3.to_checksum_address(tx["to"]))
+    return touched
@@ -0,0 +1,188 @@
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from eth_account.hdaccount.deterministic import (
+    HDPath, SECP256K1_N, derive_child_key, ec_point, hmac_sha512, to_int,
+)
+from eth_account.hdaccount import seed_from_mnemonic
+from eth_keys import keys
+from eth_utils import to_checksum_address
+
+# ------------------ HD Wallet Accounts ------------------
+# Derives BIP-44 Ethereum accounts (m/44'/60'/<account>'/0/<i>) from a
+# mnemonic. The seed and the hardened part of the path are computed once;
+# each account after that is one soft BIP-32 step from the shared parent
+# (an HMAC and a scalar add) plus the public key for its address, so ranges
+# of indices split cleanly across a process pool. eth-keys computes public
+# keys in pure Python unless coincurve is installed, which is far faster.
+#
+# Addresses are kept in a keystore index file that holds no key material:
+# a header, the addresses in index order, and the same addresses sorted with
+# their index. The file is memory-mapped, so opening it costs the same for
+# 100 accounts as for 100k, and address -> path lookups are a binary search
+# over the sorted table. Private keys are re-derived from the mnemonic when
+# something needs to sign.
+
+MAGIC = b"HDIX"
+HEADER = struct.Struct(">4sHII")  # magic, version, account, count
+VERSION = 1
+ENTRY = struct.Struct(">20sI")    # address, index
+CHUNK = 2000                      # indices per worker task
+
+
+def bip44_path(account, index):
+    return f"m/44'/60'/{account}'/0/{index}"
+
+
+def _child_key(parent_key, chain_code, parent_point, index):
+    """Raw private key of soft child `index`; ValueError if that child is invalid."""
+    digest = hmac_sha512(chain_code, parent_point + struct.pack(">I", index))
+    tweak = to_int(digest[:32])
+    child = (tweak + to_int(parent_key)) % SECP256K1_N
+    if tweak >= SECP256K1_N or not child:
+        # Less than a 2**-127 chance; BIP-32 says to skip the index, which
+        # would shift every later account, so refuse it instead
+        raise ValueError(f"Index {index} derives an invalid key and cannot be used")
+    return child.to_bytes(32, "big")
+
+
+def _derive_range(parent_key, chain_code, parent_point, start, stop):
+    """Worker: concatenated 20-byte addresses for children start..stop-1."""
+    out = bytearray()
+    for index in range(start, stop):
+        child = _child_key(parent_key, chain_code, parent_point, index)
+        out += keys.PrivateKey(child).public_key.to_canonical_address()
+    return bytes(out)
+
+
+class HDKeyring:
+    """BIP-32/44 key derivation for one account of a mnemonic."""
+
+    def __init__(self, mnemonic, passphrase="", account=0):
+        try:
+            seed = seed_from_mnemonic(mnemonic, passphrase)
+        except Exception:
+            raise ValueError("Invalid mnemonic") from None
+        self.account = account
+        main = hmac_sha512(b"Bitcoin seed", seed)
+        key, chain_code = main[:32], main[32:]
+        for node in HDPath(f"m/44'/60'/{account}'/0")._path:
+            key, chain_code = derive_child_key(key, chain_code, node)
+        self._parent = (key, chain_code, ec_point(key))
+
+    def private_key(self, index):
+        """Raw 32-byte private key of account `index`."""
+        return _child_key(*self._parent, index)
+
+    def address(self, index):
+        return to_checksum_address(_derive_range(*self._parent, index, index + 1))
+
+    def keys_for(self, addresses, index):
+        """{address: private key} for derived accounts listed in a KeystoreIndex."""
+        found = {}
+        for address in addresses:
+            position = index.find(address)
+            if position is None:
+                raise KeyError(f"{address} is not in {index.path}")
+            found[to_checksum_address(address)] = self.private_key(position)
+        return found
+
+    def derive(self, start, count, workers=None):
+        """Raw 20-byte addresses for indices start..start+count-1, in order."""
+        ranges = [(i, min(i + CHUNK, start + count)) for i in range(start, start + count, CHUNK)]
+        if workers == 1 or len(ranges) == 1:
+            return b"".join(_derive_range(*self._parent, a, b) for a, b in ranges)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_derive_range, *self._parent, a, b) for a, b in ranges]
+            return b"".join(f.result() for f in futures)
+
+
+class KeystoreIndex:
+    """Memory-mapped address <-> derivation path table."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.account, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a keystore index")
+        self._sorted = HEADER.size + 20 * self.count
+
+    @classmethod
+    def build(cls, path, keyring, count, workers=None):
+        """Write (or extend) the index for the first `count` accounts of `keyring`.
+
+        Addresses already in a matching index file are reused, so growing
+        an index only derives the new accounts.
+        """
+        addresses = b""
+        if os.path.exists(path):
+            existing = cls(path)
+            try:
+                if existing.account == keyring.account and existing.count and \
+                        existing.address(0) == keyring.address(0):
+                    addresses = existing._map[HEADER.size:HEADER.size + 20 * min(count, existing.count)]
+            finally:
+                existing.close()
+        known = len(addresses) // 20
+        if known < count:
+            addresses += keyring.derive(known, count - known, workers)
+
+        entries = sorted((addresses[i * 20:i * 20 + 20], i) for i in range(count))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, keyring.account, count))
+            f.write(addresses)
+            f.write(b"".join(ENTRY.pack(address, index) for address, index in entries))
+        os.replace(tmp, path)
+        return cls(path)
+
+    def __len__(self):
+        return self.count
+
+    def address(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset = HEADER.size + 20 * index
+        return to_checksum_address(self._map[offset:offset + 20])
+
+    def addresses(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        return [self.address(i) for i in range(start, stop)]
+
+    def find(self, address):
+        """Index of `address` in this account, or None."""
+        target = bytes.fromhex(address[2:] if address.startswith(("0x", "0X")) else address)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._sorted + ENTRY.size * middle
+            if self._map[offset:offset + 20] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            found, index = ENTRY.unpack_from(self._map, self._sorted + ENTRY.size * low)
+            if found == target:
+                return index
+        return None
+
+    def path_of(self, address):
+        index = self.find(address)
+        return None if index is None else bip44_path(self.account, index)
+
+    def resolve(self, entry):
+        """Checksum address for an address, a BIP-44 path of this account, or an index."""
+        if isinstance(entry, int):
+            return self.address(entry)
+        if entry.startswith("m/"):
+            prefix = f"m/44'/60'/{self.account}'/0/"
+            if not entry.startswith(prefix) or not entry[len(prefix):].isdigit():
+                raise ValueError(f"{entry} is not in {prefix}<index>")
+            return self.address(int(entry[len(prefix):]))
+        return to_checksum_address(entry)
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,438 @@
+import math
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from eth_account import Account
+from web3 import Web3
+
+# ------------------ Bulk Payout Pipeline ------------------
+# Sends many value transfers without a node round trip per transaction:
+#
+#   1. one batch request reads the chain id, the gas price and the pending
+#      nonce of every sender; NonceManager hands out nonces locally after that
+#   2. transactions are signed in a process pool (signing is pure-Python
+#      elliptic curve work, about as slow as a local RPC)
+#   3. raw transactions go out as chunked eth_sendRawTransaction batches,
+#      `max_in_flight` chunks at a time over the wallet's provider
+#   4. a tracker thread polls receipts in batches. A transaction still pending
+#      after `stuck_after` seconds is re-signed with the same nonce and a gas
+#      price raised by `bump`, up to `max_bumps` times, and failed sends are
+#      retried up to `retries` times.
+#
+# A payment the node rejects outright (insufficient funds, nonce too low) is
+# "failed": it never entered the node's pool and can safely be paid again.
+# The sender's later payments are already pooled behind the nonce it left
+# free, so that nonce is filled with a zero-value transfer to the sender
+# itself and they go through as usual. A rejected payment with nothing
+# after it just hands its nonce back to NonceManager.
+#
+# A transaction still pending once its bumps run out (or whose delivery
+# could not be confirmed) is "stuck". That is not final: it is still in the
+# node's pool, is still tracked and may yet be mined, so it must not be paid
+# again. resume() bumps stuck transactions further, and cancel() replaces
+# them with zero-value transfers at the same nonce; a payment whose
+# replacement is mined ends up "cancelled" and can then be paid again.
+# Payments are legacy (type 0) transfers, which every node accepts.
+
+TX_GAS = 21000
+
+Payment = namedtuple("Payment", "sender to value")
+
+PENDING_STATES = ("queued", "sent", "cancelling")   # wait() blocks on these
+OPEN_STATES = PENDING_STATES + ("stuck",)           # still polled for receipts
+
+# Send errors that mean the node did not accept the transaction
+REJECTIONS = ("nonce too low", "insufficient funds", "underpriced", "intrinsic gas too low",
+              "exceeds block gas limit", "invalid chain id", "invalid sender", "not supported")
+
+
+class PendingTx:
+    """One payment's (or gap filler's) progress through the pipeline."""
+
+    __slots__ = ("payment", "nonce", "gas_price", "kind", "hashes", "cancel_hashes", "raw", "status",
+                 "bumps", "attempts", "maybe_pooled", "cancel", "sent_at", "receipt", "error", "blocked")
+
+    def __init__(self, payment, nonce, gas_price, kind="payment"):
+        self.payment = payment
+        self.nonce = nonce
+        self.gas_price = gas_price
+        self.kind = kind        # "payment", or "filler" for a no-op that fills a rejected nonce
+        self.hashes = []        # every signed version; any of them may be the one mined
+        self.cancel_hashes = set()
+        self.raw = None
+        self.status = "queued"  # queued -> sent -> mined | failed | stuck -> cancelling -> cancelled
+        self.bumps = 0
+        self.attempts = 0
+        self.maybe_pooled = False  # some version may be in the node's pool
+        self.cancel = False     # sign further versions as zero-value transfers to the sender
+        self.sent_at = None
+        self.receipt = None
+        self.error = None
+        self.blocked = None     # why a stuck transaction cannot be mined yet, if known
+
+    @property
+    def hash(self):
+        return self.hashes[-1] if self.hashes else None
+
+
+class NonceManager:
+    """Local nonce counters, seeded from the node once per sender."""
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, addresses, extra_calls=()):
+        """Read pending nonces of unknown senders in one batch; return extra_calls' results."""
+        with self._lock:
+            missing = [a for a in dict.fromkeys(addresses) if a not in self._next]
+        calls = [("eth_getTransactionCount", [a, "pending"]) for a in missing] + list(extra_calls)
+        if not calls:
+            return []
+        responses = _batch(self.web3, calls)
+        with self._lock:
+            for address, response in zip(missing, responses):
+                self._next.setdefault(address, int(_result(response), 16))
+        return [_result(response) for response in responses[len(missing):]]
+
+    def reserve(self, address):
+        """Next nonce for `address`."""
+        if address not in self._next:
+            self.prefetch([address])
+        with self._lock:
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    def rewind(self, address, nonce):
+        """Hand nonces from `nonce` on back; nothing was sent with them."""
+        with self._lock:
+            if self._next.get(address, nonce) > nonce:
+                self._next[address] = nonce
+
+    def resync(self, address):
+        """Forget the local counter; the next reserve reads the node again."""
+        with self._lock:
+            self._next.pop(address, None)
+
+
+def _batch(web3, calls):
+    responses = web3.provider.make_batch_request(calls)
+    if not isinstance(responses, list):
+        # The node rejected the whole batch with a single error object
+        error = responses.get("error", {})
+        raise RuntimeError(f"Batch request failed: {error.get('message', error)}")
+    return responses
+
+
+def _result(response):
+    if response.get("error"):
+        raise RuntimeError(response["error"].get("message", response["error"]))
+    return response["result"]
+
+
+def _sign_chunk(items, chain_id):
+    """Worker: [(key, to, value, nonce, gas_price)] -> [(raw, hash)]."""
+    signed = []
+    for key, to, value, nonce, gas_price in items:
+        tx = Account.sign_transaction({"to": to, "value": value, "gas": TX_GAS, "gasPrice": gas_price,
+                                       "nonce": nonce, "chainId": chain_id}, key)
+        signed.append((bytes(tx.raw_transaction), "0x" + bytes(tx.hash).hex()))
+    return signed
+
+
+class PayoutPipeline:
+    """Signs, submits and confirms batches of payments from local keys."""
+
+    def __init__(self, web3, keys, chunk_size=50, max_in_flight=4, sign_workers=None, sign_chunk=200,
+                 poll_interval=1.0, stuck_after=30.0, bump=1.125, max_bumps=3, max_gas_price=None,
+                 retries=3, on_update=None):
+        if chunk_size < 1 or max_in_flight < 1:
+            raise ValueError("chunk_size and max_in_flight must be at least 1")
+        if bump < 1.1:
+            raise ValueError("bump must be at least 1.1; nodes reject smaller replacements")
+        self.web3 = web3
+        self.keys = {Web3.to_checksum_address(a): k for a, k in keys.items()}
+        self.nonces = NonceManager(web3)
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.sign_workers = sign_workers
+        self.sign_chunk = sign_chunk
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.bump = bump
+        self.max_bumps = max_bumps
+        self.max_gas_price = max_gas_price
+        self.retries = retries
+        self.on_update = on_update or (lambda tx: None)
+        self.chain_id = None
+        self.transactions = []
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="payout-send")
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._work = threading.RLock()  # one of submit / poll / resume / cancel at a time
+        self._stop = threading.Event()
+        self._tracker = None
+
+    # ---------- submission ----------
+    def submit(self, payments, gas_price=None):
+        """Sign and send `payments`; return their PendingTx objects without waiting for receipts."""
+        payments = [Payment(Web3.to_checksum_address(p.sender), Web3.to_checksum_address(p.to), int(p.value))
+                    for p in payments]
+        unknown = sorted({p.sender for p in payments} - set(self.keys))
+        if unknown:
+            raise ValueError(f"No key for sender(s): {', '.join(unknown)}")
+
+        with self._work:
+            extra = [("eth_gasPrice", [])] + ([("eth_chainId", [])] if self.chain_id is None else [])
+            results = self.nonces.prefetch([p.sender for p in payments], extra)
+            gas_price = gas_price or int(results[0], 16)
+            if self.chain_id is None:
+                self.chain_id = int(results[1], 16)
+            if self.max_gas_price:
+                gas_price = min(gas_price, self.max_gas_price)
+
+            batch = [PendingTx(p, self.nonces.reserve(p.sender), gas_price) for p in payments]
+            self._sign(batch)
+            with self._lock:
+                self.transactions += batch
+            self._send(batch)
+        self._start_tracker()
+        return batch
+
+    def _sign(self, batch):
+        items = [(self.keys[tx.payment.sender], tx.payment.sender if tx.cancel else tx.payment.to,
+                  0 if tx.cancel else tx.payment.value, tx.nonce, tx.gas_price) for tx in batch]
+        chunks = [items[i:i + self.sign_chunk] for i in range(0, len(items), self.sign_chunk)]
+        if self.sign_workers == 1 or len(chunks) == 1:
+            signed = [s for chunk in chunks for s in _sign_chunk(chunk, self.chain_id)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.sign_workers) as pool:
+                signed = [s for result in pool.map(_sign_chunk, chunks, [self.chain_id] * len(chunks))
+                          for s in result]
+        for tx, (raw, tx_hash) in zip(batch, signed):
+            tx.raw = raw
+            tx.hashes.append(tx_hash)
+            if tx.cancel:
+                tx.cancel_hashes.add(tx_hash)
+
+    def _send(self, batch):
+        """Send `batch`, then deal with the nonces any rejections left free."""
+        chunks = [batch[i:i + self.chunk_size] for i in range(0, len(batch), self.chunk_size)]
+        rejected = [tx for result in self._pool.map(self._send_chunk, chunks) for tx in result]
+        if rejected:
+            self._close_gaps(rejected)
+
+    def _send_chunk(self, chunk):
+        try:
+            responses = _batch(self.web3, [("eth_sendRawTransaction", ["0x" + tx.raw.hex()]) for tx in chunk])
+            transport_error = False
+        except Exception as e:
+            # Transport failure: the node may or may not have taken them; resend and see
+            responses = [{"error": {"message": str(e)}}] * len(chunk)
+            transport_error = True
+        now = time.monotonic()
+        rejected = []
+        for tx, response in zip(chunk, responses):
+            error = (response.get("error") or {}).get("message")
+            with self._lock:
+                tx.attempts += 1
+                if error is None or "already known" in error:
+                    tx.maybe_pooled = True
+                    tx.status = "cancelling" if tx.cancel else "sent"
+                    tx.sent_at, tx.error = now, None
+                elif tx.maybe_pooled and any(reason in error for reason in REJECTIONS):
+                    # A replacement was refused (or an earlier version was mined);
+                    # the version in the pool stands and the receipt poll decides
+                    tx.status = "cancelling" if tx.cancel else "sent"
+                    tx.sent_at, tx.error = now, error
+                elif any(reason in error for reason in REJECTIONS):
+                    tx.status, tx.error = "failed", error
+                    rejected.append(tx)
+                elif tx.attempts > self.retries:
+                    if tx.maybe_pooled or transport_error:
+                        tx.maybe_pooled = True
+                        tx.status, tx.error = "stuck", f"delivery not confirmed: {error}"
+                    else:
+                        tx.status, tx.error = "failed", error
+                        rejected.append(tx)
+                else:
+                    tx.maybe_pooled = tx.maybe_pooled or transport_error
+                    tx.status, tx.error = "queued", error  # transient; resent on the next poll
+                self._changed.notify_all()
+            self.on_update(tx)
+        return rejected
+
+    def _close_gaps(self, rejected):
+        """Fill nonces freed by rejected transactions that later transactions wait on."""
+        fillers = []
+        for sender in dict.fromkeys(tx.payment.sender for tx in rejected):
+            with self._lock:
+                live = [tx.nonce for tx in self.transactions
+                        if tx.payment.sender == sender and tx.status in OPEN_STATES]
+            top = max(live, default=-1)
+            failed = sorted((tx for tx in rejected if tx.payment.sender == sender), key=lambda tx: tx.nonce)
+            for tx in failed:
+                if tx.nonce > top or "nonce too low" in tx.error:
+                    continue  # nothing waits on it, or the nonce is already used
+                if tx.kind == "filler":
+                    # Nothing more to try; say why the later transactions cannot be mined
+                    self._mark_blocked(sender, tx.nonce, f"nonce {tx.nonce} could not be filled: {tx.error}")
+                    continue
+                filler = PendingTx(Payment(sender, sender, 0), tx.nonce, tx.gas_price, kind="filler")
+                tx.error += f" (nonce {tx.nonce} filled with a zero-value transfer)"
+                fillers.append(filler)
+            trailing = [tx for tx in failed if tx.nonce > top]
+            if any("nonce too low" in tx.error for tx in trailing):
+                self.nonces.resync(sender)
+            elif trailing:
+                self.nonces.rewind(sender, trailing[0].nonce)
+        if fillers:
+            self._sign(fillers)
+            with self._lock:
+                self.transactions += fillers
+            self._send(fillers)
+
+    def _mark_blocked(self, sender, nonce, reason):
+        with self._lock:
+            for tx in self.transactions:
+                if tx.payment.sender == sender and tx.nonce > nonce and tx.status in OPEN_STATES:
+                    tx.blocked = reason
+
+    # ---------- tracking ----------
+    def _start_tracker(self):
+        if self._tracker is None or not self._tracker.is_alive():
+            self._tracker = threading.Thread(target=self._track, name="payout-receipts", daemon=True)
+            self._tracker.start()
+
+    def _track(self):
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                pending = [tx for tx in self.transactions if tx.status in OPEN_STATES]
+            if not pending:
+                return
+            try:
+                self.poll(pending)
+            except Exception:
+                continue  # node unreachable; try again next interval
+
+    def poll(self, pending):
+        """Check receipts of `pending`, then resend failed sends and bump slow ones."""
+        with self._work:
+            self._check_receipts([tx for tx in pending if tx.status != "queued" or tx.maybe_pooled])
+
+            now = time.monotonic()
+            resend, bumped = [], []
+            for tx in pending:
+                if tx.status == "queued":
+                    resend.append(tx)
+                elif tx.status in ("sent", "cancelling") and now - tx.sent_at >= self.stuck_after:
+                    new_price = max(math.ceil(tx.gas_price * self.bump), tx.gas_price + 1)
+                    if self.max_gas_price:
+                        new_price = min(new_price, self.max_gas_price)
+                    if tx.bumps >= self.max_bumps or new_price <= tx.gas_price:
+                        with self._lock:
+                            tx.status = "stuck"
+                            tx.error = (f"still pending at {tx.gas_price} wei gas price after {tx.bumps} bumps"
+                                        f"{' (cancel)' if tx.cancel else ''}; it may still be mined"
+                                        + (f"; {tx.blocked}" if tx.blocked else ""))
+                            self._changed.notify_all()
+                        self.on_update(tx)
+                        continue
+                    tx.gas_price = new_price
+                    tx.bumps += 1
+                    bumped.append(tx)
+            if bumped:
+                self._sign(bumped)
+            if resend or bumped:
+                self._send(resend + bumped)
+
+    def _check_receipts(self, txs):
+        lookups = [(tx, h) for tx in txs for h in tx.hashes]
+        for i in range(0, len(lookups), self.chunk_size):
+            chunk = lookups[i:i + self.chunk_size]
+            responses = _batch(self.web3, [("eth_getTransactionReceipt", [h]) for _tx, h in chunk])
+            for (tx, tx_hash), response in zip(chunk, responses):
+                receipt = response.get("result")
+                if not receipt or tx.status not in OPEN_STATES:
+                    continue
+                with self._lock:
+                    tx.receipt = receipt
+                    if int(receipt["status"], 16) != 1:
+                        tx.status = "failed"
+                    elif tx_hash in tx.cancel_hashes:
+                        tx.status, tx.error = "cancelled", None
+                    else:
+                        tx.status, tx.error = "mined", None
+                    self._changed.notify_all()
+                self.on_update(tx)
+
+    # ---------- stuck transactions ----------
+    def stuck(self):
+        """Payments that are still pending at the node but no longer being bumped."""
+        with self._lock:
+            return [tx for tx in self.transactions if tx.status == "stuck" and tx.kind == "payment"]
+
+    def resume(self, max_gas_price=None, extra_bumps=None):
+        """Start bumping stuck transactions again, up to a new gas price cap."""
+        with self._work:
+            if max_gas_price is not None:
+                self.max_gas_price = max_gas_price
+            with self._lock:
+                stuck = [tx for tx in self.transactions if tx.status == "stuck"]
+                for tx in stuck:
+                    tx.status = "cancelling" if tx.cancel else "sent"
+                    tx.sent_at = float("-inf")  # bump on the next poll
+                self.max_bumps = max([self.max_bumps] + [tx.bumps + (extra_bumps or self.max_bumps)
+                                                         for tx in stuck])
+        self._start_tracker()
+        return stuck
+
+    def cancel(self, txs=None, gas_price=None):
+        """Replace stuck (or the given) transactions with zero-value transfers to their senders.
+
+        Each replacement outbids the pending version; a payment whose
+        replacement is mined ends up "cancelled". Returns the transactions.
+        """
+        with self._work:
+            txs = [tx for tx in (self.stuck() if txs is None else txs) if tx.status in OPEN_STATES]
+            for tx in txs:
+                tx.gas_price = max(math.ceil(tx.gas_price * self.bump), tx.gas_price + 1, gas_price or 0)
+                tx.cancel = True
+            self._sign(txs)
+            for tx in txs:
+                tx.status = "cancelling"
+                tx.bumps = 0
+                tx.sent_at = time.monotonic()
+            if txs:
+                self._send(txs)
+        self._start_tracker()
+        return txs
+
+    # ---------- results ----------
+    def wait(self, timeout=None):
+        """Block until every payment is final or stuck (or timeout); return summary()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while any(tx.status in PENDING_STATES for tx in self.transactions):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.summary()
+
+    def summary(self):
+        with self._lock:
+            payments = [tx for tx in self.transactions if tx.kind == "payment"]
+            counts = {"submitted": len(payments), "mined": 0, "failed": 0, "cancelled": 0, "stuck": 0,
+                      "pending": 0, "bumps": sum(tx.bumps for tx in self.transactions),
+                      "gap_fills": len(self.transactions) - len(payments)}
+            for tx in payments:
+                counts["pending" if tx.status in PENDING_STATES else tx.status] += 1
+        return counts
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,89 @@
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+# ------------------ Provider Manager ------------------
+# Owns the HTTPProvider for GANACHE_URL. All requests share one pooled,
+# keep-alive requests.Session, so sustained polling reuses TCP connections
+# instead of paying a handshake per call. A health-check thread keeps probing
+# the node: while it is up the probe runs every `health_interval` seconds,
+# and after a failure it retries with exponential backoff until the node
+# comes back. Status changes are reported through `on_status(connected)`.
+
+
+class ProviderManager:
+    """Pooled HTTP provider with background health checks and reconnects."""
+
+    def __init__(self, url, pool_size=10, timeout=5, health_interval=5.0,
+                 backoff_initial=0.5, backoff_max=30.0, on_status=None):
+        self.url = url
+        self.health_interval = health_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.on_status = on_status
+        self.connected = False
+        self.reconnects = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+
+        # Retries are handled by the health loop, not inside each request
+        self.provider = Web3.HTTPProvider(url, session=self.session,
+                                          request_kwargs={"timeout": timeout},
+                                          exception_retry_configuration=None)
+        self.web3 = Web3(self.provider)
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start health checks in the background; the first probe runs immediately."""
+        self._thread = threading.Thread(target=self._health_loop, name="provider-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def check(self):
+        """Probe the node once and report a status change if there was one."""
+        try:
+            is_up = self.provider.is_connected()
+        except Exception:
+            is_up = False
+        if is_up != self.connected:
+            if is_up:
+                self.reconnects += 1
+            else:
+                # Drop pooled sockets that may point at a dead server
+                for adapter in self.session.adapters.values():
+                    adapter.close()
+            self.connected = is_up
+            if self.on_status is not None:
+                self.on_status(is_up)
+        return is_up
+
+    def wake(self):
+        """Probe now instead of waiting out the interval, e.g. after a failed request."""
+        self._wake.set()
+
+    def _health_loop(self):
+        delay = self.backoff_initial
+        while not self._stop.is_set():
+            if self.check():
+                delay = self.backoff_initial
+                wait = self.health_interval
+            else:
+                # Jitter keeps many clients from retrying in lockstep
+                wait = delay * random.uniform(0.8, 1.2)
+                delay = min(delay * 2, self.backoff_max)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.session.close()
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+
+# ------------------ Batched Balance Engine ------------------
+# Looks up many wallet balances with JSON-RPC batch requests instead of one
+# HTTP round trip per address. Addresses are split into chunks and several
+# chunks are kept in flight at once over the same HTTPProvider.
+
+
+class BalanceEngine:
+    """Fetch balances for many addresses in chunked, pipelined batch calls."""
+
+    def __init__(self, web3, chunk_size=100, max_in_flight=4):
+        if chunk_size < 1 or max_in_flight < 1:
+            raise ValueError("chunk_size and max_in_flight must be at least 1")
+        self.web3 = web3
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight,
+                                        thread_name_prefix="balance-batch")
+
+    def get_balance(self, address, block="latest"):
+        """Single-address lookup, kept for callers that only need one."""
+        return self.get_balances([address], block)[Web3.to_checksum_address(address)]
+
+    def get_balances(self, addresses, block="latest"):
+        """Return {checksum address: balance in wei} for every address.
+
+        Addresses whose lookup failed on the node map to None.
+        """
+        addresses = list(dict.fromkeys(Web3.to_checksum_address(a) for a in addresses))
+        if not addresses:
+            return {}
+        chunks = [addresses[i:i + self.chunk_size]
+                  for i in range(0, len(addresses), self.chunk_size)]
+        if len(chunks) == 1:
+            results = [self._fetch_chunk(chunks[0], block)]
+        else:
+            results = self._pool.map(self._fetch_chunk, chunks, [block] * len(chunks))
+        balances = {}
+        for chunk_result in results:
+            balances.update(chunk_result)
+        return balances
+
+    def _fetch_chunk(self, chunk, block):
+        block_id = hex(block) if isinstance(block, int) else block
+        responses = self.web3.provider.make_batch_request(
+            [("eth_getBalance", [address, block_id]) for address in chunk]
+        )
+        if not isinstance(responses, list):
+            # The node rejected the whole batch with a single error object
+            error = responses.get("error", {})
+            raise RuntimeError(f"Batch request failed: {error.get('message', error)}")
+        balances = {}
+        for address, response in zip(chunk, responses):
+            result = response.get("result")
+            balances[address] = int(result, 16) if result is not None else None
+        return balances
+
+    def close(self):
+        self._pool.shutdown(wait=False)
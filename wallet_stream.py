@@ -0,0 +1,168 @@
+import threading
+from web3 import Web3
+from wallet_cache import touched_addresses
+
+# ------------------ New-block Subscriber ------------------
+# Follows the chain head and keeps balances of tracked wallets current in
+# memory. Each new block is fetched once; only tracked addresses it touched
+# are re-read (one batch call), so the cost per block is O(changed wallets)
+# rather than O(all wallets). New heads come from an eth_newBlockFilter when
+# the node supports it, otherwise from polling eth_blockNumber.
+#
+# The hash of the last processed block is kept too. If the node's block at
+# that height has a different hash, or a new block does not build on it, the
+# chain was reorganised or replaced (a Ganache restart can come back at the
+# same height or higher), and every balance is read again.
+
+
+class BlockSubscriber:
+    """Push balance updates for tracked wallets as blocks arrive."""
+
+    def __init__(self, engine, poll_interval=2.0, use_filter=True, max_catch_up=64,
+                 on_update=None):
+        self.engine = engine
+        self.web3 = engine.web3
+        self.poll_interval = poll_interval
+        self.use_filter = use_filter
+        self.max_catch_up = max_catch_up
+        self.on_update = on_update
+
+        self.balances = {}       # checksum address -> wei at self.block_number
+        self.block_number = None
+        self.block_hash = None   # hash of block_number when it was processed
+        self.live = False        # False until the first full sync succeeds
+
+        self._tracked = set()
+        self._pending = set()    # tracked but not read yet
+        self._filter = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()  # a restarted thread waits for the old one's poll
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- tracked set ----------
+    def track(self, addresses):
+        """Start following `addresses`; their balances are read on the next poll."""
+        with self._lock:
+            new = {Web3.to_checksum_address(a) for a in addresses} - self._tracked
+            self._tracked |= new
+            self._pending |= new
+
+    def untrack(self, addresses):
+        with self._lock:
+            for address in addresses:
+                address = Web3.to_checksum_address(address)
+                self._tracked.discard(address)
+                self._pending.discard(address)
+                self.balances.pop(address, None)
+
+    def snapshot(self, addresses):
+        """Balances for `addresses` if all of them are live, else None."""
+        if not self.live:
+            return None
+        with self._lock:
+            try:
+                return {a: self.balances[Web3.to_checksum_address(a)] for a in addresses}
+            except KeyError:
+                return None
+
+    # ---------- poll loop ----------
+    def start(self):
+        """Start the poll thread; calling it again while running is a no-op.
+
+        A stopped subscriber can be started again; it resyncs first.
+        """
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return self
+        # Each thread gets its own stop event, so one still winding down exits
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="block-subscriber",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling; balances are not served as live until the next start."""
+        self._stop.set()
+        self.live = False
+        self._filter = None
+
+    def _run(self, stop):
+        while not stop.is_set():
+            with self._poll_lock:
+                if stop.is_set():
+                    break
+                try:
+                    self.poll()
+                except Exception:
+                    # Node went away; its filter is gone too. Resync once it is back.
+                    self.live = False
+                    self._filter = None
+            stop.wait(self.poll_interval)
+
+    def poll(self):
+        """Process every block since the last call. Safe to call directly."""
+        if not self.live:
+            self._full_sync()
+            return
+        previous = self.block_number
+        head = self._new_head()
+        if (head < previous or head - previous > self.max_catch_up
+                or self.web3.eth.get_block(previous)["hash"] != self.block_hash):
+            # Reorg, node reset or a long outage: cheaper to re-read everything
+            self._full_sync()
+            return
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        changed = self._refresh(pending, previous)
+        for number in range(previous + 1, head + 1):
+            block = self.web3.eth.get_block(number, full_transactions=True)
+            if block["parentHash"] != self.block_hash:
+                self._full_sync()  # reorganised while catching up
+                return
+            with self._lock:
+                touched = touched_addresses(block) & self._tracked
+            changed.update(self._refresh(touched, number))
+            self.block_hash = block["hash"]
+        if self.on_update is not None and (changed or head != previous):
+            self.on_update(changed, head)
+
+    def _new_head(self):
+        if self.use_filter and self._filter is None:
+            try:
+                self._filter = self.web3.eth.filter("latest")
+            except Exception:
+                # Node without filter support: fall back to plain polling
+                self.use_filter = False
+        elif self.use_filter:
+            try:
+                if not self._filter.get_new_entries():
+                    return self.block_number
+            except Exception:
+                # Filter expired or the node restarted; install a new one next time
+                self._filter = None
+        return self.web3.eth.block_number
+
+    def _full_sync(self):
+        self.live = False
+        block = self.web3.eth.get_block("latest")
+        head = block["number"]
+        with self._lock:
+            tracked = set(self._tracked)
+            self._pending.clear()
+            self.balances.clear()
+        changed = self._refresh(tracked, head)
+        self.block_hash = block["hash"]
+        self.live = True
+        if self.on_update is not None:
+            self.on_update(changed, head)
+
+    def _refresh(self, addresses, number):
+        """Re-read `addresses` at block `number`; return the balances that changed."""
+        fresh = self.engine.get_balances(addresses, number) if addresses else {}
+        with self._lock:
+            changed = {a: b for a, b in fresh.items()
+                       if a in self._tracked and self.balances.get(a) != b}
+            self.balances.update(changed)
+            self.block_number = number
+        return changed